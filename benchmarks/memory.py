@@ -0,0 +1,110 @@
+"""
+Memory footprint of the town entities, in bytes per tile, player and building
+and bytes per instance of the slotted classes against an unslotted copy :
+    python benchmarks/memory.py --size 300 --count 5000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from pytown_model.buildings.factory import (
+    GoldMineFactory,
+    LumberingFactory,
+    SawmillFactory,
+)
+from pytown_model.characters import Player, PlayerStatus
+from pytown_model.check import CheckResult
+from pytown_model.entity import Resource
+from pytown_model.inventory import Inventory, Item
+from pytown_model.town import TownCreator
+
+# Slotted classes and the arguments of an instance
+SLOTTED = [
+    (Item, ("wood", 2, 10)),
+    (Inventory, ("bag",)),
+    (Resource, ("forest", [])),
+    (PlayerStatus, (900, 1000, 0)),
+    (CheckResult, ()),
+    (Player, (1, "player", 0, 0)),
+]
+
+_unslotted_copies = {}  # Dict with the slotted class as key
+
+
+def measure(create, count):
+    """Bytes allocated by create(count) and still alive, divided by count"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = create(count)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def unslotted(cls):
+    """Copy of cls and of its slotted bases keeping their attributes in a __dict__"""
+    if "__slots__" not in cls.__dict__:
+        return cls
+    if cls not in _unslotted_copies:
+        slots = {"__slots__", "__dict__", "__weakref__"}
+        slots.update(cls.__dict__["__slots__"])
+        namespace = {
+            name: value for (name, value) in cls.__dict__.items() if name not in slots
+        }
+        bases = tuple(unslotted(base) for base in cls.__bases__)
+        _unslotted_copies[cls] = type(cls)(cls.__name__, bases, namespace)
+    return _unslotted_copies[cls]
+
+
+def create_instances(cls, args):
+    return lambda count: [cls(*args) for _ in range(count)]
+
+
+def create_tiles(count, grid):
+    size = int(count ** 0.5)
+    return TownCreator.create_default_town(size, size, grid=grid)
+
+
+def create_players(count):
+    return [Player(player_id, "player", 0, 0) for player_id in range(count)]
+
+
+def create_buildings(count):
+    factories = [LumberingFactory(), SawmillFactory(), GoldMineFactory()]
+    return [factories[i % 3].create_building() for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=300, help="tiles by side")
+    parser.add_argument("--count", type=int, default=5000, help="players, buildings")
+    args = parser.parse_args()
+
+    tiles_nb = args.size * args.size
+    results = [
+        ("tile (dict)", measure(lambda n: create_tiles(n, False), tiles_nb)),
+        ("tile (grid)", measure(lambda n: create_tiles(n, True), tiles_nb)),
+        ("player", measure(create_players, args.count)),
+        ("building", measure(create_buildings, args.count)),
+    ]
+    for (name, size) in results:
+        print("{:<12} {:>10.1f} bytes".format(name, size))
+
+    print("\n{:<12} {:>10} {:>10}".format("instance", "slotted", "unslotted"))
+    for (cls, instance_args) in SLOTTED:
+        slotted_size = measure(create_instances(cls, instance_args), args.count)
+        unslotted_size = measure(
+            create_instances(unslotted(cls), instance_args), args.count
+        )
+        print(
+            "{:<12} {:>10.1f} {:>10.1f} bytes".format(
+                cls.__name__, slotted_size, unslotted_size
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
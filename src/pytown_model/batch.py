@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from .command import CommandsFactory, ServerCommand
+
+# Name of each command type, in the order the types are executed in a batch
+COMMAND_NAMES = {
+    command_type: name for (name, command_type) in CommandsFactory.COMMANDS_DICT.items()
+}
+COMMAND_RANKS = {
+    name: rank for (rank, name) in enumerate(CommandsFactory.COMMANDS_DICT)
+}
+
+
+def get_command_name(command: ServerCommand):
+    return COMMAND_NAMES.get(type(command), type(command).__name__)
+
+
+class CommandTypeStats:
+    """Outcome of the commands of one type in a batch"""
+
+    __slots__ = ("done_nb", "rejected_nb", "failed_nb", "duration")
+
+    def __init__(self):
+        self.done_nb = 0  # Checks passed, command done
+        self.rejected_nb = 0  # Checks failed
+        self.failed_nb = 0  # Exception raised
+        self.duration = 0.0  # Seconds
+
+    @property
+    def commands_nb(self):
+        return self.done_nb + self.rejected_nb + self.failed_nb
+
+    def __repr__(self):
+        return "{} done, {} rejected, {} failed in {:.6f}s".format(
+            self.done_nb, self.rejected_nb, self.failed_nb, self.duration
+        )
+
+
+class TickStats:
+    """Statistics of a batch, by_type is a dict with command name as key"""
+
+    __slots__ = ("tick", "duration", "by_type", "waves_nb")
+
+    def __init__(self, tick=None):
+        self.tick = tick
+        self.duration = 0.0  # Seconds
+        self.by_type = {}
+        self.waves_nb = None  # Waves of a ParallelCommandBatch
+
+    def _get_type_stats(self, name) -> CommandTypeStats:
+        type_stats = self.by_type.get(name)
+        if type_stats is None:
+            type_stats = CommandTypeStats()
+            self.by_type[name] = type_stats
+        return type_stats
+
+    @property
+    def commands_nb(self):
+        return sum(stats.commands_nb for stats in self.by_type.values())
+
+    @property
+    def done_nb(self):
+        return sum(stats.done_nb for stats in self.by_type.values())
+
+    @property
+    def rejected_nb(self):
+        return sum(stats.rejected_nb for stats in self.by_type.values())
+
+    @property
+    def failed_nb(self):
+        return sum(stats.failed_nb for stats in self.by_type.values())
+
+    @property
+    def commands_per_second(self):
+        if self.duration == 0:
+            return 0.0
+        return self.commands_nb / self.duration
+
+    def __repr__(self):
+        msg = "tick {} : {} commands in {:.6f}s".format(
+            self.tick, self.commands_nb, self.duration
+        )
+        return msg + " ({} done, {} rejected, {} failed)".format(
+            self.done_nb, self.rejected_nb, self.failed_nb
+        )
+
+
+class BatchResult:
+    """
+    Outcome of each command of a batch, in the order the commands were added
+    errors is a dict with the index of the commands which raised as key
+    """
+
+    __slots__ = ("commands", "order", "errors", "stats")
+
+    def __init__(self, commands, order, errors, stats: TickStats):
+        self.commands = commands
+        self.order = order  # Indexes of the commands in execution order
+        self.errors = errors
+        self.stats = stats
+
+    @property
+    def check_results(self):
+        return [command.check_result for command in self.commands]
+
+    def is_done(self, index):
+        return index not in self.errors and bool(self.commands[index].check_result)
+
+    def __len__(self):
+        return len(self.commands)
+
+
+class CommandBatch:
+    """
+    Commands of a town executed together : grouped by type in the order of
+    CommandsFactory.COMMANDS_DICT, in the order they were added within a type,
+    so the order between types doesn't depend on the way commands arrived
+    The player of each client is looked up once for the whole batch
+    A command raising is logged and counted as failed, the others are executed
+    With a journal, the commands done are appended to it, its errors are raised
+    """
+
+    def __init__(self, town, commands=(), fail_fast=False, journal=None):
+        self.town = town
+        self.fail_fast = fail_fast
+        self.journal = journal  # CommandJournal executing the commands if given
+        self.commands = list(commands)
+
+    def add(self, command: ServerCommand):
+        self.commands.append(command)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def get_order(self):
+        """Indexes of the commands in execution order"""
+        ranks = [
+            COMMAND_RANKS.get(get_command_name(command), len(COMMAND_RANKS))
+            for command in self.commands
+        ]
+        return sorted(range(len(self.commands)), key=ranks.__getitem__)
+
+    def execute(self, tick=None) -> BatchResult:
+        stats = TickStats(tick)
+        errors = {}
+        order = self.get_order()
+        players = {}  # Dict with client_id as key
+
+        start = time.perf_counter()
+        type_stats = None
+        type_name = None
+        type_start = start
+        for index in order:
+            command = self.commands[index]
+            name = get_command_name(command)
+            if name != type_name:
+                now = time.perf_counter()
+                if type_stats is not None:
+                    type_stats.duration += now - type_start
+                type_stats = stats._get_type_stats(name)
+                type_name = name
+                type_start = now
+
+            self._resolve(command, players)
+            error = self._check(command)
+            if error is None:
+                error = self._do(command)
+            self._count(stats, index, error, errors)
+
+        end = time.perf_counter()
+        if type_stats is not None:
+            type_stats.duration += end - type_start
+        stats.duration = end - start
+        return BatchResult(self.commands, order, errors, stats)
+
+    def _resolve(self, command: ServerCommand, players):
+        client_id = command.client_id
+        if client_id not in players:
+            players[client_id] = self.town.get_player(client_id)
+        command.town = self.town
+        command.resolve_player(players[client_id])
+
+    def _check(self, command: ServerCommand):
+        """Run the checks of the command, return the exception raised if any"""
+        try:
+            command._check(self.fail_fast)
+        except Exception as error:
+            logging.exception("{} failed".format(get_command_name(command)))
+            command.resolve_player(None)
+            return error
+        return None
+
+    def _do(self, command: ServerCommand):
+        """Do the command if its checks passed, return the exception raised if any"""
+        done = False
+        try:
+            if command.check_result:
+                command._do()
+                # A command may fail while done, ex : a transfer refused
+                done = bool(command.check_result)
+        except Exception as error:
+            logging.exception("{} failed".format(get_command_name(command)))
+            return error
+        finally:
+            command.resolve_player(None)
+
+        # The command is done : an error of the journal is raised, not counted
+        # as a failure of the command, the town and the journal have diverged
+        if done and self.journal is not None:
+            self.journal.append(command)
+        return None
+
+    def _count(self, stats: TickStats, index, error, errors):
+        type_stats = stats._get_type_stats(get_command_name(self.commands[index]))
+        if error is not None:
+            errors[index] = error
+            type_stats.failed_nb += 1
+        elif self.commands[index].check_result:
+            type_stats.done_nb += 1
+        else:
+            type_stats.rejected_nb += 1
+
+
+class TickExecutor:
+    """
+    Commands received between two ticks, executed as a CommandBatch on tick
+    before the players of the town are ticked (through the journal if given)
+    """
+
+    def __init__(self, town, fail_fast=False, journal=None):
+        self.town = town
+        self.fail_fast = fail_fast
+        self.journal = journal
+        self._pending = []
+
+    def submit(self, command: ServerCommand):
+        self._pending.append(command)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def tick(self) -> BatchResult:
+        batch = CommandBatch(self.town, self._pending, self.fail_fast, self.journal)
+        self._pending = []
+
+        result = batch.execute(self.town.tick + 1)
+        if self.journal is not None:
+            self.journal.tick()
+        else:
+            self.town.tick_players()
+        return result
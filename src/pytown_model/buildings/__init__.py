@@ -6,10 +6,13 @@ from pytown_core.patterns.behavioral import FSM, IState
 from pytown_core.serializers import IJSONSerializable
 
 from ..inventory import Inventory, InventoryFactoryMethod, Item
+from ..names import BUILDING_NAMES, ITEM_NAMES
+from ..slots import json_serializable
+from ..tracking import Trackable
 
 
 # Building delegate his behavior to its state
-class Building(FSM, IJSONSerializable):
+class Building(FSM, IJSONSerializable, Trackable):
     def __init__(self):
         FSM.__init__(self, InitialState)
 
@@ -17,6 +20,10 @@ class Building(FSM, IJSONSerializable):
     def name(self):
         return self._state.name
 
+    @property
+    def building_id(self):
+        return self._state.building_id
+
     @property
     def inventory(self):
         return self._state.inventory
@@ -38,8 +45,19 @@ class Building(FSM, IJSONSerializable):
         return self._state.building_transactions
 
     def upgrade(self):
+        self._touch()
         self._state.upgrade()
 
+    def bind_tracker(self, on_change):
+        Trackable.bind_tracker(self, on_change)
+
+        # Bind the current state and the next ones, they will become current on upgrade
+        state = self._state
+        while isinstance(state, BuildingState):
+            state.inventory.bind_tracker(on_change)
+            state.construction_inventory.bind_tracker(on_change)
+            state = state.next_state
+
     def downgrade(self):
         raise NotImplementedError
 
@@ -49,11 +67,25 @@ class Building(FSM, IJSONSerializable):
         state_dict = json_dict["state"]
 
         building._state = BuildingState.from_json_dict(building, state_dict)
+
+        # Upgrade chain, only given by to_json_dict(next_states=True)
+        state = building._state
+        for state_dict in json_dict.get("next_states", ()):
+            state.next_state = BuildingState.from_json_dict(building, state_dict)
+            state = state.next_state
         return building
 
-    def to_json_dict(self):
+    def to_json_dict(self, next_states=False):
+        """With next_states, the upgrade chain is kept to save the building"""
         json_dict = {}
         json_dict["state"] = self._state.to_json_dict()
+
+        if next_states:
+            json_dict["next_states"] = []
+            state = self._state.next_state
+            while state is not None:
+                json_dict["next_states"].append(state.to_json_dict())
+                state = state.next_state
         return json_dict
 
 
@@ -79,6 +111,7 @@ class BuildingState(IState, IJSONSerializable):
         IState.__init__(self, building)
 
         self.name = name
+        self.building_id = BUILDING_NAMES.get_id(name)
         self.inventory = inventory
         self.construction_inventory = construction_inventory
         self.actions = actions
@@ -87,6 +120,15 @@ class BuildingState(IState, IJSONSerializable):
 
         self.next_state = None
 
+    def __setstate__(self, state):
+        # Ids may differ in the process unpickling the state
+        if isinstance(state, tuple):
+            (state, slots) = state
+            state = dict(state or {}, **slots)
+        for (name, value) in state.items():
+            setattr(self, name, value)
+        self.building_id = BUILDING_NAMES.get_id(self.name)
+
     def upgrade(self):
         if self.next_state is not None:
             logging.info("Upgrade {} => {}".format(self.name, self.next_state.name))
@@ -162,7 +204,11 @@ class BuildingState(IState, IJSONSerializable):
 
 
 # This represent an action you can do inside the building (ex : "sleep")
-class Action(IJSONSerializable):
+@json_serializable
+class Action:
+
+    __slots__ = ("name",)
+
     def __init__(self, name):
 
         self.name = name
@@ -177,7 +223,11 @@ class Action(IJSONSerializable):
         return json_dict
 
 
-class BuildingProcess(IJSONSerializable):
+@json_serializable
+class BuildingProcess:
+
+    __slots__ = ("name", "item_required", "item_result", "energy_required")
+
     def __init__(
         self, item_required: Item, name: str, item_result: Item, energy_required: int
     ):
@@ -208,15 +258,32 @@ class BuildingProcess(IJSONSerializable):
         return json_dict
 
 
-class BuildingTransaction(IJSONSerializable):
+@json_serializable
+class BuildingTransaction:
+
+    __slots__ = ("item_id", "buy_price", "sell_price")
+
     def __init__(self, item_name: str, buy_price: int, sell_price: int):
 
-        self.item_name = item_name
+        self.item_id = ITEM_NAMES.get_id(item_name)
         self.buy_price = buy_price
         self.sell_price = sell_price
 
+    @property
+    def item_name(self):
+        return ITEM_NAMES.get_name(self.item_id)
+
+    def __reduce__(self):
+        return (
+            BuildingTransaction,
+            (self.item_name, self.buy_price, self.sell_price),
+        )
+
     @classmethod
-    def from_json_dict(cls, json_dict):
+    def from_json_dict(cls, json_dict, known=False):
+        """With known, the item has to be registered : transactions sent by clients"""
+        if known:
+            ITEM_NAMES.get_known_id(json_dict["item_name"])
         return cls(
             json_dict["item_name"], json_dict["buy_price"], json_dict["sell_price"]
         )
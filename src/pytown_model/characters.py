@@ -1,13 +1,35 @@
 import time
 
-from pytown_core.serializers import IJSONSerializable
-
 from .inventory import Inventory, InventoryFactoryMethod
+from .slots import get_slots_state, json_serializable
+from .status import StatusColumns
+from .timer import TimerWheel
+from .tracking import Trackable
+
+
+@json_serializable
+class Character(Trackable):
 
+    __slots__ = (
+        "tile_ref",
+        "cat",
+        "name",
+        "_direction",
+        "_status",
+        "_move_internal_time",
+        "_timers",
+        "_move_timer",
+        "_on_change",
+    )
+
+    MOVE_DURATION = 0.1  # Seconds before the status goes back from move to idle
 
-class Character(IJSONSerializable):
     def __init__(self, name, direction="down", status="idle"):
 
+        self._on_change = None
+        self._timers = None  # TimerWheel of the town expiring the move status
+        self._move_timer = None
+
         self.tile_ref = None
 
         self.cat = "characters"
@@ -16,20 +38,62 @@ class Character(IJSONSerializable):
         self._status = status
         self._move_internal_time = time.time()
 
+    @property
+    def direction(self):
+        return self._direction
+
+    @direction.setter
+    def direction(self, value):
+        self._touch()
+        self._direction = value
+
     @property
     def status(self):
         return self._status
 
     @status.setter
     def status(self, value):
+        self._touch()
         if value == "move":
             self._move_internal_time = time.time()
+            self._schedule_move_expiry()
 
         self._status = value
 
     def _reset_status(self):
+        self._touch()
         self._status = "idle"
 
+    def bind_timers(self, timers: TimerWheel):
+        if self._move_timer is not None:
+            self._move_timer.cancel()
+            self._move_timer = None
+        self._timers = timers
+        if self._status == "move":
+            self._schedule_move_expiry()
+
+    def _schedule_move_expiry(self):
+        if self._timers is None:
+            return
+
+        if self._move_timer is not None:
+            self._move_timer.cancel()
+        self._move_timer = self._timers.schedule(
+            self._move_internal_time + Character.MOVE_DURATION, self._expire_move
+        )
+
+    def _expire_move(self):
+        self._move_timer = None
+        if self._status == "move":
+            self.status = "idle"
+
+    def __getstate__(self):
+        # The timers of the town are not pickled with the character
+        (state, slots) = get_slots_state(self)
+        slots["_timers"] = None
+        slots["_move_timer"] = None
+        return (state, slots)
+
     def __repr__(self):
         return self.name
 
@@ -53,6 +117,18 @@ class Character(IJSONSerializable):
 
 
 class Player(Character):
+
+    __slots__ = (
+        "player_id",
+        "velocity",
+        "_x",
+        "_y",
+        "inventory",
+        "health",
+        "hunger",
+        "energy",
+    )
+
     def __init__(self, player_id, name, x, y, direction="down", status="idle"):
         Character.__init__(self, name, direction, status)
 
@@ -67,6 +143,31 @@ class Player(Character):
         self.hunger = PlayerStatus(1000, 1000, -1)
         self.energy = PlayerStatus(900, 1000, 0)
 
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self._touch()
+        self._x = value
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self._touch()
+        self._y = value
+
+    def bind_tracker(self, on_change):
+        Trackable.bind_tracker(self, on_change)
+        self.inventory.bind_tracker(on_change)
+        self.health.bind_tracker(on_change)
+        self.hunger.bind_tracker(on_change)
+        self.energy.bind_tracker(on_change)
+
     def do(self):
         # regen energy
         self.health.regenerate()
@@ -76,7 +177,11 @@ class Player(Character):
         self.energy.regenerate()
 
     def do_move_check(self):
-        if self.status == "move" and time.time() - self._move_internal_time > 0.1:
+        # Not needed when the town timers are bound, see Town.run_timers
+        if (
+            self.status == "move"
+            and time.time() - self._move_internal_time > Character.MOVE_DURATION
+        ):
             self.status = "idle"
 
     @classmethod
@@ -96,7 +201,11 @@ class Player(Character):
         player.energy = PlayerStatus.from_json_dict(json_dict["energy"])
         return player
 
-    def to_json_dict(self):
+    def to_json_dict(self, statuses_tick=False):
+        """
+        With statuses_tick, lazy statuses are given as of their last update, with
+        its tick, instead of regenerated : to save the player from any thread
+        """
         json_dict = {}
         json_dict = super().to_json_dict()
         json_dict["player_id"] = self.player_id
@@ -104,41 +213,140 @@ class Player(Character):
         json_dict["x"] = self.x
         json_dict["y"] = self.y
         json_dict["inventory"] = self.inventory.to_json_dict()
-        json_dict["health"] = self.health.to_json_dict()
-        json_dict["hunger"] = self.hunger.to_json_dict()
-        json_dict["energy"] = self.energy.to_json_dict()
+        json_dict["health"] = self.health.to_json_dict(not statuses_tick)
+        json_dict["hunger"] = self.hunger.to_json_dict(not statuses_tick)
+        json_dict["energy"] = self.energy.to_json_dict(not statuses_tick)
+        if statuses_tick and self.health._lazy is not None:
+            json_dict["statuses_tick"] = self.health._lazy.last_update
         return json_dict
 
 
-class PlayerStatus(IJSONSerializable):
+@json_serializable
+class PlayerStatus(Trackable):
+
+    __slots__ = ("_columns", "_slot", "_regen_base", "_lazy", "_on_change")
+
     def __init__(self, value, value_max, regen_base):
 
-        self.value = value
-        self.value_max = value_max
+        self._on_change = None
+        self._lazy = None  # LazyPlayerStatuses computing the regenerated values
 
+        # View on a slot of columns, its own until attached to a PlayerStatusStore
+        self._columns = StatusColumns(1)
+        self._slot = 0
+
+        self._columns.values[0] = value
+        self._columns.values_max[0] = value_max
         self._regen_base = regen_base
-        self.regen = regen_base  # dynamic regen
+        self._columns.regens[0] = regen_base  # dynamic regen
+        self._columns.values_limit[0] = value_max
+
+    def attach(self, columns: StatusColumns, slot):
+        self._copy_to(columns, slot)
+        self._columns = columns
+        self._slot = slot
+
+    def detach(self):
+        self.attach(StatusColumns(1), 0)
+
+    def _copy_to(self, columns: StatusColumns, slot):
+        columns.values[slot] = self.value
+        columns.values_max[slot] = self.value_max
+        columns.regens[slot] = self.regen
+        columns.values_limit[slot] = self.value_limit
+
+    def __getstate__(self):
+        # The columns of a PlayerStatusStore are not pickled with the status
+        (state, slots) = get_slots_state(self)
+        slots["_columns"] = StatusColumns(1)
+        slots["_slot"] = 0
+        self._copy_to(slots["_columns"], 0)
+        slots["_lazy"] = None
+        return (state, slots)
+
+    def _update(self):
+        if self._lazy is not None:
+            self._lazy.update()
+
+    def _before_change(self):
+        self._update()
+        self._touch()
+
+    def _after_change(self):
+        if self._lazy is not None:
+            self._lazy.schedule_events()
+
+    def _settle(self, value, value_limit):
+        # Regenerated values of LazyPlayerStatuses, touched by its update
+        self._columns.values[self._slot] = value
+        self._columns.values_limit[self._slot] = value_limit
+
+    @property
+    def value(self):
+        self._update()
+        return self._columns.values[self._slot]
+
+    @value.setter
+    def value(self, value):
+        self._before_change()
+        self._columns.values[self._slot] = value
+        self._after_change()
+
+    @property
+    def value_max(self):
+        self._update()
+        return self._columns.values_max[self._slot]
 
-        self._value_limit = value_max
+    @value_max.setter
+    def value_max(self, value):
+        self._before_change()
+        self._columns.values_max[self._slot] = value
+        self._after_change()
+
+    @property
+    def regen(self):
+        self._update()
+        return self._columns.regens[self._slot]
+
+    @regen.setter
+    def regen(self, value):
+        self._before_change()
+        self._columns.regens[self._slot] = value
+        self._after_change()
 
     @property
     def value_limit(self):
-        return self._value_limit
+        self._update()
+        return self._columns.values_limit[self._slot]
 
     @value_limit.setter
     def value_limit(self, value):
-        if value <= self.value_max:
-            self._value_limit = value
-        else:
-            self._value_limit = self.value_max
+        if value > self.value_max:
+            value = self.value_max
+        if value != self.value_limit:
+            self._before_change()
+            self._columns.values_limit[self._slot] = value
+            self._after_change()
 
     def regenerate(self):
-        if self.value + self.regen < 0:
-            self.value = 0
-        elif self.value + self.regen <= self._value_limit:
-            self.value += self.regen
+        (value, regen, value_limit) = (self.value, self.regen, self.value_limit)
+        if value + regen < 0:
+            new_value = 0
+        elif value + regen <= value_limit:
+            new_value = value + regen
         else:
-            self.value = self._value_limit
+            new_value = value_limit
+
+        if new_value != value:
+            self.value = new_value
+
+    @property
+    def regen_base(self):
+        return self._regen_base
+
+    @regen_base.setter
+    def regen_base(self, value):
+        self._regen_base = value
 
     def reset_regen(self):
         self.regen = self._regen_base
@@ -152,11 +360,15 @@ class PlayerStatus(IJSONSerializable):
         player_status.regen_base = json_dict["regen_base"]
         return player_status
 
-    def to_json_dict(self):
+    def to_json_dict(self, update=True):
+        """Without update, lazy values are given as of their last update"""
+        if update:
+            self._update()
+        (columns, slot) = (self._columns, self._slot)
         json_dict = {}
-        json_dict["value"] = self.value
-        json_dict["value_max"] = self.value_max
-        json_dict["regen"] = self.regen
+        json_dict["value"] = columns.values[slot]
+        json_dict["value_max"] = columns.values_max[slot]
+        json_dict["regen"] = columns.regens[slot]
         json_dict["regen_base"] = self._regen_base
-        json_dict["value_limit"] = self._value_limit
+        json_dict["value_limit"] = columns.values_limit[slot]
         return json_dict
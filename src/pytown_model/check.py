@@ -1,50 +1,271 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from enum import IntEnum
+
+from .inventory import (
+    Inventory,
+    Item,
+    ItemMaxQuantityError,
+    ItemMinQuantityError,
+    ItemNotAllowedError,
+    NegativeValueError,
+    TransferResult,
+)
+from .names import TERRAIN_NAMES
+from .slots import json_serializable
+
+WATER_ID = TERRAIN_NAMES.get_id("water")
+ROAD_ID = TERRAIN_NAMES.get_id("road")
+
+
+class CheckError(IntEnum):
+    """Code of a check failure, its message is given by CHECK_MESSAGES"""
+
+    MESSAGE = 0
+    NO_INVENTORY = 1
+    ITEM_NOT_FOUND = 2
+    ITEM_MAX_QUANTITY = 3
+    ITEM_MIN_QUANTITY = 4
+    WATER = 5
+    NO_ENERGY = 6
+    NOT_ALIVE = 7
+    SLEEPING = 8
+    ROAD = 9
+    TILE_NOT_IN_TOWN = 10
+    ALREADY_BUILT = 11
+    NO_RESOURCE = 12
+    NO_BUILDING = 13
+    CONSTRUCTION_NOT_FINISHED = 14
+    SLEEP_IN_BUILDING = 15
+    ALREADY_AWAKE = 16
+    PLAYER_NOT_FOUND = 17
+    NOT_SAME_TILE = 18
+    ENOUGH_HEALTH = 19
+
+
+# Message of each error code, formatted with the arguments of the failure
+CHECK_MESSAGES = {
+    CheckError.MESSAGE: "{}",
+    CheckError.NO_INVENTORY: "{} has no inventory",
+    CheckError.ITEM_NOT_FOUND: "{} not found in inventory",
+    CheckError.ITEM_MAX_QUANTITY: "{} > {} max quantity",
+    CheckError.ITEM_MIN_QUANTITY: "not enough {} ({}) to remove {}",
+    CheckError.WATER: "Can't go in water",
+    CheckError.NO_ENERGY: "No enough energy({}) : {} required",
+    CheckError.NOT_ALIVE: "Health is 0. Player is not alive",
+    CheckError.SLEEPING: "Player is sleeping",
+    CheckError.ROAD: "Can't build on road",
+    CheckError.TILE_NOT_IN_TOWN: "tile {} not in town",
+    CheckError.ALREADY_BUILT: "Can't build {} : {} already built on {}",
+    CheckError.NO_RESOURCE: "No resource in {}",
+    CheckError.NO_BUILDING: "No building on {}",
+    CheckError.CONSTRUCTION_NOT_FINISHED: "construction not finished",
+    CheckError.SLEEP_IN_BUILDING: "Can't sleep in building",
+    CheckError.ALREADY_AWAKE: "{} is already awake",
+    CheckError.PLAYER_NOT_FOUND: "Player {} does not exist",
+    CheckError.NOT_SAME_TILE: "Players {} and {} are not in the same tile",
+    CheckError.ENOUGH_HEALTH: "{} has enough health to keep moving",
+}
+
+
+@json_serializable
+class CheckResult:
+    """
+    Failures of checks as (CheckError, args), true if there is none
+    Messages are only formatted when msg or to_json_dict is called
+    """
+
+    __slots__ = ("_errors",)
 
-from pytown_core.serializers import IJSONSerializable
+    def __init__(self):
+        self._errors = None  # List of (code, args), allocated on first failure
 
-from .inventory import Inventory, Item, NegativeValueError
+    def add(self, code: CheckError, *args):
+        if self._errors is None:
+            self._errors = []
+        self._errors.append((code, args))
+        return self
 
+    @property
+    def errors(self):
+        if self._errors is None:
+            return []
+        return list(self._errors)
 
-class CheckResult(IJSONSerializable):
-    def __init__(self):
-        self._msg = ""
+    @property
+    def codes(self):
+        return [code for (code, _) in self.errors]
 
     @property
     def msg(self):
-        return self._msg
+        return "\n".join(
+            CHECK_MESSAGES[code].format(*args) for (code, args) in self.errors
+        )
 
     def __iadd__(self, msg):
-        if self._msg != "":
-            self._msg += "\n"
-        self._msg += msg
-        return self
+        # An empty message is no failure
+        if msg == "":
+            return self
+        return self.add(CheckError.MESSAGE, msg)
 
     def __eq__(self, msg):
-        return self._msg == msg
+        return self.msg == msg
 
     def __bool__(self):
-        if self._msg == "":
-            return True
-        else:
-            return False
+        return self._errors is None
 
     def __repr__(self):
         return "({} , {})".format(self.__bool__(), self.msg)
 
+    @classmethod
+    def from_compact(cls, compact) -> CheckResult:
+        """CheckResult from [[code, *args], ...], see to_compact"""
+        check_result = cls()
+        for error in compact:
+            # Tiles are decoded from json as lists
+            args = [tuple(arg) if isinstance(arg, list) else arg for arg in error[1:]]
+            check_result.add(CheckError(error[0]), *args)
+        return check_result
+
+    def to_compact(self):
+        return [[int(code), *args] for (code, args) in self.errors]
+
     @classmethod
     def from_json_dict(cls, json_dict):
+        if "errors" in json_dict:
+            return cls.from_compact(json_dict["errors"])
+
         check_result = cls()
         check_result += json_dict["msg"]
         return check_result
 
     def to_json_dict(self):
         json_dict = {}
-        json_dict["msg"] = self._msg
+        json_dict["msg"] = self.msg
+        json_dict["errors"] = self.to_compact()
         return json_dict
 
 
+# Check functions, a failure is added to check_result
+
+
+def check_transaction(check_result: CheckResult, sender, receiver, item: Item):
+    try:
+        sender.inventory
+    except AttributeError:
+        check_result.add(CheckError.NO_INVENTORY, repr(sender))
+
+    try:
+        receiver.inventory
+    except AttributeError:
+        check_result.add(CheckError.NO_INVENTORY, repr(receiver))
+
+    check_inventory_remove(check_result, sender.inventory, item)
+    check_inventory_add(check_result, receiver.inventory, item)
+
+
+def check_inventory_add(check_result: CheckResult, inventory: Inventory, item: Item):
+    if item.quantity < 0:
+        raise NegativeValueError(inventory, item)
+
+    l_item = inventory.get_item_by_id(item.item_id)
+    if l_item is None:
+        check_result.add(CheckError.ITEM_NOT_FOUND, item.name)
+    elif l_item.max_quantity < l_item.quantity + item.quantity:
+        check_result.add(CheckError.ITEM_MAX_QUANTITY, item.quantity, item.name)
+
+
+def check_inventory_remove(check_result: CheckResult, inventory: Inventory, item: Item):
+    if item.quantity < 0:
+        raise NegativeValueError(inventory, item)
+
+    l_item = inventory.get_item_by_id(item.item_id)
+    if l_item is None:
+        check_result.add(CheckError.ITEM_NOT_FOUND, item.name)
+    elif l_item.quantity < item.quantity:
+        check_result.add(
+            CheckError.ITEM_MIN_QUANTITY, item.name, l_item.quantity, item.quantity
+        )
+
+
+def check_transfer_result(check_result: CheckResult, result: TransferResult):
+    """Failures of an inventory transfer, with the codes of check_transaction"""
+    for error in result.errors:
+        item = error.item
+        if isinstance(error, ItemNotAllowedError):
+            check_result.add(CheckError.ITEM_NOT_FOUND, item.name)
+        elif isinstance(error, ItemMaxQuantityError):
+            check_result.add(CheckError.ITEM_MAX_QUANTITY, item.quantity, item.name)
+        elif isinstance(error, ItemMinQuantityError):
+            check_result.add(
+                CheckError.ITEM_MIN_QUANTITY,
+                item.name,
+                error.inventory.get_quantity(item.name),
+                item.quantity,
+            )
+        else:
+            check_result.add(CheckError.MESSAGE, error.msg)
+
+
+def check_background_movement(check_result: CheckResult, background):
+    if background.terrain_id == WATER_ID:
+        check_result.add(CheckError.WATER)
+
+
+def check_background_build(check_result: CheckResult, background):
+    if background.terrain_id == ROAD_ID:
+        check_result.add(CheckError.ROAD)
+
+
+def check_energy(check_result: CheckResult, player, energy_required):
+    if player.energy.value < energy_required:
+        check_result.add(CheckError.NO_ENERGY, player.energy.value, energy_required)
+
+
+def check_alive(check_result: CheckResult, player):
+    if player.health.value <= 0:
+        check_result.add(CheckError.NOT_ALIVE)
+
+
+def check_awake(check_result: CheckResult, player):
+    if player.status == "sleep":
+        check_result.add(CheckError.SLEEPING)
+
+
+class CheckPipeline:
+    """
+    Checks of a command type, declared once and run on each command
+    A step is called with (command, check_result) and returns False when the
+    next steps can't be run (ex : the tile doesn't exist)
+    Nested pipelines are flattened in a single tuple of steps
+    With fail_fast, run stops at the first step adding a failure,
+    otherwise every failure is kept for the messages shown to the player
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self, *steps):
+        flat_steps = []
+        for step in steps:
+            if isinstance(step, CheckPipeline):
+                flat_steps.extend(step.steps)
+            else:
+                flat_steps.append(step)
+        self.steps = tuple(flat_steps)
+
+    def run(self, command, check_result: CheckResult, fail_fast=False):
+        for step in self.steps:
+            if step(command, check_result) is False:
+                break
+            if fail_fast and not check_result:
+                break
+        return check_result
+
+    def __len__(self):
+        return len(self.steps)
+
+
 class Check(ABC):
     @abstractmethod
     def check(self, check_result: CheckResult):
@@ -59,20 +280,7 @@ class TransactionCheck(Check):
         self._item = item
 
     def check(self, check_result: CheckResult):
-
-        try:
-            self._sender.inventory
-        except AttributeError:
-            check_result += "{} has no inventory".format(self._sender)
-
-        try:
-            self._receiver.inventory
-        except AttributeError:
-            check_result += "{} has no inventory".format(self._receiver)
-
-        InventoryRemoveCheck(self._sender.inventory, self._item).check(check_result)
-        InventoryAddCheck(self._receiver.inventory, self._item).check(check_result)
-
+        check_transaction(check_result, self._sender, self._receiver, self._item)
         return check_result
 
 
@@ -82,19 +290,7 @@ class InventoryAddCheck(Check):
         self._item = item
 
     def check(self, check_result: CheckResult):
-        if self._item.quantity < 0:
-            raise NegativeValueError(self, self._item)
-
-        if self._inventory.is_item_allowed(self._item.name):
-            for l_item in self._inventory.items_list:
-                if l_item.name == self._item.name and (
-                    l_item.max_quantity < l_item.quantity + self._item.quantity
-                ):
-                    check_result += "{} > {} max quantity".format(
-                        self._item.quantity, self._item.name
-                    )
-        else:
-            check_result += "{} not found in inventory".format(self._item.name)
+        check_inventory_add(check_result, self._inventory, self._item)
 
 
 class InventoryRemoveCheck(Check):
@@ -103,23 +299,7 @@ class InventoryRemoveCheck(Check):
         self._item = item
 
     def check(self, check_result: CheckResult):
-
-        if self._item.quantity < 0:
-            raise NegativeValueError(self, self._item)
-
-        if self._inventory.is_item_allowed(self._item.name):
-            for l_item in self._inventory.items_list:
-                if (
-                    l_item.name == self._item.name
-                    and l_item.quantity < self._item.quantity
-                ):
-                    check_result += "not enough {} ({}) to remove {}".format(
-                        self._item.name,
-                        self._inventory.get_quantity(self._item.name),
-                        self._item.quantity,
-                    )
-        else:
-            check_result += "{} not found in inventory".format(self._item.name)
+        check_inventory_remove(check_result, self._inventory, self._item)
 
 
 class BackgroundMovementCheck(Check):
@@ -130,8 +310,7 @@ class BackgroundMovementCheck(Check):
         )
 
     def check(self, check_result: CheckResult):
-        if self._background.name == "water":
-            check_result += "Can't go in water"
+        check_background_movement(check_result, self._background)
 
 
 class EnergyCheck(Check):
@@ -140,10 +319,7 @@ class EnergyCheck(Check):
         self._energy_required = energy_required
 
     def check(self, check_result: CheckResult):
-        if self._player.energy.value < self._energy_required:
-            check_result += "No enough energy({}) : {} required".format(
-                self._player.energy.value, self._energy_required
-            )
+        check_energy(check_result, self._player, self._energy_required)
 
 
 class AliveCheck(Check):
@@ -151,8 +327,7 @@ class AliveCheck(Check):
         self._player = player
 
     def check(self, check_result: CheckResult):
-        if self._player.health.value <= 0:
-            check_result += "Health is 0. Player is not alive"
+        check_alive(check_result, self._player)
 
 
 class AwakenCheck(Check):
@@ -160,8 +335,7 @@ class AwakenCheck(Check):
         self._player = player
 
     def check(self, check_result: CheckResult):
-        if self._player.status == "sleep":
-            check_result += "Player is sleeping"
+        check_awake(check_result, self._player)
 
 
 class AvailableCheck(Check):
@@ -169,8 +343,8 @@ class AvailableCheck(Check):
         self._player = player
 
     def check(self, check_result: CheckResult):
-        AliveCheck(self._player).check(check_result)
-        AwakenCheck(self._player).check(check_result)
+        check_alive(check_result, self._player)
+        check_awake(check_result, self._player)
 
 
 class BackgroundBuildCheck(Check):
@@ -179,5 +353,4 @@ class BackgroundBuildCheck(Check):
         self._building_name = building_name
 
     def check(self, check_result: CheckResult):
-        if self._background.name == "road":
-            check_result += "Can't build on road"
+        check_background_build(check_result, self._background)
@@ -9,35 +9,101 @@ from pytown_core.serializers import IJSONSerializable
 from .buildings import BuildingProcess, BuildingTransaction
 from .buildings.factory import BuildingFactory
 from .check import (
-    AvailableCheck,
-    AwakenCheck,
-    BackgroundBuildCheck,
-    BackgroundMovementCheck,
+    CheckError,
+    CheckPipeline,
     CheckResult,
-    EnergyCheck,
-    InventoryAddCheck,
-    InventoryRemoveCheck,
-    TransactionCheck,
+    check_alive,
+    check_awake,
+    check_background_build,
+    check_background_movement,
+    check_energy,
+    check_inventory_add,
+    check_inventory_remove,
+    check_transaction,
+    check_transfer_result,
 )
 from .inventory import Item
+from .names import BUILDING_NAMES
+
+CABANE_ID = BUILDING_NAMES.get_id("cabane")
+
+ALL = None  # Key of the access to a whole section, see ServerCommand.get_access
+
+
+# Check steps shared by the commands, see CheckPipeline
+
+
+def _check_player_alive(command, check_result):
+    check_alive(check_result, command.player)
+
+
+def _check_player_awake(command, check_result):
+    check_awake(check_result, command.player)
+
+
+def _check_player_energy(energy_required):
+    def check_player_energy(command, check_result):
+        check_energy(check_result, command.player, energy_required)
+
+    return check_player_energy
+
+
+PLAYER_AVAILABLE = CheckPipeline(_check_player_alive, _check_player_awake)
 
 
 class ServerCommand(IJSONSerializable, Command):
+
+    CHECKS = CheckPipeline()  # Checks of the command type, run by _check
+
     def __init__(self):
 
         self.client_id = None
         self.town = None  # TODO: will be set by townmanager
         self.check_result = CheckResult()
 
-    def execute(self):
-        self._check()
+        self._player = None  # Player of client_id resolved by a CommandBatch
+
+    @property
+    def player(self):
+        if self._player is not None:
+            return self._player
+        return self.town.get_player(self.client_id)
+
+    def resolve_player(self, player):
+        """Use player as the player of client_id instead of looking it up"""
+        self._player = player
+
+    def execute(self, fail_fast=False):
+        """Do the command if its checks pass, see CheckPipeline for fail_fast"""
+        self._check(fail_fast)
 
         if self.check_result:
             self._do()
 
-    @abstractmethod
-    def _check(self):
-        raise NotImplementedError
+    def _check(self, fail_fast=False):
+        self.CHECKS.run(self, self.check_result, fail_fast)
+
+    def get_access(self):
+        """
+        (reads, writes) : sets of (section, key) of the town entities the command
+        reads and writes, key ALL for every entity of a section, None if unknown
+        Reading the statuses of a player updates them, it is a write
+        """
+        return None
+
+    def _get_player_key(self):
+        return ("players", self.client_id)
+
+    def _transfer(self, sender, receiver, item: Item):
+        """
+        Transfer the item between the inventories, return False if it couldn't be :
+        the errors are added to check_result and the side effects have to be skipped
+        The transfer checks the inventories, commands don't check them before
+        """
+        result = sender.inventory.transfer(receiver.inventory, [item])
+        if not result:
+            check_transfer_result(self.check_result, result)
+        return bool(result)
 
     @abstractmethod
     def _do(self):
@@ -79,31 +145,30 @@ class MovePlayerCommand(ServerCommand):
             msg += "\n{}".format(self.check_result)
         return msg
 
-    def _check(self):
-        player = self.town.get_player(self.client_id)
-        EnergyCheck(player, MovePlayerCommand.ENERGY_COST).check(self.check_result)
-
-        AvailableCheck(player).check(self.check_result)
-
+    def _check_tiles(self, check_result):
         for tile in self._get_tiles_coordinates_dict().values():
             if tile not in self.town.backgrounds.keys():
-                self.check_result += "tile {} not in town".format(tile)
-                return
+                check_result.add(CheckError.TILE_NOT_IN_TOWN, tile)
+                return False
 
-            BackgroundMovementCheck(self.town.backgrounds[tile], player).check(
-                self.check_result
-            )
+            check_background_movement(check_result, self.town.backgrounds[tile])
+
+    CHECKS = CheckPipeline(
+        _check_player_energy(ENERGY_COST), PLAYER_AVAILABLE, _check_tiles
+    )
+
+    def get_access(self):
+        return (set(), {self._get_player_key()})
 
     def _do(self):
 
         (x_dest, y_dest) = self.tile_dest
-        player = self.town.get_player(self.client_id)
+        player = self.player
         player.status = "move"
         player.direction = self._direction
         player.energy.value -= MovePlayerCommand.ENERGY_COST
 
-        player.x = x_dest
-        player.y = y_dest
+        self.town.move_player(self.client_id, x_dest, y_dest)
 
     @property
     def tile_dest(self) -> tuple:
@@ -113,7 +178,7 @@ class MovePlayerCommand(ServerCommand):
         movement_matrix["up"] = (0, -1)
         movement_matrix["down"] = (0, +1)
 
-        player = self.town.get_player(self.client_id)
+        player = self.player
         tile = self.town.get_player_tile(self.client_id)
         background = self.town.backgrounds[tile]
 
@@ -159,23 +224,27 @@ class BuildCommand(ServerCommand):
         self._tile = tile
         self._building_name = building_name
 
-    def _check(self):
-
-        player = self.town.get_player(self.client_id)
-        AvailableCheck(player).check(self.check_result)
-
+    def _check_tile(self, check_result):
         if self._tile not in self.town.backgrounds:
-            self.check_result += "tile {} not in town".format(self._tile)
-            return
+            check_result.add(CheckError.TILE_NOT_IN_TOWN, self._tile)
+            return False
 
-        background = self.town.backgrounds[self._tile]
-        BackgroundBuildCheck(background, self._building_name).check(self.check_result)
+        check_background_build(check_result, self.town.backgrounds[self._tile])
 
+    def _check_not_built(self, check_result):
         if self._tile in self.town.buildings:
-            self.check_result += "Can't build {} : {} already built on {}".format(
-                self._building_name, self.town.buildings[self._tile].name, self._tile
+            check_result.add(
+                CheckError.ALREADY_BUILT,
+                self._building_name,
+                self.town.buildings[self._tile].name,
+                self._tile,
             )
 
+    CHECKS = CheckPipeline(PLAYER_AVAILABLE, _check_tile, _check_not_built)
+
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
+
     def _do(self):
         self.town.set_building(
             BuildingFactory.create_building_by_name(self._building_name), self._tile
@@ -189,7 +258,7 @@ class BuildCommand(ServerCommand):
 
     @classmethod
     def from_json_dict(cls, json_dict: dict) -> BuildCommand:
-        return cls(json_dict["tile"], json_dict["building_name"])
+        return cls(tuple(json_dict["tile"]), json_dict["building_name"])
 
     def to_json_dict(self):
         json_dict = super().to_json_dict()
@@ -209,27 +278,23 @@ class CollectResourceCommand(ServerCommand):
         self._tile = tile
         self._item = item
 
-    def _check(self):
-        player = self.town.get_player(self.client_id)
-
-        AvailableCheck(player).check(self.check_result)
-
+    def _check_resource(self, check_result):
         if self._tile not in self.town.resources:
-            self.check_result += "No resource in {}".format(self._tile)
-            return
-
-        resource = self.town.resources[self._tile]
+            check_result.add(CheckError.NO_RESOURCE, self._tile)
+            return False
 
-        TransactionCheck(resource, player, self._item).check(self.check_result)
+    CHECKS = CheckPipeline(
+        PLAYER_AVAILABLE, _check_resource, _check_player_energy(ENERGY_COST)
+    )
 
-        EnergyCheck(player, CollectResourceCommand.ENERGY_COST).check(self.check_result)
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("resources", self._tile)})
 
     def _do(self):
-        player = self.town.get_player(self.client_id)
-        player.inventory.add_item(self._item)
+        player = self.player
         resource = self.town.resources[self._tile]
-        resource.inventory.remove_item(self._item)
-        player.energy.value -= CollectResourceCommand.ENERGY_COST
+        if self._transfer(resource, player, self._item):
+            player.energy.value -= CollectResourceCommand.ENERGY_COST
 
     def __repr__(self):
         msg = "Collect Resource ServerCommand : {}".format(self._item)
@@ -239,7 +304,9 @@ class CollectResourceCommand(ServerCommand):
 
     @classmethod
     def from_json_dict(cls, json_dict: dict) -> CollectResourceCommand:
-        return cls(json_dict["tile"], Item.from_json_dict(json_dict["item"]))
+        return cls(
+            tuple(json_dict["tile"]), Item.from_json_dict(json_dict["item"], known=True)
+        )
 
     def to_json_dict(self) -> dict:
         json_dict = super().to_json_dict()
@@ -256,33 +323,40 @@ class BuildingProcessCommand(ServerCommand):
         self._tile = tile
         self._building_process = building_process
 
-    def _check(self):
+    def _check_building(self, check_result):
+        if self._tile not in self.town.buildings:
+            check_result.add(CheckError.NO_BUILDING, self._tile)
+            return False
 
-        player = self.town.get_player(self.client_id)
-        AvailableCheck(player).check(self.check_result)
+    def _check_item_required(self, check_result):
+        inventory = self.town.buildings[self._tile].inventory
+        check_inventory_remove(
+            check_result, inventory, self._building_process.item_required
+        )
 
-        if self._tile not in self.town.buildings:
-            self.check_result += "No building on {}".format(self._tile)
-            return
+    def _check_item_result(self, check_result):
+        inventory = self.town.buildings[self._tile].inventory
+        check_inventory_add(check_result, inventory, self._building_process.item_result)
 
-        building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
+    def _check_energy(self, check_result):
+        check_energy(check_result, self.player, self._building_process.energy_required)
 
-        InventoryRemoveCheck(
-            building.inventory, self._building_process.item_required
-        ).check(self.check_result)
-        InventoryAddCheck(building.inventory, self._building_process.item_result).check(
-            self.check_result
-        )
-        EnergyCheck(player, self._building_process.energy_required).check(
-            self.check_result
-        )
+    CHECKS = CheckPipeline(
+        PLAYER_AVAILABLE,
+        _check_building,
+        _check_item_required,
+        _check_item_result,
+        _check_energy,
+    )
+
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
 
     def _do(self):
         building = self.town.buildings[self._tile]
         building.inventory.remove_item(self._building_process.item_required)
         building.inventory.add_item(self._building_process.item_result)
-        player = self.town.get_player(self.client_id)
+        player = self.player
         player.energy.value -= self._building_process.energy_required
 
     def __repr__(self):
@@ -294,7 +368,7 @@ class BuildingProcessCommand(ServerCommand):
     @classmethod
     def from_json_dict(cls, json_dict):
         return cls(
-            json_dict["tile"],
+            tuple(json_dict["tile"]),
             BuildingProcess.from_json_dict(json_dict["building_process"]),
         )
 
@@ -313,22 +387,16 @@ class BuyCommand(ServerCommand):
         self._tile = tile
         self._transaction = transaction
 
-    def _check(self):
-        building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
-
-        item = Item(self._transaction.item_name, 1)
+    CHECKS = CheckPipeline(PLAYER_AVAILABLE)
 
-        AvailableCheck(player).check(self.check_result)
-
-        TransactionCheck(building, player, item).check(self.check_result)
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
 
     def _do(self):
-        item = Item(self._transaction.item_name, 1)
+        item = Item.from_id(self._transaction.item_id, 1)
         building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
-        building.inventory.remove_item(item)
-        player.inventory.add_item(item)
+        player = self.player
+        self._transfer(building, player, item)
 
     def __repr__(self):
         msg = "BuyCommand ServerCommand {}".format(self._transaction.item_name)
@@ -339,8 +407,8 @@ class BuyCommand(ServerCommand):
     @classmethod
     def from_json_dict(cls, json_dict):
         return cls(
-            json_dict["tile"],
-            BuildingTransaction.from_json_dict(json_dict["transaction"]),
+            tuple(json_dict["tile"]),
+            BuildingTransaction.from_json_dict(json_dict["transaction"], known=True),
         )
 
     def to_json_dict(self):
@@ -358,21 +426,16 @@ class SellCommand(ServerCommand):
         self._tile = tile
         self._transaction = transaction
 
-    def _check(self):
-        building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
-
-        item = Item(self._transaction.item_name, 1)
+    CHECKS = CheckPipeline(PLAYER_AVAILABLE)
 
-        AvailableCheck(player).check(self.check_result)
-        TransactionCheck(player, building, item).check(self.check_result)
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
 
     def _do(self):
-        item = Item(self._transaction.item_name, 1)
+        item = Item.from_id(self._transaction.item_id, 1)
         building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
-        building.inventory.add_item(item)
-        player.inventory.remove_item(item)
+        player = self.player
+        self._transfer(player, building, item)
 
     def __repr__(self):
         msg = "SellCommand ServerCommand {}".format(self._transaction.item_name)
@@ -383,8 +446,8 @@ class SellCommand(ServerCommand):
     @classmethod
     def from_json_dict(cls, json_dict):
         return cls(
-            json_dict["tile"],
-            BuildingTransaction.from_json_dict(json_dict["transaction"]),
+            tuple(json_dict["tile"]),
+            BuildingTransaction.from_json_dict(json_dict["transaction"], known=True),
         )
 
     def to_json_dict(self):
@@ -405,18 +468,20 @@ class BuildBuildingCommand(ServerCommand):
         self._item = item
         self._tile = tile
 
-    def _check(self):
+    def _check_transaction(self, check_result):
         building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
+        check_transaction(check_result, building, building, self._item)
 
-        AvailableCheck(player).check(self.check_result)
+    CHECKS = CheckPipeline(
+        PLAYER_AVAILABLE, _check_player_energy(ENERGY_COST), _check_transaction
+    )
 
-        EnergyCheck(player, BuildBuildingCommand.ENERGY_COST).check(self.check_result)
-        TransactionCheck(building, building, self._item).check(self.check_result)
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
 
     def _do(self):
         building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
+        player = self.player
 
         player.energy.value -= BuildBuildingCommand.ENERGY_COST
         building.inventory.remove_item(self._item)
@@ -430,7 +495,9 @@ class BuildBuildingCommand(ServerCommand):
 
     @classmethod
     def from_json_dict(cls, json_dict):
-        return cls(json_dict["tile"], Item.from_json_dict(json_dict["item"]))
+        return cls(
+            tuple(json_dict["tile"]), Item.from_json_dict(json_dict["item"], known=True)
+        )
 
     def to_json_dict(self):
         json_dict = super().to_json_dict()
@@ -446,13 +513,15 @@ class UpgradeBuildingCommand(ServerCommand):
 
         self._tile = tile
 
-    def _check(self):
+    def _check_construction(self, check_result):
         building = self.town.buildings[self._tile]
-        player = self.town.get_player(self.client_id)
-        AvailableCheck(player).check(self.check_result)
-
         if not building.construction_inventory.is_full():
-            self.check_result += "construction not finished"
+            check_result.add(CheckError.CONSTRUCTION_NOT_FINISHED)
+
+    CHECKS = CheckPipeline(PLAYER_AVAILABLE, _check_construction)
+
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("buildings", self._tile)})
 
     def _do(self):
         building = self.town.buildings[self._tile]
@@ -466,7 +535,7 @@ class UpgradeBuildingCommand(ServerCommand):
 
     @classmethod
     def from_json_dict(cls, json_dict):
-        return cls(json_dict["tile"])
+        return cls(tuple(json_dict["tile"]))
 
     def to_json_dict(self):
         json_dict = super().to_json_dict()
@@ -483,17 +552,24 @@ class SleepCommand(ServerCommand):
     def __init__(self):
         ServerCommand.__init__(self)
 
-    def _check(self):
-
+    def _check_not_in_building(self, check_result):
         tile = self.town.get_player_tile(self.client_id)
 
-        # Player not in building
-        if tile in self.town.buildings and self.town.buildings[tile].name != "cabane":
-            self.check_result += "Can't sleep in building"
+        if (
+            tile in self.town.buildings
+            and self.town.buildings[tile].building_id != CABANE_ID
+        ):
+            check_result.add(CheckError.SLEEP_IN_BUILDING)
+
+    CHECKS = CheckPipeline(_check_not_in_building)
+
+    def get_access(self):
+        # The building on the tile of the player, which may move before
+        return ({("buildings", ALL)}, {self._get_player_key()})
 
     def _do(self):
 
-        player = self.town.get_player(self.client_id)
+        player = self.player
         tile = self.town.get_player_tile(self.client_id)
 
         # Change player sprite
@@ -501,7 +577,10 @@ class SleepCommand(ServerCommand):
         player.energy.regen = SleepCommand.ENERGY_REGEN_IN_GROUND
 
         # Change energy regeneration depending on where he sleeps
-        if tile in self.town.buildings and self.town.buildings[tile].name == "cabane":
+        if (
+            tile in self.town.buildings
+            and self.town.buildings[tile].building_id == CABANE_ID
+        ):
             player.energy.regen = SleepCommand.ENERGY_REGEN_IN_HOUSE
 
     def __repr__(self):
@@ -524,19 +603,23 @@ class WakeUpCommand(ServerCommand):
     def __init__(self):
         ServerCommand.__init__(self)
 
-    def _check(self):
-
-        player = self.town.get_player(self.client_id)
+    def _check_sleeping(self, check_result):
+        player = self.player
 
         is_awaken_check = CheckResult()
-        AwakenCheck(player).check(is_awaken_check)
+        check_awake(is_awaken_check, player)
 
         if is_awaken_check:
-            self.check_result += "{} is already awake".format(player.name)
+            check_result.add(CheckError.ALREADY_AWAKE, player.name)
+
+    CHECKS = CheckPipeline(_check_sleeping)
+
+    def get_access(self):
+        return (set(), {self._get_player_key()})
 
     def _do(self):
 
-        player = self.town.get_player(self.client_id)
+        player = self.player
         player.status = "idle"
 
         player.energy.reset_regen()
@@ -567,49 +650,48 @@ class HelpPlayerCommand(ServerCommand):
 
         self._player_to_help_id = player_to_help_id
 
-    def _check(self):
-        player = self.town.get_player(self.client_id)
-        AvailableCheck(player).check(self.check_result)
-
+    def _check_players(self, check_result):
         # The two players id exists in the town ?
         if self.client_id not in self.town.players.keys():
-            self.check_result += "Player {} does not exist".format(self.client_id)
-            return
+            check_result.add(CheckError.PLAYER_NOT_FOUND, self.client_id)
+            return False
 
         if self._player_to_help_id not in self.town.players.keys():
-            self.check_result += "Player {} does not exist".format(
-                self._player_to_help_id
-            )
-            return
+            check_result.add(CheckError.PLAYER_NOT_FOUND, self._player_to_help_id)
+            return False
 
         # Check if the two players are in the same tile
         if self.town.get_player_tile(self.client_id) != self.town.get_player_tile(
             self._player_to_help_id
         ):
-            self.check_result += "Players {} and {} are not in the same tile".format(
-                self.client_id, self._player_to_help_id
+            check_result.add(
+                CheckError.NOT_SAME_TILE, self.client_id, self._player_to_help_id
             )
-            return
-
-        # Check if I have enough energy to help
-        EnergyCheck(
-            self.town.get_player(self.client_id), HelpPlayerCommand.ENERGY_TO_HELP
-        ).check(self.check_result)
+            return False
 
+    def _check_patient(self, check_result):
         # Check if patient doesn't have health
+        patient = self.town.get_player(self._player_to_help_id)
         is_alive_check = CheckResult()
-        AvailableCheck(self.town.get_player(self._player_to_help_id)).check(
-            is_alive_check
-        )
+        check_alive(is_alive_check, patient)
+        check_awake(is_alive_check, patient)
 
         if is_alive_check:
-            self.check_result += "{} has enough health to keep moving".format(
-                self._player_to_help_id
-            )
+            check_result.add(CheckError.ENOUGH_HEALTH, self._player_to_help_id)
+
+    CHECKS = CheckPipeline(
+        PLAYER_AVAILABLE,
+        _check_players,
+        _check_player_energy(ENERGY_TO_HELP),
+        _check_patient,
+    )
+
+    def get_access(self):
+        return (set(), {self._get_player_key(), ("players", self._player_to_help_id)})
 
     def _do(self):
 
-        player_helper = self.town.get_player(self.client_id)
+        player_helper = self.player
         player_helper.energy.value -= HelpPlayerCommand.ENERGY_TO_HELP
 
         player_to_help = self.town.get_player(self._player_to_help_id)
@@ -1,33 +1,87 @@
-from pytown_core.serializers import IJSONSerializable
+from __future__ import annotations
+
+import weakref
 
 from .inventory import Inventory, Item
+from .names import TERRAIN_NAMES
+from .slots import json_serializable
+from .tracking import Trackable
 
 
 class BackgroundCreator:
     def create_grass_backgound(self):
-        return Background("grass", ["house", "sawmill"], 1)
+        return TerrainRegistry.get("grass")
 
     def create_water_background(self):
-        return Background("water", [], 0.5)
+        return TerrainRegistry.get("water")
 
     def create_road_background(self):
-        return Background("road", [], 2)
+        return TerrainRegistry.get("road")
 
     def create_sand_background(self):
-        return Background("sand", ["house"], 0.5)
+        return TerrainRegistry.get("sand")
+
+
+@json_serializable
+class Background:
+    """
+    Immutable terrain of a tile, interned : building a Background equal to an
+    existing one returns the existing one, so all the tiles of a type share it
+    and backgrounds can be compared by identity
+    terrain_id is the id of the name in TERRAIN_NAMES
+    Backgrounds are only interned while used, ex : by TerrainRegistry or a grid
+    """
+
+    __slots__ = (
+        "name",
+        "terrain_id",
+        "buildings_allowed_list",
+        "move_multiplicator",
+        "__weakref__",
+    )
+
+    # Dict with (name, buildings_allowed_list, move_multiplicator) as key
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, name: str, buildings_allowed_list, move_multiplicator: int):
+        key = (name, tuple(buildings_allowed_list), move_multiplicator)
+        background = cls._interned.get(key)
+        if background is None:
+            background = super().__new__(cls)
+            object.__setattr__(background, "name", name)
+            object.__setattr__(background, "terrain_id", TERRAIN_NAMES.get_id(name))
+            object.__setattr__(background, "buildings_allowed_list", key[1])
+            object.__setattr__(background, "move_multiplicator", move_multiplicator)
+            cls._interned[key] = background
+        return background
 
+    def __init__(self, name: str, buildings_allowed_list, move_multiplicator: int):
+        # Attributes are set once by __new__
+        pass
 
-class Background(IJSONSerializable):
-    def __init__(
-        self, name: str, buildings_allowed_list: list, move_multiplicator: int
-    ):
-        self.name = name
-        self.buildings_allowed_list = buildings_allowed_list
-        self.move_multiplicator = move_multiplicator
+    def __setattr__(self, name, value):
+        raise AttributeError("Background is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Background is immutable")
+
+    def __reduce__(self):
+        return (
+            Background,
+            (self.name, self.buildings_allowed_list, self.move_multiplicator),
+        )
 
     def __repr__(self):
         return "{}".format(self.name)
 
+    @classmethod
+    def from_compact(cls, terrain_id) -> Background:
+        """Registered background of the terrain, see TerrainRegistry"""
+        return TerrainRegistry.get_by_id(terrain_id)
+
+    def to_compact(self):
+        return self.terrain_id
+
     @classmethod
     def from_json_dict(cls, json_dict):
         background = cls(
@@ -40,11 +94,40 @@ class Background(IJSONSerializable):
     def to_json_dict(self):
         json_dict = {}
         json_dict["name"] = self.name
-        json_dict["buildings_allowed_list"] = self.buildings_allowed_list
+        json_dict["buildings_allowed_list"] = list(self.buildings_allowed_list)
         json_dict["move_multiplicator"] = self.move_multiplicator
         return json_dict
 
 
+class TerrainRegistry:
+    """Background of each terrain type, by name"""
+
+    _backgrounds = {}
+
+    @staticmethod
+    def register(background: Background) -> Background:
+        TerrainRegistry._backgrounds[background.name] = background
+        return background
+
+    @staticmethod
+    def get(name) -> Background:
+        return TerrainRegistry._backgrounds[name]
+
+    @staticmethod
+    def get_by_id(terrain_id) -> Background:
+        return TerrainRegistry._backgrounds[TERRAIN_NAMES.get_name(terrain_id)]
+
+    @staticmethod
+    def get_names():
+        return list(TerrainRegistry._backgrounds)
+
+
+TerrainRegistry.register(Background("grass", ["house", "sawmill"], 1))
+TerrainRegistry.register(Background("water", [], 0.5))
+TerrainRegistry.register(Background("road", [], 2))
+TerrainRegistry.register(Background("sand", ["house"], 0.5))
+
+
 class ResourceCreator:
     def create_forest(self):
         resource = Resource("forest", ["lumbering"])
@@ -75,16 +158,25 @@ class ResourceCreator:
         return resource
 
 
-class Resource(IJSONSerializable):
-    def __init__(self, name: str, buildings_allowed_list: list):
+@json_serializable
+class Resource(Trackable):
+
+    __slots__ = ("name", "inventory", "buildings_allowed_list", "_on_change")
 
+    def __init__(self, name: str, buildings_allowed_list):
+
+        self._on_change = None
         self.name = name
         self.inventory = Inventory(name)
-        self.buildings_allowed_list = buildings_allowed_list
+        self.buildings_allowed_list = tuple(buildings_allowed_list)  # As Background
 
     def __repr__(self):
         return self.name
 
+    def bind_tracker(self, on_change):
+        Trackable.bind_tracker(self, on_change)
+        self.inventory.bind_tracker(on_change)
+
     @classmethod
     def from_json_dict(cls, json_dict):
         resource = cls(json_dict["name"], json_dict["buildings_allowed_list"])
@@ -95,5 +187,5 @@ class Resource(IJSONSerializable):
         json_dict = {}
         json_dict["name"] = self.name
         json_dict["inventory"] = self.inventory.to_json_dict()
-        json_dict["buildings_allowed_list"] = self.buildings_allowed_list
+        json_dict["buildings_allowed_list"] = list(self.buildings_allowed_list)
         return json_dict
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+
+def _smoothstep(t):
+    return t * t * (3 - 2 * t)
+
+
+def value_noise_rows(width, height, rng, scale=16):
+    """
+    Rows of a smooth noise in [0, 1[, interpolated between random values
+    placed every scale tiles. Deterministic for a given rng state.
+    """
+    lattice_w = width // scale + 2
+    lattice_h = height // scale + 2
+    lattice = [[rng.random() for _ in range(lattice_w)] for _ in range(lattice_h)]
+
+    # Horizontal interpolation is the same for every row
+    columns = []
+    for i in range(width):
+        x = i / scale
+        i0 = int(x)
+        columns.append((i0, _smoothstep(x - i0)))
+
+    for j in range(height):
+        y = j / scale
+        j0 = int(y)
+        ty = _smoothstep(y - j0)
+        row0 = lattice[j0]
+        row1 = lattice[j0 + 1]
+        blended = [a + (b - a) * ty for (a, b) in zip(row0, row1)]
+        yield [
+            blended[i0] + (blended[i0 + 1] - blended[i0]) * tx for (i0, tx) in columns
+        ]
+
+
+def river_path(width, height, rng):
+    """Tiles of a river flowing from the top to the bottom of the board"""
+    x = rng.randrange(width)
+    for j in range(height):
+        x = min(max(x + rng.choice((-1, 0, 0, 1)), 0), width - 1)
+        yield (x, j)
+
+
+def random_tiles(width, height, count, rng):
+    for _ in range(count):
+        yield (rng.randrange(width), rng.randrange(height))
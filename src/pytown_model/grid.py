@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import MutableMapping
+
+from .entity import Background
+
+
+class BackgroundGrid(MutableMapping):
+    """
+    Dense storage for the town backgrounds
+    Each tile holds a small integer code pointing into a table of Background shared
+    by every tile of the same type. Behave like a dict with (x,y) as key.
+    origin is the (x,y) of the top left tile of the grid.
+    """
+
+    EMPTY = 0  # code of a tile without background
+
+    def __init__(self, width, height, origin=(0, 0)):
+        self.width = width
+        self.height = height
+        self.origin = origin
+
+        self.table = [None]  # code => Background, code 0 is reserved for empty tiles
+        self._codes_by_background = {}  # Backgrounds are interned
+        self._codes = array("B", bytes(width * height))
+        self._count = 0
+
+    @classmethod
+    def from_codes(cls, width, height, table, codes, count, origin=(0, 0)):
+        """Build a grid around an existing buffer of codes (array, memoryview)"""
+        grid = cls(0, 0, origin)
+        grid.width = width
+        grid.height = height
+        grid._codes = codes
+        grid._count = count
+        grid.table = list(table)
+        for code in range(1, len(table)):
+            grid._codes_by_background[table[code]] = code
+        return grid
+
+    @property
+    def typecode(self):
+        return "B" if self._codes.itemsize == 1 else "H"
+
+    @property
+    def codes(self):
+        return self._codes
+
+    def _index(self, tile):
+        x = tile[0] - self.origin[0]
+        y = tile[1] - self.origin[1]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        raise KeyError(tile)
+
+    def get_code(self, background: Background):
+        code = self._codes_by_background.get(background)
+        if code is not None:
+            return code
+
+        code = len(self.table)
+        self.table.append(background)
+        self._codes_by_background[background] = code
+
+        # Codes don't fit in a byte anymore
+        if code > 0xFF and self.typecode == "B":
+            self._codes = array("H", self._codes)
+        return code
+
+    def _get_row_start(self, j):
+        # Rows are given by their y in the town, as tiles
+        return self._index((self.origin[0], j))
+
+    def get_row_codes(self, j):
+        """Codes of the tiles (x,j) for x from origin[0] to origin[0] + width"""
+        start = self._get_row_start(j)
+        return self._codes[start : start + self.width]
+
+    def set_row_codes(self, j, codes):
+        start = self._get_row_start(j)
+        row = array(self.typecode, codes)
+        if len(row) != self.width:
+            raise ValueError(
+                "row of {} codes in a grid of width {}".format(len(row), self.width)
+            )
+        old_row = self._codes[start : start + self.width]
+        self._count += sum(1 for code in row if code) - sum(
+            1 for code in old_row if code
+        )
+        self._codes[start : start + self.width] = row
+
+    def get_tile_code(self, tile):
+        return self._codes[self._index(tile)]
+
+    def fill(self, background: Background):
+        code = self.get_code(background)
+        self._codes = array(self.typecode, [code]) * (self.width * self.height)
+        self._count = self.width * self.height
+
+    def fill_row(self, j, background: Background):
+        x0 = self.origin[0]
+        for i in range(self.width):
+            self[(x0 + i, j)] = background
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(self._codes, memoryview):
+            state["_codes"] = array(self.typecode, self._codes)
+        return state
+
+    def __getitem__(self, tile):
+        code = self._codes[self._index(tile)]
+        if code == BackgroundGrid.EMPTY:
+            raise KeyError(tile)
+        return self.table[code]
+
+    def __setitem__(self, tile, background: Background):
+        index = self._index(tile)
+        if self._codes[index] == BackgroundGrid.EMPTY:
+            self._count += 1
+        self._codes[index] = self.get_code(background)
+
+    def __delitem__(self, tile):
+        index = self._index(tile)
+        if self._codes[index] == BackgroundGrid.EMPTY:
+            raise KeyError(tile)
+        self._codes[index] = BackgroundGrid.EMPTY
+        self._count -= 1
+
+    def __contains__(self, tile):
+        try:
+            return self._codes[self._index(tile)] != BackgroundGrid.EMPTY
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        codes = self._codes
+        width = self.width
+        (x0, y0) = self.origin
+        for j in range(self.height):
+            for i in range(width):
+                if codes[j * width + i] != BackgroundGrid.EMPTY:
+                    yield (x0 + i, y0 + j)
+
+    def __len__(self):
+        return self._count
+
+    def __repr__(self):
+        return "BackgroundGrid({}x{}, {} types)".format(
+            self.width, self.height, len(self.table) - 1
+        )
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import logging
 
-from pytown_core.serializers import IJSONSerializable
+from .names import ITEM_NAMES
+from .slots import get_slots_state, json_serializable
+from .tracking import Trackable
 
 
 class InventoryFactoryMethod:
@@ -34,18 +36,58 @@ class InventoryFactoryMethod:
         return inventory
 
 
-class Item(IJSONSerializable):
+@json_serializable
+class Item:
+    """Quantity of an item, the name is stored as its id in ITEM_NAMES"""
+
+    __slots__ = ("item_id", "quantity", "max_quantity")
+
     def __init__(self, name, quantity, max_quantity=0):
 
-        self.name = name
+        self.item_id = ITEM_NAMES.get_id(name)
         self.quantity = quantity
         self.max_quantity = max_quantity
 
+    @classmethod
+    def from_id(cls, item_id, quantity, max_quantity=0) -> Item:
+        item = cls.__new__(cls)
+        item.item_id = item_id
+        item.quantity = quantity
+        item.max_quantity = max_quantity
+        return item
+
+    @property
+    def name(self):
+        return ITEM_NAMES.get_name(self.item_id)
+
+    @name.setter
+    def name(self, name):
+        self.item_id = ITEM_NAMES.get_id(name)
+
+    def __reduce__(self):
+        # Pickled by name, ids may differ in another process
+        return (Item, (self.name, self.quantity, self.max_quantity))
+
     def __repr__(self):
         return "{} {}".format(self.name, self.quantity)
 
     @classmethod
-    def from_json_dict(cls, json_dict):
+    def from_compact(cls, compact) -> Item:
+        """Item from [item_id, quantity, max_quantity], see to_compact"""
+        return cls.from_id(*compact)
+
+    def to_compact(self):
+        return [self.item_id, self.quantity, self.max_quantity]
+
+    @classmethod
+    def from_json_dict(cls, json_dict, known=False):
+        """With known, the name has to be registered : items sent by the clients"""
+        if known:
+            return cls.from_id(
+                ITEM_NAMES.get_known_id(json_dict["name"]),
+                json_dict["quantity"],
+                json_dict["max_quantity"],
+            )
         return cls(json_dict["name"], json_dict["quantity"], json_dict["max_quantity"])
 
     def to_json_dict(self):
@@ -56,60 +98,174 @@ class Item(IJSONSerializable):
         return json_dict
 
 
-class Inventory(IJSONSerializable):
+@json_serializable
+class Inventory(Trackable):
+    """
+    Items allowed in an inventory, with their quantity and max quantity
+    Items are indexed by name, item names are unique in an inventory
+    """
+
+    __slots__ = (
+        "name",
+        "items_list",
+        "_items",
+        "_not_full_nb",
+        "_on_quantity",
+        "_on_change",
+    )
+
     def __init__(self, name):
 
+        self._on_change = None
         self.name = name
-        self.items_list = []
+        self.items_list = []  # Items in the order they were allowed
+        self._items = {}  # Dict with item id as key
+        self._not_full_nb = 0  # Items with quantity != max_quantity
+        self._on_quantity = None  # Called with item id and quantity on change
+
+    def bind_ledger(self, on_quantity):
+        """on_quantity(item_id, quantity) is called after each quantity change"""
+        self._on_quantity = on_quantity
+
+    def __getstate__(self):
+        # The ledger of the town is not pickled with the inventory
+        # and items are indexed again on unpickling, their ids may differ
+        (state, slots) = get_slots_state(self)
+        slots["_on_quantity"] = None
+        del slots["_items"]
+        return (state, slots)
+
+    def __setstate__(self, state):
+        (state, slots) = state
+        for (name, value) in dict(state or {}, **slots).items():
+            setattr(self, name, value)
+        self._items = {item.item_id: item for item in self.items_list}
+
+    def get_item(self, name) -> Item:
+        """Item allowed with this name, None if not allowed"""
+        return self._items.get(ITEM_NAMES.find_id(name))
+
+    def get_item_by_id(self, item_id) -> Item:
+        return self._items.get(item_id)
 
     def get_quantity(self, name):
-        quantity = 0
-        if not self.is_item_allowed(name):
+        item = self._items.get(ITEM_NAMES.find_id(name))
+        if item is None:
             logging.warning("Try to get quantity of a non allowed item")
-
-        for item in self.items_list:
-            if item.name == name:
-                quantity = item.quantity
-        return quantity
+            return 0
+        return item.quantity
 
     def __len__(self):
         return len(self.items_list)
 
     def __contains__(self, item):
-        return item in self.items_list
+        return self._items.get(getattr(item, "item_id", None)) is item
 
     def allow_item(self, item_name, quantity_max):
-        self.items_list.append(Item(item_name, 0, quantity_max))
+        self._touch()
+        self._append_item(Item(item_name, 0, quantity_max))
+
+    def _append_item(self, item: Item):
+        old_item = self._items.get(item.item_id)
+        if old_item is not None:
+            self.items_list.remove(old_item)
+            self._not_full_nb -= old_item.quantity != old_item.max_quantity
+
+        self.items_list.append(item)
+        self._items[item.item_id] = item
+        self._not_full_nb += item.quantity != item.max_quantity
+        if self._on_quantity is not None:
+            self._on_quantity(item.item_id, item.quantity)
 
     def is_full(self):
-        is_full = True
-        for item in self.items_list:
-            if item.quantity != item.max_quantity:
-                is_full = False
-        return is_full
+        return self._not_full_nb == 0
 
     def is_item_allowed(self, item_name):
-        for l_item in self.items_list:
-            if l_item.name == item_name:
-                return True
-        return False
+        return ITEM_NAMES.find_id(item_name) in self._items
 
     def add_item(self, item: Item) -> None:
-        for l_item in self.items_list:
-            if l_item.name == item.name:
-                l_item.quantity += item.quantity
+        self._touch()
+        l_item = self._items.get(item.item_id)
+        if l_item is not None:
+            self._set_quantity(l_item, l_item.quantity + item.quantity)
 
     def remove_item(self, item: Item) -> None:
-        for l_item in self.items_list:
-            if l_item.name == item.name:
-                l_item.quantity -= item.quantity
+        self._touch()
+        l_item = self._items.get(item.item_id)
+        if l_item is not None:
+            self._set_quantity(l_item, l_item.quantity - item.quantity)
+
+    def _set_quantity(self, l_item: Item, quantity):
+        was_full = l_item.quantity == l_item.max_quantity
+        l_item.quantity = quantity
+        self._not_full_nb += was_full - (quantity == l_item.max_quantity)
+        if self._on_quantity is not None:
+            self._on_quantity(l_item.item_id, quantity)
+
+    def check_transfer(self, other: Inventory, items) -> TransferResult:
+        """Errors preventing transfer(other, items), without transferring"""
+        quantities = self._sum_quantities(items)
+        errors = []
+        for (item_id, quantity) in quantities.items():
+            item = Item.from_id(item_id, quantity)
+            l_item = self._items.get(item_id)
+            other_item = other._items.get(item_id)
+            if l_item is None:
+                errors.append(ItemNotAllowedError(self, item))
+            elif l_item.quantity < quantity:
+                errors.append(ItemMinQuantityError(self, item))
+            if other is self:
+                continue
+            if other_item is None:
+                errors.append(ItemNotAllowedError(other, item))
+            elif other_item.max_quantity < other_item.quantity + quantity:
+                errors.append(ItemMaxQuantityError(other, item))
+        return TransferResult(quantities, errors)
+
+    def transfer(self, other: Inventory, items) -> TransferResult:
+        """
+        Move the items to other, all of them or none if one of them can't be
+        moved (see check_transfer). Items with the same name are summed.
+        """
+        result = self.check_transfer(other, items)
+        if not result or other is self:
+            return result
+
+        self._touch()
+        other._touch()
+        for (item_id, quantity) in result.quantity_by_id.items():
+            l_item = self._items[item_id]
+            self._set_quantity(l_item, l_item.quantity - quantity)
+            other_item = other._items[item_id]
+            other._set_quantity(other_item, other_item.quantity + quantity)
+        return result
+
+    def _sum_quantities(self, items):
+        quantities = {}  # Dict with item id as key, in the order of items
+        for item in items:
+            if item.quantity < 0:
+                raise NegativeValueError(self, item)
+            quantities[item.item_id] = quantities.get(item.item_id, 0) + item.quantity
+        return quantities
+
+    @classmethod
+    def from_compact(cls, compact) -> Inventory:
+        """Inventory from [name, [item compact, ...]], see Item.to_compact"""
+        inventory = cls(compact[0])
+
+        for item in compact[1]:
+            inventory._append_item(Item.from_compact(item))
+        return inventory
+
+    def to_compact(self):
+        return [self.name, [item.to_compact() for item in self.items_list]]
 
     @classmethod
     def from_json_dict(cls, json_dict):
         inventory = cls(json_dict["name"])
 
         for item in json_dict["items"]:
-            inventory.items_list.append(Item.from_json_dict(item))
+            inventory._append_item(Item.from_json_dict(item))
         return inventory
 
     def to_json_dict(self):
@@ -123,6 +279,37 @@ class Inventory(IJSONSerializable):
         return json_dict
 
 
+class TransferResult:
+    """
+    Result of an inventory transfer, true if the items were transferred
+    quantities are the transferred quantities by item name
+    errors are the InventoryError preventing the transfer
+    """
+
+    __slots__ = ("quantity_by_id", "errors")
+
+    def __init__(self, quantity_by_id, errors):
+        self.quantity_by_id = quantity_by_id  # Dict with item id as key
+        self.errors = errors
+
+    @property
+    def quantities(self):
+        quantities = {}
+        for (item_id, quantity) in self.quantity_by_id.items():
+            quantities[ITEM_NAMES.get_name(item_id)] = quantity
+        return quantities
+
+    @property
+    def msg(self):
+        return "\n".join(error.msg for error in self.errors)
+
+    def __bool__(self):
+        return not self.errors
+
+    def __repr__(self):
+        return "({} , {})".format(self.__bool__(), self.msg)
+
+
 class InventoryError(Exception):
     def __init__(self, inventory, item):
         Exception.__init__(self)
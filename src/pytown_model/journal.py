@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+
+from .check import CheckResult
+from .command import CommandsFactory, ServerCommand
+from .town import Town
+
+
+class CommandJournal:
+    """
+    Append only journal of the commands executed on a town, between two snapshots
+    A command is journaled once done (redo log, not write-ahead) : a command done
+    but not written yet is lost on crash, the recovered town is then the one
+    before it. The ticks of the town are journaled between the commands.
+    Records are written by batch of batch_size and, with fsync, are on disk once
+    the batch is written. Every checkpoint_interval commands, the town is saved
+    and the journal emptied.
+    """
+
+    def __init__(
+        self, town: Town, batch_size=1, fsync=True, checkpoint_interval=None
+    ):
+        self.town = town
+        self.file_name = town.name + ".journal"
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.checkpoint_interval = checkpoint_interval
+
+        self._batch = []
+        self._commands_since_checkpoint = 0
+        self._file = open(self.file_name, "a", encoding="utf-8")
+
+    def execute(self, command: ServerCommand, fail_fast=False):
+        """Execute the command on the town and journal it if it was accepted"""
+        command.town = self.town
+        command.execute(fail_fast)
+        if command.check_result:
+            self.append(command)
+
+    def tick(self):
+        """Tick the players of the town and journal the tick"""
+        self.town.tick_players()
+        self._write({"tick": self.town.tick, "version": self.town.tracker.version})
+
+    def append(self, command: ServerCommand):
+        record = command.to_json_dict()
+        record["version"] = self.town.tracker.version
+        self._write(record)
+
+        self._commands_since_checkpoint += 1
+        if (
+            self.checkpoint_interval is not None
+            and self._commands_since_checkpoint >= self.checkpoint_interval
+        ):
+            self.checkpoint()
+
+    def _write(self, record):
+        self._batch.append(json.dumps(record, separators=(",", ":")))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+
+        self._file.write("\n".join(self._batch) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._batch = []
+
+    def checkpoint(self):
+        """Save the town, the journaled commands are then part of the snapshot"""
+        self.flush()
+        self.town.save()
+
+        self._file.close()
+        self._file = open(self.file_name, "w", encoding="utf-8")
+        self._commands_since_checkpoint = 0
+        logging.info(
+            "journal checkpoint at version {}".format(self.town.tracker.version)
+        )
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    @staticmethod
+    def read(file_name):
+        """Records of the journal, a torn last record is ignored"""
+        try:
+            with open(file_name, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning("journal {} truncated".format(file_name))
+                        return
+        except FileNotFoundError:
+            return
+
+
+def recover(town_name) -> Town:
+    """
+    Load the last snapshot of the town and replay the commands and the ticks
+    journaled after it
+    A command rejected on replay means the recovered town diverged : it is logged
+    """
+    town = Town(town_name)
+    town.load()
+    snapshot_version = town.tracker.version
+
+    replayed = 0
+    rejected = 0
+    for record in CommandJournal.read(town_name + ".journal"):
+        # Ticks and commands done before the snapshot are already part of it
+        if "tick" in record:
+            if record["tick"] > town.tick:
+                town.tick_players()
+            continue
+        if record["version"] <= snapshot_version:
+            continue
+
+        command = CommandsFactory.from_podsixnet(record)
+        command.check_result = CheckResult()
+        command.town = town
+        command.execute()
+        if command.check_result:
+            replayed += 1
+        else:
+            rejected += 1
+            logging.warning(
+                "{} rejected on replay : {}".format(
+                    record["command"], command.check_result.msg
+                )
+            )
+
+    logging.info(
+        "{} commands replayed on {}, {} rejected at tick {}".format(
+            replayed, town_name, rejected, town.tick
+        )
+    )
+    return town
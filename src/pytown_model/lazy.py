@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+
+
+class LazyEntityDict(MutableMapping):
+    """
+    Dict of entities kept as json dicts until they are accessed the first time
+    from_json_dict builds an entity, on_build is called with (key, entity) once built
+    """
+
+    def __init__(self, json_dicts, from_json_dict, on_build=None):
+        self._items = dict(json_dicts)  # Entity or json dict if not built yet
+        self._not_built = set(self._items)
+        self._from_json_dict = from_json_dict
+        self._on_build = on_build
+
+    def is_built(self, key):
+        return key in self._items and key not in self._not_built
+
+    def built_keys(self):
+        return [key for key in self._items if key not in self._not_built]
+
+    def __getitem__(self, key):
+        item = self._items[key]
+        if key not in self._not_built:
+            return item
+
+        entity = self._from_json_dict(item)
+        self._items[key] = entity
+        self._not_built.discard(key)
+        if self._on_build is not None:
+            self._on_build(key, entity)
+        return entity
+
+    def __setitem__(self, key, entity):
+        self._items[key] = entity
+        self._not_built.discard(key)
+
+    def __delitem__(self, key):
+        del self._items[key]
+        self._not_built.discard(key)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return "LazyEntityDict({} entities, {} built)".format(
+            len(self._items), len(self._items) - len(self._not_built)
+        )
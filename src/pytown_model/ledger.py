@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import heapq
+
+from .names import ITEM_NAMES
+
+
+class LedgerEntry:
+    """Callback given to an inventory to report its quantities to a ledger row"""
+
+    __slots__ = ("ledger", "row")
+
+    def __init__(self, ledger: InventoryLedger, row):
+        self.ledger = ledger
+        self.row = row
+
+    def __call__(self, item_id, quantity):
+        self.ledger._set_quantity(self.row, item_id, quantity)
+
+
+class InventoryLedger:
+    """
+    Quantities of the items of all the inventories of a town, in one column by
+    item with one row by inventory : resources, buildings (current state) and players
+    Quantities are updated by the inventories on every change, the entities
+    changed in the town are checked again before the next query
+    """
+
+    SECTIONS = ("resources", "buildings", "players")
+
+    def __init__(self, town):
+        self.town = town
+
+        self._rows = {}  # Dict with (section, key) as key and row as value
+        self._keys = []  # (section, key) of each row, None if free
+        self._names = []  # Name of the entity of each row, ex : building type
+        self._inventories = []  # Inventory of each row
+        self._free_rows = []
+        self._columns = {}  # Dict with item id as key and quantities by row
+        self._changed = set()  # (section, key) to check again
+
+        town.tracker.listeners.append(self.mark_changed)
+        self.rebuild()
+
+    def release(self):
+        self.town.tracker.listeners.remove(self.mark_changed)
+        for inventory in self._inventories:
+            if inventory is not None:
+                inventory.bind_ledger(None)
+
+    def mark_changed(self, section, key):
+        if section in InventoryLedger.SECTIONS:
+            self._changed.add((section, key))
+
+    def rebuild(self):
+        for key in list(self._rows):
+            self._free_row(self._rows[key])
+        for section in InventoryLedger.SECTIONS:
+            for key in getattr(self.town, section):
+                self._changed.add((section, key))
+        self.refresh()
+
+    def refresh(self):
+        """Check again the entities changed since the last refresh"""
+        changed = self._changed
+        self._changed = set()
+        for (section, key) in changed:
+            layer = getattr(self.town, section)
+            row = self._rows.get((section, key))
+            if key not in layer:
+                if row is not None:
+                    self._free_row(row)
+                continue
+
+            entity = layer[key]
+            if row is None:
+                row = self._allocate_row((section, key))
+            elif (
+                self._inventories[row] is entity.inventory
+                and self._names[row] == entity.name
+            ):
+                continue
+            self._read_row(row, entity)
+
+    def _allocate_row(self, key):
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._keys[row] = key
+        else:
+            row = len(self._keys)
+            self._keys.append(key)
+            self._names.append(None)
+            self._inventories.append(None)
+            for column in self._columns.values():
+                column.append(0)
+        self._rows[key] = row
+        return row
+
+    def _free_row(self, row):
+        self._unbind_row(row)
+        del self._rows[self._keys[row]]
+        self._keys[row] = None
+        self._names[row] = None
+        self._free_rows.append(row)
+
+    def _unbind_row(self, row):
+        if self._inventories[row] is not None:
+            self._inventories[row].bind_ledger(None)
+            self._inventories[row] = None
+        for column in self._columns.values():
+            column[row] = 0
+
+    def _read_row(self, row, entity):
+        self._unbind_row(row)
+        self._names[row] = entity.name
+        inventory = entity.inventory
+        self._inventories[row] = inventory
+        for item in inventory.items_list:
+            self._set_quantity(row, item.item_id, item.quantity)
+        inventory.bind_ledger(LedgerEntry(self, row))
+
+    def _set_quantity(self, row, item_id, quantity):
+        column = self._columns.get(item_id)
+        if column is None:
+            column = [0] * len(self._keys)
+            self._columns[item_id] = column
+        column[row] = quantity
+
+    def _get_column(self, item_name):
+        self.refresh()
+        return self._columns.get(ITEM_NAMES.find_id(item_name), ())
+
+    def get_item_names(self):
+        self.refresh()
+        return [ITEM_NAMES.get_name(item_id) for item_id in self._columns]
+
+    def get_total(self, item_name, section=None):
+        """Quantity of an item in the inventories of the town (of a section)"""
+        column = self._get_column(item_name)
+        if section is None:
+            return sum(column)
+        return sum(
+            quantity
+            for (key, quantity) in zip(self._keys, column)
+            if key is not None and key[0] == section
+        )
+
+    def get_holders(self, item_name, section=None):
+        """(section, key) of the inventories with the item in stock"""
+        column = self._get_column(item_name)
+        return [
+            key
+            for (key, quantity) in zip(self._keys, column)
+            if quantity > 0 and (section is None or key[0] == section)
+        ]
+
+    def get_top_holders(self, item_name, n, section=None):
+        """((section, key), quantity) of the n inventories with the most of the item"""
+        column = self._get_column(item_name)
+        rows = [
+            row
+            for (row, quantity) in enumerate(column)
+            if quantity > 0 and (section is None or self._keys[row][0] == section)
+        ]
+        rows = heapq.nlargest(n, rows, key=column.__getitem__)
+        return [(self._keys[row], column[row]) for row in rows]
+
+    def get_stock_by_building_type(self, item_name):
+        """Quantity of an item in the buildings, by building name"""
+        column = self._get_column(item_name)
+        stock = {}
+        for (key, name, quantity) in zip(self._keys, self._names, column):
+            if key is not None and key[0] == "buildings":
+                stock[name] = stock.get(name, 0) + quantity
+        return stock
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+
+
+class NameRegistry:
+    """
+    Names interned to small integer ids, given in the order the names are seen
+    Ids of the names given at creation are the same in every process, the ids
+    of the other names depend on the order they are seen : they are not pickled
+    """
+
+    def __init__(self, names=()):
+        self._ids = {}  # Dict with name as key and id as value
+        self._names = []  # Name of each id
+        self._lock = threading.Lock()  # Names are registered by parallel batches
+        for name in names:
+            self.get_id(name)
+
+    def get_id(self, name) -> int:
+        """Id of the name, a new one if the name is not registered yet"""
+        name_id = self._ids.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._ids.get(name)
+                if name_id is None:
+                    name_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = name_id
+        return name_id
+
+    def find_id(self, name):
+        """Id of the name, None if the name is not registered"""
+        return self._ids.get(name)
+
+    def get_known_id(self, name) -> int:
+        """Id of the name, raise UnknownNameError if the name is not registered"""
+        name_id = self._ids.get(name)
+        if name_id is None:
+            raise UnknownNameError(name)
+        return name_id
+
+    def get_name(self, name_id):
+        return self._names[name_id]
+
+    def get_names(self):
+        return list(self._names)
+
+    def __contains__(self, name):
+        return name in self._ids
+
+    def __len__(self):
+        return len(self._names)
+
+
+class UnknownNameError(Exception):
+    def __init__(self, name):
+        Exception.__init__(self)
+        self.name = name
+        self.msg = "unknown name {!r}".format(self.name)
+
+
+ITEM_NAMES = NameRegistry(("wood", "plank", "coal", "gold", "stone", "iron", "rope"))
+TERRAIN_NAMES = NameRegistry(("grass", "water", "road", "sand"))
+BUILDING_NAMES = NameRegistry(
+    (
+        "lumberingconstruction",
+        "lumbering",
+        "sawmillconstruction",
+        "sawmill",
+        "goldmineconstruction",
+        "goldmine",
+        "houseconstruction",
+        "house",
+        "villa",
+        "cabane",
+    )
+)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import BatchResult, CommandBatch, TickStats
+from .command import ALL
+
+# Sections a command of unknown access reads and writes
+SECTIONS = ("players", "resources", "buildings")
+
+
+class WaveScheduler:
+    """
+    Split commands in waves of commands without conflict : a command is put in
+    the wave following the last one with a command writing what it reads or
+    accessing what it writes, so conflicting commands keep their order
+    """
+
+    def __init__(self):
+        self.waves = []
+        self._reads = {}  # Dict with (section, key) as key and last wave as value
+        self._writes = {}
+        self._section_reads = {}  # Dict with section as key and last wave as value
+        self._section_writes = {}
+
+    def add(self, index, access):
+        if access is None:
+            access = (set(), {(section, ALL) for section in SECTIONS})
+        (reads, writes) = access
+
+        wave = 0
+        for key in reads:
+            wave = max(wave, self._get_last_wave(key, False) + 1)
+        for key in writes:
+            wave = max(wave, self._get_last_wave(key, True) + 1)
+
+        if wave == len(self.waves):
+            self.waves.append([])
+        self.waves[wave].append(index)
+
+        for key in reads:
+            self._set_last_wave(key, wave, self._reads, self._section_reads)
+        for key in writes:
+            self._set_last_wave(key, wave, self._writes, self._section_writes)
+        return wave
+
+    def _get_last_wave(self, key, write):
+        """Last wave with an access conflicting with a read (or a write) of key"""
+        (section, _) = key
+        maps = [self._writes]
+        section_maps = [self._section_writes]
+        if write:
+            maps.append(self._reads)
+            section_maps.append(self._section_reads)
+
+        last_wave = -1
+        for access_map in maps:
+            last_wave = max(last_wave, access_map.get(key, -1))
+            last_wave = max(last_wave, access_map.get((section, ALL), -1))
+        if key[1] is ALL:
+            for section_map in section_maps:
+                last_wave = max(last_wave, section_map.get(section, -1))
+        return last_wave
+
+    @staticmethod
+    def _set_last_wave(key, wave, access_map, section_map):
+        access_map[key] = max(access_map.get(key, -1), wave)
+        section_map[key[0]] = max(section_map.get(key[0], -1), wave)
+
+
+class ParallelCommandBatch(CommandBatch):
+    """
+    CommandBatch running the checks of the commands without conflict at the same
+    time on a pool of threads (see ServerCommand.get_access and WaveScheduler),
+    the commands of a wave passing their checks are then done one by one
+    Commands are done wave by wave : conflicting commands keep their batch order,
+    so the town and the check results are the same as after the serial
+    CommandBatch, but BatchResult.order and the journal order may differ
+    Threads only run in parallel on a free-threaded Python build
+    A chunked town loads regions while checking : its batches are run serially
+    """
+
+    def __init__(
+        self,
+        town,
+        commands=(),
+        fail_fast=False,
+        journal=None,
+        executor: ThreadPoolExecutor = None,
+    ):
+        CommandBatch.__init__(self, town, commands, fail_fast, journal)
+        self.executor = executor
+
+    def get_waves(self):
+        """Indexes of the commands of each wave, in execution order"""
+        scheduler = WaveScheduler()
+        for index in self.get_order():
+            scheduler.add(index, self.commands[index].get_access())
+        return scheduler.waves
+
+    def execute(self, tick=None) -> BatchResult:
+        if self.executor is None or self.town.regions is not None:
+            return CommandBatch.execute(self, tick)
+
+        stats = TickStats(tick)
+        errors = {}
+        order = []
+        players = {}  # Dict with client_id as key
+
+        start = time.perf_counter()
+        waves = self.get_waves()
+        for wave in waves:
+            commands = [self.commands[index] for index in wave]
+            for command in commands:
+                self._resolve(command, players)
+
+            check_errors = list(self.executor.map(self._check, commands))
+            for (index, command, error) in zip(wave, commands, check_errors):
+                if error is None:
+                    error = self._do(command)
+                self._count(stats, index, error, errors)
+            order.extend(wave)
+
+        stats.duration = time.perf_counter() - start
+        stats.waves_nb = len(waves)
+        return BatchResult(self.commands, order, errors, stats)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import CommandBatch
+from .command import CommandsFactory
+from .parallel import ParallelCommandBatch
+
+
+class ClientChannel:
+    """
+    Messages of a client waiting in the pipeline : raw messages are decoded
+    by the decode task of the client into commands waiting to be applied
+    Both queues are bounded, so a client sending faster than the town applies
+    its commands waits in CommandPipeline.submit
+    """
+
+    def __init__(self, client_id, queue_size):
+        self.client_id = client_id
+        self.messages = asyncio.Queue(queue_size)
+        self.commands = asyncio.Queue(queue_size)
+        self.decode_task = None
+        self.rejected_nb = 0  # Messages which couldn't be decoded
+
+
+class CommandPipeline:
+    """
+    asyncio pipeline from the messages of the clients to the town :
+    submit -> decode (CommandsFactory.from_podsixnet) -> apply (CommandBatch)
+    -> send(client_id, command.to_podsixnet())
+    Each round, the apply task takes one command of each client in turn, up to
+    batch_size commands, so a busy client can't delay the others
+    Batches run on a single worker thread, so the town is modified by one thread
+    at a time while the event loop keeps decoding and sending : the town must
+    not be modified from the event loop while the pipeline runs
+    With an executor, the batches are ParallelCommandBatch
+    A batch raising (an error of the journal) stops the pipeline : the commands
+    left are dropped and close raises the error
+    The pipeline is used from its event loop : start it, then add the clients
+    """
+
+    def __init__(
+        self,
+        town,
+        send,
+        queue_size=64,
+        batch_size=1024,
+        fail_fast=False,
+        journal=None,
+        executor=None,
+    ):
+        self.town = town
+        self.send = send  # Coroutine function of (client_id, podsixnet_dict)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.fail_fast = fail_fast
+        self.journal = journal
+        self.executor = executor
+        self.on_batch = None  # Called with the BatchResult of each batch
+
+        self._channels = {}  # Dict with client_id as key
+        self._next_client = 0  # Index of the first client of the next round
+        self._ready = None  # Event set when a command is decoded
+        self._apply_task = None
+        self._worker = None  # ThreadPoolExecutor running the batches
+        self._closing = False
+        self._error = None  # Error of the batch which stopped the pipeline
+
+    @property
+    def running(self):
+        return self._apply_task is not None
+
+    def start(self):
+        """Start the apply task, has to be called in the running event loop"""
+        self._ready = asyncio.Event()
+        self._closing = False
+        self._error = None
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._apply_task = asyncio.ensure_future(self._apply())
+        for channel in self._channels.values():
+            self._start_channel(channel)
+
+    def add_client(self, client_id) -> ClientChannel:
+        if client_id in self._channels:
+            return self._channels[client_id]
+
+        channel = ClientChannel(client_id, self.queue_size)
+        self._channels[client_id] = channel
+        if self.running:
+            self._start_channel(channel)
+        return channel
+
+    def remove_client(self, client_id):
+        """Forget the client and the messages it sent which are not applied"""
+        channel = self._channels.pop(client_id)
+        if channel.decode_task is not None:
+            channel.decode_task.cancel()
+
+    def _start_channel(self, channel: ClientChannel):
+        channel.decode_task = asyncio.ensure_future(self._decode(channel))
+
+    async def submit(self, client_id, message):
+        """Queue a message of the client, wait while its queue is full"""
+        if self._closing:
+            raise PipelineClosedError()
+        await self.add_client(client_id).messages.put(message)
+
+    def submit_nowait(self, client_id, message):
+        """Queue a message of the client, raise asyncio.QueueFull if it is full"""
+        if self._closing:
+            raise PipelineClosedError()
+        self.add_client(client_id).messages.put_nowait(message)
+
+    async def _decode(self, channel: ClientChannel):
+        while True:
+            message = await channel.messages.get()
+            try:
+                command = self.decode(channel.client_id, message)
+            except Exception:
+                logging.exception("message of {} rejected".format(channel.client_id))
+                channel.rejected_nb += 1
+                channel.messages.task_done()
+                continue
+
+            await channel.commands.put(command)
+            channel.messages.task_done()
+            self._ready.set()
+
+    @staticmethod
+    def decode(client_id, message):
+        """Command of the message, sent by client_id whatever the message says"""
+        podsixnet_dict = dict(message)
+        podsixnet_dict["client_id"] = client_id
+        podsixnet_dict["check_result"] = {"msg": ""}
+        return CommandsFactory.from_podsixnet(podsixnet_dict)
+
+    def _take_round(self):
+        """Commands of the next round, one by client in turn"""
+        channels = list(self._channels.values())
+        commands = []
+        if not channels:
+            return commands
+
+        start = self._next_client % len(channels)
+        channels = channels[start:] + channels[:start]
+        while len(commands) < self.batch_size:
+            taken_nb = len(commands)
+            for (i, channel) in enumerate(channels):
+                if len(commands) >= self.batch_size:
+                    # The next round starts with the clients not served
+                    self._next_client = start + i
+                    return commands
+                if not channel.commands.empty():
+                    commands.append((channel, channel.commands.get_nowait()))
+            if len(commands) == taken_nb:
+                break
+        self._next_client = start + 1
+        return commands
+
+    async def _apply(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._ready.clear()
+            commands = self._take_round()
+            if not commands:
+                await self._ready.wait()
+                continue
+
+            if self.executor is not None:
+                batch = ParallelCommandBatch(
+                    self.town,
+                    [command for (_, command) in commands],
+                    self.fail_fast,
+                    self.journal,
+                    self.executor,
+                )
+            else:
+                batch = CommandBatch(
+                    self.town,
+                    [command for (_, command) in commands],
+                    self.fail_fast,
+                    self.journal,
+                )
+            if self._error is None:
+                try:
+                    result = await loop.run_in_executor(
+                        self._worker, batch.execute, self.town.tick
+                    )
+                except Exception as error:
+                    logging.exception("command pipeline stopped")
+                    self._error = error
+                    self._closing = True
+            if self._error is not None:
+                # The commands of a stopped pipeline are dropped, so close returns
+                for (channel, _) in commands:
+                    channel.commands.task_done()
+                continue
+
+            if self.on_batch is not None:
+                self.on_batch(result)
+
+            for (channel, command) in commands:
+                try:
+                    await self.send(channel.client_id, command.to_podsixnet())
+                except Exception:
+                    logging.exception("result to {} not sent".format(channel.client_id))
+                channel.commands.task_done()
+
+            # Let the clients and the decode tasks run between two batches
+            await asyncio.sleep(0)
+
+    async def close(self, drain=True):
+        """
+        Stop accepting messages and stop the tasks, after the messages already
+        submitted are applied and their results sent if drain
+        Without drain, the batch being run is finished but its results not sent
+        Raise the error which stopped the pipeline if any
+        """
+        self._closing = True
+        if drain and self.running:
+            for channel in list(self._channels.values()):
+                await channel.messages.join()
+                await channel.commands.join()
+
+        tasks = [self._apply_task]
+        for channel in self._channels.values():
+            tasks.append(channel.decode_task)
+            channel.decode_task = None
+        self._apply_task = None
+
+        tasks = [task for task in tasks if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._worker is not None:
+            self._worker.shutdown()
+            self._worker = None
+        if self._error is not None:
+            raise self._error
+
+
+class PipelineClosedError(Exception):
+    def __init__(self):
+        Exception.__init__(self)
+        self.msg = "the command pipeline is closed"
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import math
+
+from .scheduler import EventScheduler
+
+
+def regenerate_once(value, regen, value_limit):
+    """Value after one regeneration, see PlayerStatus.regenerate"""
+    if value + regen < 0:
+        return 0
+    if value + regen <= value_limit:
+        return value + regen
+    return value_limit
+
+
+def regenerate_value(value, regen, value_limit, ticks):
+    """Value after ticks regenerations with a constant limit"""
+    if ticks <= 0:
+        return value
+
+    # After the first regeneration, 0 <= value <= value_limit
+    value = regenerate_once(value, regen, value_limit)
+    if regen >= 0:
+        return min(value + (ticks - 1) * regen, value_limit)
+    return max(value + (ticks - 1) * regen, 0)
+
+
+def get_ticks_to(value, regen, value_limit, target):
+    """
+    Number of regenerations for the value to go down (regen < 0) or up
+    (regen > 0) to target, None if it never does
+    """
+    if regen == 0:
+        return None
+
+    value = regenerate_once(value, regen, value_limit)
+    if regen < 0:
+        if value <= target:
+            return 1
+        if target < 0:
+            return None
+        return 1 + math.ceil((value - target) / -regen)
+
+    if value >= target:
+        return 1
+    if target > value_limit:
+        return None
+    return 1 + math.ceil((target - value) / regen)
+
+
+def regenerate_bounded_value(value, regen, value_max, bound, ticks):
+    """
+    Value after ticks regenerations, limited after k regenerations by
+    min(value_max, value of bound after k regenerations), as energy by hunger
+    bound is the (value, regen, value_limit) of the bounding status
+    """
+    if ticks <= 0:
+        return value
+
+    def get_limit(k):
+        return min(value_max, regenerate_value(*bound, k))
+
+    value = regenerate_once(value, regen, get_limit(1))
+    if ticks == 1:
+        return value
+
+    # The next regenerations give max(0, min(value + (ticks - 1) * regen,
+    # L_k + (ticks - k) * regen for 2 <= k <= ticks)). L_k is linear in k before
+    # and after the bound reaches 0 or its limit, so the min is at those ends.
+    candidates = {2, ticks}
+    bound_regen = bound[1]
+    if bound_regen != 0:
+        target = 0 if bound_regen < 0 else bound[2]
+        breakpoint = get_ticks_to(*bound, target)
+        if breakpoint is not None:
+            for k in (breakpoint - 1, breakpoint):
+                if 2 <= k <= ticks:
+                    candidates.add(k)
+    limit = min(get_limit(k) + (ticks - k) * regen for k in candidates)
+
+    return max(0, min(value + (ticks - 1) * regen, limit))
+
+
+class LazyPlayerStatuses:
+    """
+    Health, hunger and energy of a player computed when read, in closed form
+    from their values at the last update, instead of regenerated at each tick
+    clock is an object with a tick attribute, ex : the town
+    Regenerations are tracked changes when computed, not at each tick
+    last_update is the tick of the values of the statuses (clock.tick by default)
+    The crossings of thresholds are scheduled as events given to on_event
+    with (player, event) : "hunger_empty" and "energy_full"
+    """
+
+    def __init__(
+        self,
+        player,
+        clock,
+        scheduler: EventScheduler = None,
+        on_event=None,
+        last_update=None,
+    ):
+        self.player = player
+        self.clock = clock
+        self.scheduler = scheduler
+        self.on_event = on_event
+
+        self.last_update = clock.tick if last_update is None else last_update
+        self._events = []
+
+        for status in self._get_statuses():
+            status._lazy = self
+        self.schedule_events()
+
+    def _get_statuses(self):
+        return (self.player.health, self.player.hunger, self.player.energy)
+
+    def update(self):
+        """Set the statuses to their values at the current tick"""
+        ticks = self.clock.tick - self.last_update
+        if ticks <= 0:
+            return
+
+        # Touched before last_update changes : a snapshot keeps the values and
+        # the tick of the previous update
+        self.player._touch()
+
+        # Statuses are read at the last update from now on
+        self.last_update = self.clock.tick
+        (health, hunger, energy) = self._get_statuses()
+
+        health_value = regenerate_value(
+            health.value, health.regen, health.value_limit, ticks
+        )
+        hunger_bound = (hunger.value, hunger.regen, hunger.value_limit)
+        hunger_value = regenerate_value(*hunger_bound, ticks)
+        energy_value = regenerate_bounded_value(
+            energy.value, energy.regen, energy.value_max, hunger_bound, ticks
+        )
+
+        health._settle(health_value, health.value_limit)
+        hunger._settle(hunger_value, hunger.value_limit)
+        energy._settle(energy_value, min(energy.value_max, hunger_value))
+
+    def release(self):
+        """Give back the statuses their values at the current tick"""
+        self.update()
+        self._cancel_events()
+        for status in self._get_statuses():
+            status._lazy = None
+
+    def _cancel_events(self):
+        for event in self._events:
+            event.cancel()
+        self._events = []
+
+    def schedule_events(self):
+        """Predict the next crossings of thresholds, called on every modification"""
+        self._cancel_events()
+        if self.scheduler is None:
+            return
+
+        ticks = self._get_ticks_to_hunger_empty()
+        if ticks is not None:
+            self._schedule(ticks, "hunger_empty")
+        ticks = self._get_ticks_to_energy_full()
+        if ticks is not None:
+            self._schedule(ticks, "energy_full")
+
+    def _schedule(self, ticks, event):
+        def fire():
+            self._fire(event)
+
+        self._events.append(self.scheduler.schedule(self.clock.tick + ticks, fire))
+
+    def _get_ticks_to_hunger_empty(self):
+        hunger = self.player.hunger
+        if hunger.value <= 0 or hunger.regen >= 0:
+            return None
+        return get_ticks_to(hunger.value, hunger.regen, hunger.value_limit, 0)
+
+    def _get_ticks_to_energy_full(self):
+        (_, hunger, energy) = self._get_statuses()
+        if energy.value >= energy.value_max or energy.regen <= 0:
+            return None
+
+        # A lower bound when hunger limits energy, checked when fired
+        ticks = get_ticks_to(
+            energy.value, energy.regen, energy.value_max, energy.value_max
+        )
+        if hunger.value < energy.value_max:
+            if hunger.regen <= 0:
+                return None
+            hunger_ticks = get_ticks_to(
+                hunger.value, hunger.regen, hunger.value_limit, energy.value_max
+            )
+            if hunger_ticks is None:
+                return None
+            ticks = max(ticks, hunger_ticks)
+        return ticks
+
+    def _fire(self, event):
+        self.update()
+        (_, hunger, energy) = self._get_statuses()
+        if event == "hunger_empty":
+            reached = hunger.value <= 0
+            ticks = self._get_ticks_to_hunger_empty()
+        else:
+            reached = energy.value >= energy.value_max
+            ticks = self._get_ticks_to_energy_full()
+
+        if reached:
+            self.player._touch()
+            if self.on_event is not None:
+                self.on_event(self.player, event)
+        elif ticks is not None:
+            self._schedule(ticks, event)
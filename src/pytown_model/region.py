@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import os
+from collections.abc import MutableMapping
+
+from .entity import BackgroundCreator
+from .grid import BackgroundGrid
+from .snapshot import LayersSnapshot, SnapshotReader, read_layers
+
+
+def generate_grass_region(region):
+    region.backgrounds.fill(BackgroundCreator().create_grass_backgound())
+
+
+class Region:
+    """
+    Square part of a chunked town
+    Hold the backgrounds, resources, buildings and characters of its tiles
+    """
+
+    LAYERS = ("backgrounds", "resources", "buildings", "characters")
+
+    def __init__(self, key, origin, size):
+        self.key = key
+        self.origin = origin
+        self.size = size
+
+        self.backgrounds = BackgroundGrid(size[0], size[1], origin)
+        self.resources = {}  # Dict with (x,y) as key
+        self.buildings = {}
+        self.characters = {}
+
+    def __repr__(self):
+        return "Region {} at {}".format(self.key, self.origin)
+
+    def get_meta(self):
+        meta = {}
+        meta["key"] = list(self.key)
+        meta["origin"] = list(self.origin)
+        meta["size"] = list(self.size)
+        return meta
+
+    def get_snapshot(self, tracker=None) -> LayersSnapshot:
+        """Snapshot of the layers, copied on write when tracker is given"""
+        return LayersSnapshot(self.get_meta(), self, self.LAYERS, tracker)
+
+    @classmethod
+    def read(cls, file_name) -> Region:
+        with SnapshotReader(file_name) as reader:
+            meta = reader.read_json("meta")
+            region = cls(tuple(meta["key"]), tuple(meta["origin"]), tuple(meta["size"]))
+            read_layers(region, reader, meta, cls.LAYERS)
+        return region
+
+
+class RegionManager:
+    """
+    Split a town board in regions of region_size x region_size tiles
+    A region is created by the generator or loaded from directory on first access
+    and can be evicted to directory to free memory
+    """
+
+    def __init__(
+        self,
+        name,
+        width,
+        height,
+        region_size=32,
+        directory=".",
+        generator=generate_grass_region,
+    ):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.region_size = region_size
+        self.directory = directory
+        self.generator = generator
+
+        self.regions = {}  # Loaded regions with (rx,ry) as key
+        self.on_load = None  # Called with each region created or loaded
+
+    def get_region_key(self, tile):
+        (x, y) = tile
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return (x // self.region_size, y // self.region_size)
+        raise KeyError(tile)
+
+    def get_region_keys(self):
+        for ry in range((self.height - 1) // self.region_size + 1):
+            for rx in range((self.width - 1) // self.region_size + 1):
+                yield (rx, ry)
+
+    def get_region(self, tile) -> Region:
+        return self.get_region_by_key(self.get_region_key(tile))
+
+    def get_region_by_key(self, key) -> Region:
+        if key in self.regions:
+            return self.regions[key]
+
+        region = self._load_region(key)
+        self.regions[key] = region
+        if self.on_load is not None:
+            self.on_load(region)
+        return region
+
+    def is_loaded(self, key):
+        return key in self.regions
+
+    def get_region_file_name(self, key):
+        return os.path.join(
+            self.directory, "{}_{}_{}.region".format(self.name, key[0], key[1])
+        )
+
+    def _load_region(self, key) -> Region:
+        file_name = self.get_region_file_name(key)
+        if os.path.exists(file_name):
+            logging.info("region {} loaded".format(key))
+            return Region.read(file_name)
+
+        origin = (key[0] * self.region_size, key[1] * self.region_size)
+        size = (
+            min(self.region_size, self.width - origin[0]),
+            min(self.region_size, self.height - origin[1]),
+        )
+        region = Region(key, origin, size)
+        self.generator(region)
+        return region
+
+    def save_region(self, key):
+        self.regions[key].get_snapshot().write(self.get_region_file_name(key))
+
+    def unload_regions(self):
+        """Forget the loaded regions, they are loaded again from directory"""
+        self.regions = {}
+
+    def evict_region(self, key):
+        self.save_region(key)
+        del self.regions[key]
+        logging.info("region {} evicted".format(key))
+
+    def evict_regions(self, keys_to_keep):
+        for key in list(self.regions):
+            if key not in keys_to_keep:
+                self.evict_region(key)
+
+
+class RegionLayer(MutableMapping):
+    """
+    Dict-like view on one layer (backgrounds, resources, ...) of all the regions
+    Iterating over it loads every region of the town
+    """
+
+    def __init__(self, region_manager: RegionManager, layer):
+        self._region_manager = region_manager
+        self._layer = layer
+
+    def _get_layer(self, tile):
+        return getattr(self._region_manager.get_region(tile), self._layer)
+
+    def __getitem__(self, tile):
+        return self._get_layer(tile)[tile]
+
+    def __setitem__(self, tile, entity):
+        self._get_layer(tile)[tile] = entity
+
+    def __delitem__(self, tile):
+        del self._get_layer(tile)[tile]
+
+    def __contains__(self, tile):
+        try:
+            return tile in self._get_layer(tile)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+    def __iter__(self):
+        for key in self._region_manager.get_region_keys():
+            region = self._region_manager.get_region_by_key(key)
+            yield from list(getattr(region, self._layer))
+
+    def __len__(self):
+        length = 0
+        for key in self._region_manager.get_region_keys():
+            region = self._region_manager.get_region_by_key(key)
+            length += len(getattr(region, self._layer))
+        return length
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+
+
+class ScheduledEvent:
+
+    __slots__ = ("tick", "callback", "cancelled")
+
+    def __init__(self, tick, callback):
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventScheduler:
+    """
+    Callbacks to call at a given tick, kept in a heap ordered by tick
+    Cancelled events stay in the heap until their tick is reached
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()  # Keep the scheduling order at same tick
+
+    def schedule(self, tick, callback) -> ScheduledEvent:
+        event = ScheduledEvent(tick, callback)
+        heapq.heappush(self._heap, (tick, next(self._counter), event))
+        return event
+
+    def run_until(self, tick):
+        """Call the callbacks of the events scheduled at tick or before"""
+        while self._heap and self._heap[0][0] <= tick:
+            event = heapq.heappop(self._heap)[2]
+            if not event.cancelled:
+                event.callback()
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from abc import ABCMeta
+
+from pytown_core.serializers import IJSONSerializable
+
+
+def json_serializable(cls):
+    """
+    Class decorator registering a slotted class as a virtual IJSONSerializable
+    IJSONSerializable declares no __slots__ : inheriting it would give a __dict__
+    to every instance whatever the __slots__ of the class
+    """
+    if isinstance(IJSONSerializable, ABCMeta):
+        IJSONSerializable.register(cls)
+    return cls
+
+
+def get_slots_state(obj):
+    """
+    Pickle state of an object with __slots__ : (__dict__ or None, slots values)
+    Values of the slots of all the classes of obj, unset slots are skipped
+    """
+    slots = {}
+    for cls in type(obj).__mro__:
+        for name in cls.__dict__.get("__slots__", ()):
+            if name in ("__dict__", "__weakref__") or name in slots:
+                continue
+            try:
+                slots[name] = getattr(obj, name)
+            except AttributeError:
+                pass
+    return (getattr(obj, "__dict__", None) or None, slots)
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+
+from .buildings import Building
+from .characters import Character, Player
+from .entity import Background, Resource
+from .grid import BackgroundGrid
+from .regeneration import LazyPlayerStatuses
+
+# Snapshot file layout :
+#   header : magic, format version, number of sections
+#   table : for each section, its name, offset and length in the file
+#   blocks : "meta" and "palette" (json), "backgrounds" (raw array of codes),
+#            "resources", "buildings", "characters", "players" (json)
+# The regions of a chunked town are saved in files of the same layout
+
+MAGIC = b"PYTOWN\x00\x00"
+FORMAT_VERSION = 1
+SECTIONS = ("backgrounds", "resources", "buildings", "characters", "players")
+
+_HEADER = struct.Struct("<8sHH")
+_SECTION_ENTRY = struct.Struct("<16sQQ")
+_ALIGNMENT = 8  # Blocks are aligned to be mapped as arrays
+
+
+class SnapshotWriter:
+    def __init__(self):
+        self._sections = []  # List of (name, bytes-like data)
+
+    def add_section(self, name, data):
+        self._sections.append((name, memoryview(data).cast("B")))
+
+    def add_json_section(self, name, json_object):
+        data = json.dumps(json_object, separators=(",", ":")).encode("utf-8")
+        self.add_section(name, data)
+
+    def write(self, file_name):
+        offset = _HEADER.size + _SECTION_ENTRY.size * len(self._sections)
+        table = []
+        paddings = []
+        for (name, data) in self._sections:
+            padding = -offset % _ALIGNMENT
+            offset += padding
+            table.append(_SECTION_ENTRY.pack(name.encode("ascii"), offset, len(data)))
+            paddings.append(padding)
+            offset += len(data)
+
+        # Never leave a half written snapshot in place of the previous one
+        tmp_file_name = file_name + ".tmp"
+        with open(tmp_file_name, "wb") as snapshot_file:
+            snapshot_file.write(
+                _HEADER.pack(MAGIC, FORMAT_VERSION, len(self._sections))
+            )
+            snapshot_file.write(b"".join(table))
+            for ((name, data), padding) in zip(self._sections, paddings):
+                snapshot_file.write(bytes(padding))
+                snapshot_file.write(data)
+        os.replace(tmp_file_name, file_name)
+
+
+class SnapshotReader:
+    def __init__(self, file_name, use_mmap=False):
+        self._file = open(file_name, "rb")
+        try:
+            self._read_table()
+            self._mmap = None
+            if use_mmap:
+                self._mmap = mmap.mmap(
+                    self._file.fileno(), 0, access=mmap.ACCESS_COPY
+                )
+        except Exception:
+            self._file.close()
+            raise
+
+    def _read_table(self):
+        try:
+            (magic, version, count) = _HEADER.unpack(self._file.read(_HEADER.size))
+        except struct.error:
+            raise SnapshotError(self._file.name, "truncated header")
+        if magic != MAGIC:
+            raise SnapshotError(self._file.name, "not a pytown snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotError(
+                self._file.name, "unsupported format version {}".format(version)
+            )
+
+        self._sections = {}  # Dict with name as key and (offset, length) as value
+        for _ in range(count):
+            (name, offset, length) = _SECTION_ENTRY.unpack(
+                self._file.read(_SECTION_ENTRY.size)
+            )
+            self._sections[name.rstrip(b"\x00").decode("ascii")] = (offset, length)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # The map stays alive as long as a section read from it is used
+        self._file.close()
+
+    def has_section(self, name):
+        return name in self._sections
+
+    def read_section(self, name):
+        if name not in self._sections:
+            raise SnapshotError(self._file.name, "no {} section".format(name))
+
+        (offset, length) = self._sections[name]
+        if self._mmap is not None:
+            return memoryview(self._mmap)[offset : offset + length]
+
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def read_json(self, name):
+        return json.loads(bytes(self.read_section(name)).decode("utf-8"))
+
+
+def build_background_grid(backgrounds: dict) -> BackgroundGrid:
+    """Grid of a dict of backgrounds with (x,y) as key, sized like Town.get_size"""
+    w = max((x for (x, _) in backgrounds), default=0) + 1
+    h = max((y for (_, y) in backgrounds), default=0) + 1
+    grid = BackgroundGrid(w, h)
+    for tile in backgrounds:
+        grid[tile] = backgrounds[tile]
+    return grid
+
+
+class LayersSnapshot:
+    """
+    Point in time view of the layers (backgrounds, resources, ...) of a town or
+    a region, cheap to take and writable from another thread
+    The backgrounds codes are copied and the entities dicts shallow copied.
+    Backgrounds without BackgroundGrid have their dict shallow copied too
+    (O(tiles) on the calling thread), the grid is built from the copy on write.
+    Entities are serialized on write, except the ones about to be modified after
+    the snapshot : the tracker makes them serialized first (copy on write).
+    Only the given sections are kept (see SECTIONS)
+    """
+
+    def __init__(self, meta, layers, sections=SECTIONS, tracker=None):
+        self.meta = meta
+        self.meta["byteorder"] = sys.byteorder
+
+        self.palette = None
+        self.codes = None
+        self._backgrounds = None  # Copy of a backgrounds dict until written
+        if "backgrounds" in sections:
+            backgrounds = layers.backgrounds
+            if isinstance(backgrounds, BackgroundGrid):
+                self._copy_grid(backgrounds)
+            else:
+                # Backgrounds are immutable, copying the dict is enough
+                self._backgrounds = dict(backgrounds)
+
+        self._entities = {}
+        for section in ("resources", "buildings", "characters", "players"):
+            if section in sections:
+                self._entities[section] = dict(getattr(layers, section))
+        self._serialized = {section: {} for section in self._entities}
+
+        self._lock = threading.Lock()
+        self._tracker = tracker
+        if self._tracker is not None:
+            self._tracker.listeners.append(self._on_touch)
+
+    def _copy_grid(self, grid: BackgroundGrid):
+        self.meta["width"] = grid.width
+        self.meta["height"] = grid.height
+        self.meta["origin"] = list(grid.origin)
+        self.meta["count"] = len(grid)
+        self.meta["typecode"] = grid.typecode
+        self.palette = [background.to_json_dict() for background in grid.table[1:]]
+        self.codes = array(grid.typecode, grid.codes)
+
+    def _on_touch(self, section, key):
+        if section in self._entities:
+            self._serialize(section, key)
+
+    def _serialize(self, section, key):
+        with self._lock:
+            serialized = self._serialized[section]
+            if key not in serialized and key in self._entities[section]:
+                entity = self._entities[section][key]
+                if section == "buildings":
+                    serialized[key] = entity.to_json_dict(next_states=True)
+                elif section == "players":
+                    serialized[key] = entity.to_json_dict(statuses_tick=True)
+                else:
+                    serialized[key] = entity.to_json_dict()
+            return serialized.get(key)
+
+    def _encode_tiles(self, section):
+        return [
+            [list(tile), self._serialize(section, tile)]
+            for tile in self._entities[section]
+        ]
+
+    def release(self):
+        if self._tracker is not None and self._on_touch in self._tracker.listeners:
+            self._tracker.listeners.remove(self._on_touch)
+
+    def write(self, file_name):
+        try:
+            writer = self._get_writer()
+        finally:
+            self.release()
+
+        writer.write(file_name)
+
+    def _get_writer(self) -> SnapshotWriter:
+        if self._backgrounds is not None:
+            self._copy_grid(build_background_grid(self._backgrounds))
+            self._backgrounds = None
+
+        writer = SnapshotWriter()
+        writer.add_json_section("meta", self.meta)
+        if self.codes is not None:
+            writer.add_json_section("palette", self.palette)
+            writer.add_section("backgrounds", self.codes)
+
+        for section in ("resources", "buildings", "characters"):
+            if section in self._entities:
+                writer.add_json_section(section, self._encode_tiles(section))
+        if "players" in self._entities:
+            writer.add_json_section(
+                "players",
+                [
+                    self._serialize("players", player_id)
+                    for player_id in self._entities["players"]
+                ],
+            )
+        return writer
+
+
+class TownSnapshot(LayersSnapshot):
+    """
+    Snapshot of a town, see LayersSnapshot
+    A chunked town keeps its players, its loaded regions have their own snapshot
+    written to their region files : the regions not loaded are already saved
+    """
+
+    def __init__(self, town, sections=SECTIONS):
+        self._region_manager = town.regions
+        self._region_snapshots = {}  # Dict with region key as key
+        if self._region_manager is not None:
+            sections = [section for section in sections if section == "players"]
+            for (key, region) in self._region_manager.regions.items():
+                self._region_snapshots[key] = region.get_snapshot()
+
+        meta = {}
+        meta["name"] = town.name
+        meta["version"] = town.tracker.version
+        meta["tick"] = town.tick
+        if "backgrounds" not in sections:
+            (meta["width"], meta["height"]) = town.get_size()
+        LayersSnapshot.__init__(self, meta, town, sections, town.tracker)
+
+    def _on_touch(self, section, key):
+        LayersSnapshot._on_touch(self, section, key)
+        if self._region_snapshots and section != "players":
+            region_snapshot = self._region_snapshots.get(
+                self._region_manager.get_region_key(key)
+            )
+            if region_snapshot is not None:
+                region_snapshot._on_touch(section, key)
+
+    def write(self, file_name):
+        try:
+            writers = [
+                (self._region_manager.get_region_file_name(key), snapshot._get_writer())
+                for (key, snapshot) in self._region_snapshots.items()
+            ]
+            writers.append((file_name, self._get_writer()))
+        finally:
+            self.release()
+
+        for (writer_file_name, writer) in writers:
+            writer.write(writer_file_name)
+
+
+def write_snapshot(town, file_name, sections=SECTIONS):
+    TownSnapshot(town, sections).write(file_name)
+
+
+def read_snapshot(town, file_name, sections=None, use_mmap=False):
+    """
+    Fill town with the sections read from file_name (all the saved ones by default)
+    With use_mmap, the backgrounds codes are mapped from the file instead of read
+    """
+    with SnapshotReader(file_name, use_mmap) as reader:
+        meta = reader.read_json("meta")
+        town.name = meta["name"]
+        town.tracker.version = meta["version"]
+        town.tick = meta.get("tick", 0)
+        read_layers(town, reader, meta, sections, use_mmap)
+
+    return town
+
+
+def read_layers(layers, reader: SnapshotReader, meta, sections=None, use_mmap=False):
+    """Set the sections (all the saved ones by default) of layers, a town or region"""
+    if sections is None:
+        sections = [section for section in SECTIONS if reader.has_section(section)]
+
+    if "backgrounds" in sections:
+        table = [None]
+        for background in reader.read_json("palette"):
+            table.append(Background.from_json_dict(background))
+
+        data = reader.read_section("backgrounds")
+        if use_mmap and meta["byteorder"] == sys.byteorder:
+            codes = data.cast(meta["typecode"])
+        else:
+            codes = array(meta["typecode"])
+            codes.frombytes(data)
+            if meta["byteorder"] != sys.byteorder:
+                codes.byteswap()
+
+        layers.backgrounds = BackgroundGrid.from_codes(
+            meta["width"],
+            meta["height"],
+            table,
+            codes,
+            meta["count"],
+            tuple(meta.get("origin", (0, 0))),
+        )
+
+    if "resources" in sections:
+        layers.resources = {}
+        for (tile, resource) in reader.read_json("resources"):
+            layers.resources[tuple(tile)] = Resource.from_json_dict(resource)
+
+    if "buildings" in sections:
+        layers.buildings = {}
+        for (tile, building) in reader.read_json("buildings"):
+            layers.buildings[tuple(tile)] = Building.from_json_dict(building)
+
+    if "characters" in sections:
+        layers.characters = {}
+        for (tile, character) in reader.read_json("characters"):
+            layers.characters[tuple(tile)] = Character.from_json_dict(character)
+
+    if "players" in sections:
+        layers.players = {}
+        for player_dict in reader.read_json("players"):
+            player = Player.from_json_dict(player_dict)
+            if "statuses_tick" in player_dict:
+                # Lazy statuses are regenerated up to the tick of the snapshot
+                LazyPlayerStatuses(
+                    player, layers, last_update=player_dict["statuses_tick"]
+                ).release()
+            layers.players[player.player_id] = player
+
+
+class SnapshotError(Exception):
+    def __init__(self, file_name, reason):
+        Exception.__init__(self)
+        self.file_name = file_name
+        self.reason = reason
+        self.msg = "{} can't be read : {}".format(self.file_name, self.reason)
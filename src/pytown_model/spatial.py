@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+
+class TileBucketIndex:
+    """
+    Set of tiles grouped in square buckets of bucket_size x bucket_size tiles
+    to find the tiles inside a rectangle without scanning all of them
+    """
+
+    def __init__(self, bucket_size=16):
+        self.bucket_size = bucket_size
+        self._buckets = {}  # Dict with (bx,by) as key and set of (x,y) as value
+
+    def _get_bucket_key(self, tile):
+        return (tile[0] // self.bucket_size, tile[1] // self.bucket_size)
+
+    def add(self, tile):
+        self._buckets.setdefault(self._get_bucket_key(tile), set()).add(tile)
+
+    def discard(self, tile):
+        key = self._get_bucket_key(tile)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.discard(tile)
+            if not bucket:
+                del self._buckets[key]
+
+    def clear(self):
+        self._buckets = {}
+
+    def query(self, x0, y0, x1, y1):
+        """Tiles (x,y) with x0 <= x <= x1 and y0 <= y <= y1"""
+        tiles = []
+        (bx0, by0) = self._get_bucket_key((x0, y0))
+        (bx1, by1) = self._get_bucket_key((x1, y1))
+
+        # Scan the smallest between the buckets of the rectangle and the used ones
+        if (bx1 - bx0 + 1) * (by1 - by0 + 1) <= len(self._buckets):
+            buckets = (
+                self._buckets[(bx, by)]
+                for by in range(by0, by1 + 1)
+                for bx in range(bx0, bx1 + 1)
+                if (bx, by) in self._buckets
+            )
+        else:
+            buckets = (
+                bucket
+                for ((bx, by), bucket) in self._buckets.items()
+                if bx0 <= bx <= bx1 and by0 <= by <= by1
+            )
+
+        for bucket in buckets:
+            for tile in bucket:
+                if x0 <= tile[0] <= x1 and y0 <= tile[1] <= y1:
+                    tiles.append(tile)
+        tiles.sort()
+        return tiles
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self._buckets.values())
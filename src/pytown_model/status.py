@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+
+class StatusColumns:
+    """Statuses of the same kind stored column by column, one slot per status"""
+
+    __slots__ = ("values", "values_max", "regens", "values_limit")
+
+    def __init__(self, size=0):
+        self.values = [0] * size
+        self.values_max = [0] * size
+        self.regens = [0] * size
+        self.values_limit = [0] * size
+
+    def append(self):
+        self.values.append(0)
+        self.values_max.append(0)
+        self.regens.append(0)
+        self.values_limit.append(0)
+
+    def clear_slot(self, slot):
+        # A cleared slot is left unchanged by the regeneration
+        self.values[slot] = 0
+        self.values_max[slot] = 0
+        self.regens[slot] = 0
+        self.values_limit[slot] = 0
+
+    def regenerate(self, values_limit=None):
+        """New values after one regeneration, see PlayerStatus.regenerate"""
+        if values_limit is None:
+            values_limit = self.values_limit
+        new_values = []
+        for (value, regen, value_limit) in zip(self.values, self.regens, values_limit):
+            value += regen
+            if value < 0:
+                value = 0
+            elif value > value_limit:
+                value = value_limit
+            new_values.append(value)
+        return new_values
+
+    def __len__(self):
+        return len(self.values)
+
+
+class PlayerStatusStore:
+    """
+    Health, hunger and energy of players stored column by column
+    The statuses of a player added to the store become views on its slot,
+    so the statuses of all the players are regenerated in one pass
+    """
+
+    STATUSES = ("health", "hunger", "energy")
+
+    def __init__(self):
+        self.columns = {}
+        for status in PlayerStatusStore.STATUSES:
+            self.columns[status] = StatusColumns()
+
+        self._players = []  # Player of each slot, None if free
+        self._free_slots = []
+        self._slots = {}  # Dict with player_id as key and slot as value
+
+    def add_player(self, player):
+        if player.player_id in self._slots:
+            self.remove_player(player.player_id)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._players[slot] = player
+        else:
+            slot = len(self._players)
+            self._players.append(player)
+            for columns in self.columns.values():
+                columns.append()
+
+        self._slots[player.player_id] = slot
+        for status in PlayerStatusStore.STATUSES:
+            getattr(player, status).attach(self.columns[status], slot)
+
+    def remove_player(self, player_id):
+        slot = self._slots.pop(player_id)
+        player = self._players[slot]
+        for status in PlayerStatusStore.STATUSES:
+            getattr(player, status).detach()
+            self.columns[status].clear_slot(slot)
+
+        self._players[slot] = None
+        self._free_slots.append(slot)
+
+    def regenerate(self):
+        """Same as Player.do for every player of the store"""
+        health = self.columns["health"]
+        hunger = self.columns["hunger"]
+        energy = self.columns["energy"]
+
+        health_values = health.regenerate()
+        hunger_values = hunger.regenerate()
+        # Energy is limited by hunger
+        energy_limits = [min(a, b) for (a, b) in zip(hunger_values, energy.values_max)]
+        energy_values = energy.regenerate(energy_limits)
+
+        # Players are touched before their statuses are modified
+        changed_slots = set()
+        for (old_values, new_values) in (
+            (health.values, health_values),
+            (hunger.values, hunger_values),
+            (energy.values, energy_values),
+            (energy.values_limit, energy_limits),
+        ):
+            for (slot, (a, b)) in enumerate(zip(old_values, new_values)):
+                if a != b:
+                    changed_slots.add(slot)
+        for slot in sorted(changed_slots):
+            self._players[slot]._touch()
+
+        health.values = health_values
+        hunger.values = hunger_values
+        energy.values = energy_values
+        energy.values_limit = energy_limits
+
+    def __contains__(self, player_id):
+        return player_id in self._slots
+
+    def __len__(self):
+        return len(self._slots)
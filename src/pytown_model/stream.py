@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+
+from .buildings import Building
+from .characters import Character, Player
+from .entity import Background, Resource
+from .grid import BackgroundGrid
+from .town import Town
+
+# A town stream is made of json records, one per line :
+#   {"type": "town", "name", "version", "width", "height"}
+#   {"type": "background_type", "code", "background"} before its first use
+#   {"type": "row", "y", "codes"} backgrounds of a line, code 0 is no background
+#   {"type": "resource" | "building" | "character", "tile", "value"}
+#   {"type": "player", "value"}
+#   {"type": "end"}
+
+
+class TownStreamEncoder:
+    """Serialize a town record by record, without building the whole json dict"""
+
+    def __init__(self, town: Town):
+        self.town = town
+
+    def iter_records(self):
+        town = self.town
+        (w, h) = town.get_size()
+
+        record = {}
+        record["type"] = "town"
+        record["name"] = town.name
+        record["version"] = town.tracker.version
+        record["width"] = w
+        record["height"] = h
+        yield record
+
+        yield from self._iter_backgrounds(w, h)
+
+        for (record_type, section) in (
+            ("resource", town.resources),
+            ("building", town.buildings),
+            ("character", town.characters),
+        ):
+            for tile in section:
+                yield {
+                    "type": record_type,
+                    "tile": list(tile),
+                    "value": section[tile].to_json_dict(),
+                }
+
+        for player in town.players.values():
+            yield {"type": "player", "value": player.to_json_dict()}
+
+        yield {"type": "end"}
+
+    def _iter_backgrounds(self, w, h):
+        backgrounds = self.town.backgrounds
+        grid = backgrounds if isinstance(backgrounds, BackgroundGrid) else None
+        if grid is not None and grid.origin == (0, 0):
+            for code in range(1, len(grid.table)):
+                yield self._background_type_record(code, grid.table[code])
+            for j in range(h):
+                yield {"type": "row", "y": j, "codes": grid.get_row_codes(j).tolist()}
+            return
+
+        palette = BackgroundGrid(0, 0)
+        for j in range(h):
+            codes = []
+            for i in range(w):
+                if (i, j) not in backgrounds:
+                    codes.append(BackgroundGrid.EMPTY)
+                    continue
+
+                background = backgrounds[(i, j)]
+                types_nb = len(palette.table)
+                code = palette.get_code(background)
+                if len(palette.table) > types_nb:
+                    yield self._background_type_record(code, background)
+                codes.append(code)
+            yield {"type": "row", "y": j, "codes": codes}
+
+    @staticmethod
+    def _background_type_record(code, background):
+        return {
+            "type": "background_type",
+            "code": code,
+            "background": background.to_json_dict(),
+        }
+
+    def iter_lines(self):
+        for record in self.iter_records():
+            yield json.dumps(record, separators=(",", ":")) + "\n"
+
+    def dump(self, text_file):
+        for line in self.iter_lines():
+            text_file.write(line)
+
+
+class TownStreamDecoder:
+    """
+    Build a town from the chunks of a stream, as they arrive
+    The town is usable as soon as its "town" record is decoded and complete
+    when done is True
+    """
+
+    def __init__(self):
+        self.town = None
+        self.done = False
+
+        self._pending = []  # Parts of the line being received, without line end
+        self._codes = {BackgroundGrid.EMPTY: BackgroundGrid.EMPTY}  # stream => grid
+
+    def feed(self, chunk: str):
+        # Only the new chunk is searched, a record split in many chunks is joined once
+        start = 0
+        end = chunk.find("\n")
+        while end != -1:
+            self._pending.append(chunk[start:end])
+            line = "".join(self._pending)
+            self._pending = []
+            if line:
+                self.decode_record(json.loads(line))
+            start = end + 1
+            end = chunk.find("\n", start)
+
+        if start < len(chunk):
+            self._pending.append(chunk[start:])
+
+    def decode_record(self, record):
+        record_type = record["type"]
+        if self.town is None and record_type != "town":
+            raise StreamDecodeError(record_type, "before the town record")
+
+        if record_type == "town":
+            self.town = Town(record["name"], (record["width"], record["height"]))
+            self.town.synced_version = record["version"]
+        elif record_type == "background_type":
+            background = Background.from_json_dict(record["background"])
+            self._codes[record["code"]] = self.town.backgrounds.get_code(background)
+        elif record_type == "row":
+            codes = self._codes
+            self.town.backgrounds.set_row_codes(
+                record["y"], [codes[code] for code in record["codes"]]
+            )
+        elif record_type == "resource":
+            self.town.set_resource(
+                Resource.from_json_dict(record["value"]), tuple(record["tile"])
+            )
+        elif record_type == "building":
+            self.town.set_building(
+                Building.from_json_dict(record["value"]), tuple(record["tile"])
+            )
+        elif record_type == "character":
+            self.town.set_character(
+                Character.from_json_dict(record["value"]), tuple(record["tile"])
+            )
+        elif record_type == "player":
+            self.town.set_player(Player.from_json_dict(record["value"]))
+        elif record_type == "end":
+            self.done = True
+        else:
+            raise StreamDecodeError(record_type)
+
+    @classmethod
+    def load(cls, text_file, chunk_size=65536) -> Town:
+        decoder = cls()
+        while not decoder.done:
+            chunk = text_file.read(chunk_size)
+            if not chunk:
+                break
+            decoder.feed(chunk)
+        if not decoder.done:
+            raise StreamDecodeError(None, "stream ended before the end record")
+        return decoder.town
+
+
+class StreamDecodeError(Exception):
+    def __init__(self, record_type, reason="unknown record type"):
+        Exception.__init__(self)
+        self.record_type = record_type
+        self.reason = reason
+        self.msg = "town stream record {!r} rejected : {}".format(
+            self.record_type, self.reason
+        )
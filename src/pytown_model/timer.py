@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import math
+import time
+
+
+class Timer:
+
+    __slots__ = ("tick", "callback", "cancelled")
+
+    def __init__(self, tick, callback):
+        self.tick = tick  # Tick of the wheel at which the timer expires
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel : a timer is put in the slot of its expiry tick
+    on the first level able to hold it, and moved to the lower levels as the
+    wheel turns, so that expiring timers are found without scanning the others
+    A tick lasts resolution seconds, a level has slots_nb slots
+    """
+
+    def __init__(self, resolution=0.01, slots_nb=64, levels_nb=4, now=None):
+        self.resolution = resolution
+        self.slots_nb = slots_nb
+        self.levels_nb = levels_nb
+
+        if now is None:
+            now = time.time()
+        self._tick = self._get_tick(now)  # Last tick processed
+        self._levels = [[[] for _ in range(slots_nb)] for _ in range(levels_nb)]
+        self._max_delta = slots_nb ** levels_nb - 1
+        self._counts = [0] * levels_nb  # Timers by level, cancelled ones included
+
+    def _get_tick(self, now):
+        return math.floor(now / self.resolution)
+
+    def schedule(self, deadline, callback) -> Timer:
+        """Call callback once the wheel is advanced to deadline (in seconds)"""
+        # Expired timers are fired at the next tick
+        tick = max(math.ceil(deadline / self.resolution), self._tick + 1)
+        timer = Timer(tick, callback)
+        self._add(timer)
+        return timer
+
+    def schedule_in(self, delay, callback) -> Timer:
+        return self.schedule(time.time() + delay, callback)
+
+    def _add(self, timer: Timer):
+        # Timers too far are put at the last slot and added again from there
+        delta = min(timer.tick - self._tick, self._max_delta)
+        tick = self._tick + delta
+        level = 0
+        while delta >= self.slots_nb ** (level + 1):
+            level += 1
+        slot = (tick // self.slots_nb ** level) % self.slots_nb
+        self._levels[level][slot].append(timer)
+        self._counts[level] += 1
+
+    def advance(self, now=None):
+        """Call the callbacks of the timers expired at now, return their number"""
+        if now is None:
+            now = time.time()
+        target = self._get_tick(now)
+
+        timers = []
+        while self._tick < target:
+            if self._counts[0] == 0:
+                # Nothing to fire before the next cascade
+                next_tick = (self._tick // self.slots_nb + 1) * self.slots_nb
+                if next_tick > target or not any(self._counts):
+                    self._tick = target
+                    break
+                self._tick = next_tick - 1
+
+            self._tick += 1
+            self._cascade()
+            slot = self._levels[0][self._tick % self.slots_nb]
+            self._counts[0] -= len(slot)
+            timers.extend(slot)
+            slot.clear()
+
+        fired = 0
+        for timer in timers:
+            if not timer.cancelled:
+                timer.callback()
+                fired += 1
+        return fired
+
+    def _cascade(self):
+        for level in range(1, self.levels_nb):
+            size = self.slots_nb ** level
+            if self._tick % size != 0:
+                return
+
+            slot = self._levels[level][(self._tick // size) % self.slots_nb]
+            timers = list(slot)
+            slot.clear()
+            self._counts[level] -= len(timers)
+            for timer in timers:
+                if not timer.cancelled:
+                    self._add(timer)
+
+    def __len__(self):
+        return sum(self._counts)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import logging
 import math
-import pickle
+import random
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
 
 from pytown_core.serializers import IJSONSerializable
 
@@ -10,39 +12,110 @@ from .buildings import Building
 from .buildings.factory import GoldMineFactory, LumberingFactory, SawmillFactory
 from .characters import Character, Player
 from .entity import Background, BackgroundCreator, Resource, ResourceCreator
+from .generation import random_tiles, river_path, value_noise_rows
+from .grid import BackgroundGrid
+from .lazy import LazyEntityDict
+from .ledger import InventoryLedger
+from .regeneration import LazyPlayerStatuses
+from .region import Region, RegionLayer, RegionManager
+from .scheduler import EventScheduler
+from .snapshot import TownSnapshot, read_snapshot, write_snapshot
+from .spatial import TileBucketIndex
+from .status import PlayerStatusStore
+from .timer import TimerWheel
+from .tracking import ChangeTracker, Touch
 
 
 class Town(IJSONSerializable):
     """
     Representation of the town board with different tiles
     Town act like a facade for accessing town objects
+    If a size (w, h) is given, backgrounds are stored in a dense BackgroundGrid
+    With use_regions, the board is split in regions loaded on demand
+    Every change is versioned by the tracker to allow delta serialization
     """
 
-    def __init__(self, name):
+    SECTIONS = ("backgrounds", "resources", "buildings", "characters", "players")
+
+    def __init__(self, name, size=None):
 
         self.name = name
 
-        self.backgrounds = {}  # Dict with (x,y) as key
+        if size is None:
+            self.backgrounds = {}  # Dict with (x,y) as key
+        else:
+            self.backgrounds = BackgroundGrid(*size)  # Dict-like with (x,y) as key
         self.resources = {}
         self.buildings = {}
         self.characters = {}
         self.players = {}  # Dict with player_id as key
 
+        self.regions = None  # RegionManager when the town is chunked
+        self.status_store = None  # PlayerStatusStore of the players if used
+        self.lazy_statuses = None  # Dict with player_id as key if used
+        self.ledger = None  # InventoryLedger of the inventories if used
+
+        self.tick = 0  # Number of calls to tick_players
+        self.scheduler = EventScheduler()
+        self.on_status_event = None  # See use_lazy_statuses
+        self.timers = TimerWheel()  # Delayed effects in seconds, see run_timers
+
+        self.tracker = ChangeTracker()
+        self.synced_version = 0  # Version of the town this one was built from
+
+        self._save_executor = None
+        self._save_future = None  # Future of the last save_async
+
+        self._players_by_tile = {}  # Dict with (x,y) as key and set of player_id
+        self._players_tile = {}  # Dict with player_id as key and indexed (x,y)
+        self._players_tiles_index = TileBucketIndex()  # Tiles with players
+
+        self._tiles_index = {}  # Tiles of the entities by section
+        for section in ("resources", "buildings", "characters"):
+            self._tiles_index[section] = TileBucketIndex()
+
     def __repr__(self):
         log = "\n"
 
-        line = 0
-        for background in self.backgrounds:
-            if self.backgrounds[background][1] == line:
-                log += repr(background)
-            else:
-                log += "\n"
-                log += repr(background)
-                line += 1
+        (w, h) = self.get_size()
+        for j in range(h):
+            for i in range(w):
+                if (i, j) in self.backgrounds:
+                    log += repr(self.backgrounds[(i, j)])
+            log += "\n"
 
         return log
 
+    def use_regions(self, region_manager: RegionManager):
+        self.regions = region_manager
+        self.regions.on_load = self._bind_region
+        for layer in Region.LAYERS:
+            setattr(self, layer, RegionLayer(region_manager, layer))
+
+    def evict_regions(self, radius=1):
+        """Evict to disk the regions farther than radius regions from every player"""
+        # A region file written by a pending save would replace the evicted one
+        self._wait_saved()
+        keys_to_keep = set()
+        for player_id in self.players:
+            tile = self.get_player_tile(player_id)
+            try:
+                (rx, ry) = self.regions.get_region_key(tile)
+            except KeyError:
+                continue
+            for j in range(ry - radius, ry + radius + 1):
+                for i in range(rx - radius, rx + radius + 1):
+                    keys_to_keep.add((i, j))
+        self.regions.evict_regions(keys_to_keep)
+        self._reindex_tiles()
+
     def get_tiles_w(self):
+        if self.regions is not None:
+            return self.regions.width
+
+        if isinstance(self.backgrounds, BackgroundGrid):
+            return self.backgrounds.width
+
         w = 0
         for background in self.backgrounds:
             if background[0] >= w:
@@ -50,6 +123,12 @@ class Town(IJSONSerializable):
         return w + 1
 
     def get_tiles_h(self):
+        if self.regions is not None:
+            return self.regions.height
+
+        if isinstance(self.backgrounds, BackgroundGrid):
+            return self.backgrounds.height
+
         h = 0
         for background in self.backgrounds:
             if background[1] >= h:
@@ -65,6 +144,7 @@ class Town(IJSONSerializable):
         raise TownEntityNotFound("background", tile)
 
     def set_background(self, background: Background, tile):
+        self.tracker.touch("backgrounds", tile)
         self.backgrounds[tile] = background
 
     def get_resource(self, tile):
@@ -73,7 +153,10 @@ class Town(IJSONSerializable):
         raise TownEntityNotFound("resource", tile)
 
     def set_resource(self, resource: Resource, tile):
+        self.tracker.touch("resources", tile)
+        self._bind_entity("resources", tile, resource)
         self.resources[tile] = resource
+        self._tiles_index["resources"].add(tile)
 
     def get_building(self, tile):
         if tile in self.buildings.keys():
@@ -81,7 +164,10 @@ class Town(IJSONSerializable):
         raise TownEntityNotFound("building", tile)
 
     def set_building(self, building: Building, tile):
+        self.tracker.touch("buildings", tile)
+        self._bind_entity("buildings", tile, building)
         self.buildings[tile] = building
+        self._tiles_index["buildings"].add(tile)
 
     def get_buildings_allowed_list_by_tile(self, tile: tuple):
 
@@ -101,7 +187,10 @@ class Town(IJSONSerializable):
         raise TownEntityNotFound("character", tile)
 
     def set_character(self, character: Character, tile):
+        self.tracker.touch("characters", tile)
+        self._bind_entity("characters", tile, character)
         self.characters[tile] = character
+        self._tiles_index["characters"].add(tile)
 
     def get_player(self, player_id) -> Player:
         if player_id in self.players:
@@ -109,60 +198,346 @@ class Town(IJSONSerializable):
         return None
 
     def set_player(self, player: Player):
+        self.tracker.touch("players", player.player_id)
+        self._bind_entity("players", player.player_id, player)
         self.players[player.player_id] = player
+        self._index_player(player)
+        if self.status_store is not None:
+            self.status_store.add_player(player)
+        if self.lazy_statuses is not None:
+            self._set_lazy_statuses(player)
 
     def add_player(self, player: Player, tile: tuple):
         player.x = tile[0]
         player.y = tile[1]
-        self.players[player.player_id] = player
+        self.set_player(player)
+
+    def remove_player(self, player_id):
+        self.tracker.touch("players", player_id)
+        player = self.players.pop(player_id)
+        player.bind_tracker(None)
+        player.bind_timers(None)
+        if self.status_store is not None:
+            self.status_store.remove_player(player_id)
+        if self.lazy_statuses is not None:
+            self.lazy_statuses.pop(player_id).release()
+
+        tile = self._players_tile.pop(player_id)
+        players_id = self._players_by_tile[tile]
+        players_id.discard(player_id)
+        if not players_id:
+            del self._players_by_tile[tile]
+            self._players_tiles_index.discard(tile)
+
+    def use_status_store(self):
+        """Store the statuses of the players column by column, see tick_players"""
+        self.status_store = PlayerStatusStore()
+        for player in self.players.values():
+            self.status_store.add_player(player)
+
+    def use_lazy_statuses(self):
+        """
+        Compute the statuses of the players when read instead of at each tick
+        and call on_status_event when hunger gets empty or energy full
+        """
+        if self.lazy_statuses is not None:
+            for lazy_statuses in self.lazy_statuses.values():
+                lazy_statuses.release()
+
+        self.lazy_statuses = {}
+        for player in self.players.values():
+            self._set_lazy_statuses(player)
+
+    def use_ledger(self) -> InventoryLedger:
+        """
+        Mirror the inventories of the town in an InventoryLedger for economy queries
+        In a chunked town, every region is loaded to build the ledger
+        """
+        if self.ledger is not None:
+            self.ledger.release()
+        self.ledger = InventoryLedger(self)
+        return self.ledger
+
+    def _set_lazy_statuses(self, player: Player):
+        if player.player_id in self.lazy_statuses:
+            self.lazy_statuses[player.player_id].release()
+        self.lazy_statuses[player.player_id] = LazyPlayerStatuses(
+            player, self, self.scheduler, self._notify_status_event
+        )
+
+    def _notify_status_event(self, player, event):
+        if self.on_status_event is not None:
+            self.on_status_event(player, event)
+
+    def tick_players(self):
+        """Regenerate the statuses of all the players"""
+        self.tick += 1
+        if self.lazy_statuses is None:
+            if self.status_store is not None:
+                self.status_store.regenerate()
+            else:
+                for player in self.players.values():
+                    player.do()
+        self.scheduler.run_until(self.tick)
+
+    def run_timers(self, now=None):
+        """Fire the timers expired at now (time.time() by default), ex : move status"""
+        return self.timers.advance(now)
+
+    def move_player(self, player_id, x, y):
+        player = self.players[player_id]
+        player.x = x
+        player.y = y
+        self._index_player(player)
+
+    @staticmethod
+    def get_tile(x, y):
+        return (math.floor(x + 0.5), math.floor(y + 0.5))
 
     def get_player_tile(self, player_id):
         player = self.get_player(player_id)
-        tile_selected = (math.floor(player.x + 0.5), math.floor(player.y + 0.5))
-        return tile_selected
+        return Town.get_tile(player.x, player.y)
 
     def get_players_by_tile(self, tile):
         players_list = []
-        for player in self.players.values():
-            player_tile = self.get_player_tile(player.player_id)
-            if player_tile == tile:
-                players_list.append(player)
+        for player_id in self._players_by_tile.get(tile, ()):
+            players_list.append(self.players[player_id])
         return players_list
 
+    def get_players_around_tile(self, tile, radius):
+        """Players whose tile is at most radius tiles away from tile"""
+        (x, y) = tile
+        radius_2 = radius * radius
+        players_list = []
+
+        # Scan the smallest between the tiles around and the occupied tiles
+        if (2 * radius + 1) ** 2 <= len(self._players_by_tile):
+            tiles = (
+                (i, j)
+                for j in range(y - radius, y + radius + 1)
+                for i in range(x - radius, x + radius + 1)
+            )
+        else:
+            tiles = list(self._players_by_tile)
+
+        for (i, j) in tiles:
+            if (i - x) ** 2 + (j - y) ** 2 <= radius_2:
+                players_list.extend(self.get_players_by_tile((i, j)))
+        return players_list
+
+    def _index_player(self, player: Player):
+        tile = Town.get_tile(player.x, player.y)
+        old_tile = self._players_tile.get(player.player_id)
+        if old_tile == tile:
+            return
+
+        if old_tile is not None:
+            players_id = self._players_by_tile[old_tile]
+            players_id.discard(player.player_id)
+            if not players_id:
+                del self._players_by_tile[old_tile]
+                self._players_tiles_index.discard(old_tile)
+
+        self._players_tile[player.player_id] = tile
+        if tile not in self._players_by_tile:
+            self._players_by_tile[tile] = set()
+            self._players_tiles_index.add(tile)
+        self._players_by_tile[tile].add(player.player_id)
+
+    def _reindex_players(self):
+        self._players_by_tile = {}
+        self._players_tile = {}
+        self._players_tiles_index.clear()
+        for player in self.players.values():
+            self._index_player(player)
+
+    def _reindex_tiles(self):
+        for index in self._tiles_index.values():
+            index.clear()
+
+        # Only the loaded regions are indexed, the others are when loaded
+        if self.regions is not None:
+            for region in self.regions.regions.values():
+                self._index_region(region)
+            return
+
+        for section in ("resources", "buildings", "characters"):
+            for tile in getattr(self, section):
+                self._tiles_index[section].add(tile)
+
+    def _index_region(self, region: Region):
+        for section in ("resources", "buildings", "characters"):
+            for tile in getattr(region, section):
+                self._tiles_index[section].add(tile)
+
+    def query_region(self, x0, y0, x1, y1):
+        """
+        Entities of the tiles (x,y) with x0 <= x <= x1 and y0 <= y <= y1
+        Return a dict by section with (x,y) as key, player_id for the players
+        """
+        if self.regions is not None:
+            self._load_regions(x0, y0, x1, y1)
+
+        entities = {}
+        entities["backgrounds"] = {}
+        for j in range(y0, y1 + 1):
+            for i in range(x0, x1 + 1):
+                if (i, j) in self.backgrounds:
+                    entities["backgrounds"][(i, j)] = self.backgrounds[(i, j)]
+
+        for section in ("resources", "buildings", "characters"):
+            layer = getattr(self, section)
+            entities[section] = {}
+            for tile in self._tiles_index[section].query(x0, y0, x1, y1):
+                entities[section][tile] = layer[tile]
+
+        entities["players"] = {}
+        for tile in self._players_tiles_index.query(x0, y0, x1, y1):
+            for player in self.get_players_by_tile(tile):
+                entities["players"][player.player_id] = player
+
+        return entities
+
+    def query_radius(self, tile, radius):
+        """Entities of the tiles at most radius tiles away from tile"""
+        (x, y) = tile
+        radius_2 = radius * radius
+        entities = self.query_region(x - radius, y - radius, x + radius, y + radius)
+
+        for section in ("backgrounds", "resources", "buildings", "characters"):
+            entities[section] = {
+                (i, j): entity
+                for ((i, j), entity) in entities[section].items()
+                if (i - x) ** 2 + (j - y) ** 2 <= radius_2
+            }
+
+        players = {}
+        for (player_id, player) in entities["players"].items():
+            (i, j) = self._players_tile[player_id]
+            if (i - x) ** 2 + (j - y) ** 2 <= radius_2:
+                players[player_id] = player
+        entities["players"] = players
+
+        return entities
+
+    def _load_regions(self, x0, y0, x1, y1):
+        size = self.regions.region_size
+        x0 = max(x0, 0)
+        y0 = max(y0, 0)
+        x1 = min(x1, self.regions.width - 1)
+        y1 = min(y1, self.regions.height - 1)
+        for ry in range(y0 // size, y1 // size + 1):
+            for rx in range(x0 // size, x1 // size + 1):
+                self.regions.get_region_by_key((rx, ry))
+
+    def _bind_entity(self, section, key, entity):
+        entity.bind_tracker(Touch(self.tracker, section, key))
+        if section in ("characters", "players"):
+            entity.bind_timers(self.timers)
+        if self.ledger is not None:
+            # Entities of loaded regions and lazy entities are new objects
+            self.ledger.mark_changed(section, key)
+
+    def _bind_region(self, region: Region):
+        self._index_region(region)
+        for section in ("resources", "buildings", "characters"):
+            layer = getattr(region, section)
+            for key in layer:
+                self._bind_entity(section, key, layer[key])
+
+    def _bind_all(self):
+        if self.regions is not None:
+            for region in self.regions.regions.values():
+                self._bind_region(region)
+        else:
+            for section in ("resources", "buildings", "characters"):
+                layer = getattr(self, section)
+                # Lazy entities are bound once built
+                if isinstance(layer, LazyEntityDict):
+                    keys = layer.built_keys()
+                else:
+                    keys = list(layer)
+                for key in keys:
+                    self._bind_entity(section, key, layer[key])
+
+        for player_id in self.players:
+            self._bind_entity("players", player_id, self.players[player_id])
+
     def __len__(self):
+        if self.regions is not None:
+            return self.regions.width * self.regions.height
         return len(self.backgrounds)
 
+    def _wait_saved(self):
+        if self._save_future is not None:
+            wait([self._save_future])
+            self._save_future = None
+
     def save(self):
+        """Save the town, and the loaded regions of a chunked town to their files"""
         file_name = self.name + ".pytown"
-        with open(file_name, "wb") as town_file:
-            my_pickler = pickle.Pickler(town_file)
-            my_pickler.dump(self)
-            logging.info("town saved")
-
-    def load(self):
+        self._wait_saved()
+        write_snapshot(self, file_name)
+        logging.info("town saved")
+
+    def save_async(self, callback=None):
+        """
+        Take a snapshot of the town and write it on a worker thread
+        The town can keep being modified while it is written
+        Return a Future, callback is called with it once the town is saved
+        """
+        file_name = self.name + ".pytown"
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(max_workers=1)
+
+        snapshot = TownSnapshot(self)
+        future = self._save_executor.submit(snapshot.write, file_name)
+        self._save_future = future
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def load(self, sections=None, use_mmap=False):
+        """
+        Load the sections (all by default) of the town snapshot
+        With use_mmap, the backgrounds are mapped from the file instead of read
+        A chunked town loads its players, its regions are loaded again on demand
+        """
         file_name = self.name + ".pytown"
+        self._wait_saved()
+        if self.regions is not None:
+            sections = ("players",)
         try:
-            with open(file_name, "rb") as town_file:
-                my_unpickler = pickle.Unpickler(town_file)
-                town = my_unpickler.load()
-
-                self.backgrounds = town.backgrounds  # Dict with (x,y) as key
-                self.resources = town.resources
-                self.buildings = town.buildings
-                self.characters = town.characters
-                self.players = town.players
-
+            read_snapshot(self, file_name, sections, use_mmap)
         except FileNotFoundError:
             logging.warning("No filetown found")
             return
 
+        if self.regions is not None:
+            self.regions.unload_regions()
+        self._bind_all()
+        self._reindex_players()
+        self._reindex_tiles()
+        if self.status_store is not None:
+            self.use_status_store()
+        if self.lazy_statuses is not None:
+            self.use_lazy_statuses()
+        if self.ledger is not None:
+            self.ledger.rebuild()
+
     @classmethod
-    def from_json_dict(cls, json_dict):
-        town = cls(json_dict["name"])
-        for background in json_dict["backgrounds"]:
-            town.backgrounds[background] = Background.from_json_dict(
-                json_dict["backgrounds"][background]
-            )
+    def from_json_dict(cls, json_dict, lazy=False):
+        """
+        With lazy, backgrounds, resources, buildings and characters are only built
+        when accessed the first time. Players are always built.
+        """
+        if lazy:
+            return cls._from_json_dict_lazy(json_dict)
+
+        # Backgrounds are kept in a grid when the town had one
+        size = json_dict.get("size")
+        town = cls(json_dict["name"], None if size is None else tuple(size))
+        town._set_backgrounds_json_dict(json_dict["backgrounds"])
         for resource in json_dict["resources"]:
             town.resources[resource] = Resource.from_json_dict(
                 json_dict["resources"][resource]
@@ -177,11 +552,64 @@ class Town(IJSONSerializable):
             )
         for player in json_dict["players"]:
             town.players[player] = Player.from_json_dict(json_dict["players"][player])
+
+        town.synced_version = json_dict.get("version", 0)
+        town._bind_all()
+        town._reindex_players()
+        town._reindex_tiles()
+        return town
+
+    def _set_backgrounds_json_dict(self, backgrounds_dict):
+        # Tiles of a type share their background, built once from its json dict
+        backgrounds = {}  # Dict with the fields of the json dict as key
+        for (tile, background_dict) in backgrounds_dict.items():
+            key = (
+                background_dict["name"],
+                tuple(background_dict["buildings_allowed_list"]),
+                background_dict["move_multiplicator"],
+            )
+            background = backgrounds.get(key)
+            if background is None:
+                background = Background.from_json_dict(background_dict)
+                backgrounds[key] = background
+            self.backgrounds[tile] = background
+
+    @classmethod
+    def _from_json_dict_lazy(cls, json_dict):
+        town = cls(json_dict["name"])
+        town.backgrounds = LazyEntityDict(
+            json_dict["backgrounds"], Background.from_json_dict
+        )
+        town.resources = LazyEntityDict(
+            json_dict["resources"],
+            Resource.from_json_dict,
+            partial(town._bind_entity, "resources"),
+        )
+        town.buildings = LazyEntityDict(
+            json_dict["buildings"],
+            Building.from_json_dict,
+            partial(town._bind_entity, "buildings"),
+        )
+        town.characters = LazyEntityDict(
+            json_dict["characters"],
+            Character.from_json_dict,
+            partial(town._bind_entity, "characters"),
+        )
+        for player in json_dict["players"]:
+            town.players[player] = Player.from_json_dict(json_dict["players"][player])
+
+        town.synced_version = json_dict.get("version", 0)
+        town._bind_all()
+        town._reindex_players()
+        town._reindex_tiles()
         return town
 
     def to_json_dict(self):
         json_dict = {}
         json_dict["name"] = self.name
+        json_dict["version"] = self.tracker.version
+        if isinstance(self.backgrounds, BackgroundGrid):
+            json_dict["size"] = [self.backgrounds.width, self.backgrounds.height]
 
         backgrounds_dict = {}
         for background in self.backgrounds:
@@ -210,23 +638,101 @@ class Town(IJSONSerializable):
 
         return json_dict
 
+    def to_viewport_json_dict(self, x0, y0, x1, y1):
+        """Same as to_json_dict restricted to the tiles of query_region"""
+        json_dict = {}
+        json_dict["name"] = self.name
+        json_dict["version"] = self.tracker.version
+        json_dict["viewport"] = [x0, y0, x1, y1]
+
+        entities = self.query_region(x0, y0, x1, y1)
+        for section in Town.SECTIONS:
+            json_dict[section] = {}
+            for (key, entity) in entities[section].items():
+                json_dict[section][key] = entity.to_json_dict()
+
+        return json_dict
+
+    def to_delta_json_dict(self, since):
+        """Entities changed after the version since, None for the removed ones"""
+        json_dict = {}
+        json_dict["name"] = self.name
+        json_dict["since"] = since
+        json_dict["version"] = self.tracker.version
+        for section in Town.SECTIONS:
+            json_dict[section] = {}
+
+        for (section, key) in self.tracker.get_changes(since):
+            entities = getattr(self, section)
+            if key in entities:
+                json_dict[section][key] = entities[key].to_json_dict()
+            else:
+                json_dict[section][key] = None
+
+        return json_dict
+
+    def apply_delta(self, delta_json_dict):
+        if delta_json_dict["since"] > self.synced_version:
+            raise TownDeltaError(self.synced_version, delta_json_dict["since"])
+
+        for tile, background in delta_json_dict["backgrounds"].items():
+            if background is None:
+                self.backgrounds.pop(tile, None)
+            else:
+                self.set_background(Background.from_json_dict(background), tile)
+        for tile, resource in delta_json_dict["resources"].items():
+            if resource is None:
+                self.tracker.touch("resources", tile)
+                self.resources.pop(tile, None)
+                self._tiles_index["resources"].discard(tile)
+            else:
+                self.set_resource(Resource.from_json_dict(resource), tile)
+        for tile, building in delta_json_dict["buildings"].items():
+            if building is None:
+                self.tracker.touch("buildings", tile)
+                self.buildings.pop(tile, None)
+                self._tiles_index["buildings"].discard(tile)
+            else:
+                self.set_building(Building.from_json_dict(building), tile)
+        for tile, character in delta_json_dict["characters"].items():
+            if character is None:
+                self.tracker.touch("characters", tile)
+                self.characters.pop(tile, None)
+                self._tiles_index["characters"].discard(tile)
+            else:
+                self.set_character(Character.from_json_dict(character), tile)
+        for player_id, player in delta_json_dict["players"].items():
+            if player is None:
+                if player_id in self.players:
+                    self.remove_player(player_id)
+            else:
+                self.set_player(Player.from_json_dict(player))
+
+        self.synced_version = delta_json_dict["version"]
+
 
 class TownCreator:
     @staticmethod
-    def create_default_town(tiles_nb_w, tiles_nb_h) -> Town:
-        town = Town("testown")
+    def create_default_town(tiles_nb_w, tiles_nb_h, grid=False) -> Town:
+        if grid:
+            town = Town("testown", (tiles_nb_w, tiles_nb_h))
+        else:
+            town = Town("testown")
 
         town = TownCreator._initializetiles(town, tiles_nb_w, tiles_nb_h)
 
+        background_creator = BackgroundCreator()
+        tiles_w = town.get_tiles_w()
+
         # Add road on n-1 line
         j = town.get_tiles_h() - 2
-        for i in range(town.get_tiles_w()):
-            town.backgrounds[(i, j)] = BackgroundCreator().create_road_background()
+        for i in range(tiles_w):
+            town.backgrounds[(i, j)] = background_creator.create_road_background()
 
         # Add water on last line
         j = town.get_tiles_h() - 1
-        for i in range(town.get_tiles_w()):
-            town.backgrounds[(i, j)] = BackgroundCreator().create_water_background()
+        for i in range(tiles_w):
+            town.backgrounds[(i, j)] = background_creator.create_water_background()
 
         return town
 
@@ -252,11 +758,88 @@ class TownCreator:
 
         return town
 
+    @staticmethod
+    def create_procedural_town(
+        tiles_nb_w,
+        tiles_nb_h,
+        seed=0,
+        rivers_nb=1,
+        roads_nb=1,
+        forest_density=0.02,
+        golden_vein_density=0.002,
+    ) -> Town:
+        """Town generated from the seed, the same seed always gives the same town"""
+        rng = random.Random(seed)
+        town = Town("proceduraltown", (tiles_nb_w, tiles_nb_h))
+        grid = town.backgrounds
+
+        background_creator = BackgroundCreator()
+        grass = grid.get_code(background_creator.create_grass_backgound())
+        sand = grid.get_code(background_creator.create_sand_background())
+        water = grid.get_code(background_creator.create_water_background())
+        road = grid.get_code(background_creator.create_road_background())
+
+        # Terrain : lakes in the lowest parts of the noise, surrounded by sand
+        for (j, noise_row) in enumerate(value_noise_rows(tiles_nb_w, tiles_nb_h, rng)):
+            grid.set_row_codes(
+                j,
+                [
+                    water if value < 0.2 else sand if value < 0.26 else grass
+                    for value in noise_row
+                ],
+            )
+
+        for _ in range(rivers_nb):
+            for tile in river_path(tiles_nb_w, tiles_nb_h, rng):
+                grid[tile] = grid.table[water]
+
+        # Roads cross the town, without bridges
+        for _ in range(roads_nb):
+            j = rng.randrange(tiles_nb_h)
+            row = grid.get_row_codes(j)
+            grid.set_row_codes(j, [code if code == water else road for code in row])
+
+            i = rng.randrange(tiles_nb_w)
+            for j in range(tiles_nb_h):
+                if grid.get_tile_code((i, j)) != water:
+                    grid[(i, j)] = grid.table[road]
+
+        resource_creator = ResourceCreator()
+        for (density, create_resource) in (
+            (forest_density, resource_creator.create_forest),
+            (golden_vein_density, resource_creator.create_golden_vein),
+        ):
+            count = int(tiles_nb_w * tiles_nb_h * density)
+            for tile in random_tiles(tiles_nb_w, tiles_nb_h, count, rng):
+                if grid.get_tile_code(tile) == grass and tile not in town.resources:
+                    town.set_resource(create_resource(), tile)
+
+        return town
+
+    @staticmethod
+    def create_chunked_town(
+        tiles_nb_w, tiles_nb_h, region_size=32, directory=".", spawn=(0, 0)
+    ) -> Town:
+        town = Town("chunkedtown")
+        town.use_regions(
+            RegionManager(town.name, tiles_nb_w, tiles_nb_h, region_size, directory)
+        )
+
+        # Only the spawn region is created up front
+        town.regions.get_region(spawn)
+        return town
+
     @staticmethod
     def _initializetiles(town, tiles_nb_w, tiles_nb_h):
+        background_creator = BackgroundCreator()
+
+        if isinstance(town.backgrounds, BackgroundGrid):
+            town.backgrounds.fill(background_creator.create_grass_backgound())
+            return town
+
         for j in range(tiles_nb_h):
             for i in range(tiles_nb_w):
-                town.backgrounds[(i, j)] = BackgroundCreator().create_grass_backgound()
+                town.backgrounds[(i, j)] = background_creator.create_grass_backgound()
         return town
 
 
@@ -265,4 +848,14 @@ class TownEntityNotFound(IndexError):
         IndexError.__init__(self)
         self.entity = entity
         self.tile = tile
-        self.msg = "{} not found at {} in town".format(self.entity.name, self.tile)
+        self.msg = "{} not found at {} in town".format(self.entity, self.tile)
+
+
+class TownDeltaError(ValueError):
+    def __init__(self, synced_version, since):
+        ValueError.__init__(self)
+        self.synced_version = synced_version
+        self.since = since
+        self.msg = "delta since version {} can't be applied on version {}".format(
+            self.since, self.synced_version
+        )
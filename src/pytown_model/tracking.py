@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+
+class ChangeTracker:
+    """
+    Keep the version of the last change of each town entity
+    Entities are identified by (section, key), ex : ("players", player_id)
+    Listeners are called with (section, key) before the entity is modified
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._changes = {}  # Dict with (section, key) as key, ordered by version
+        self.listeners = []
+
+    def touch(self, section, key):
+        # Listeners may be removed by another thread, ex : a snapshot written
+        if self.listeners:
+            for listener in tuple(self.listeners):
+                listener(section, key)
+
+        self.version += 1
+        self._changes.pop((section, key), None)
+        self._changes[(section, key)] = self.version
+
+    def get_changes(self, since):
+        """(section, key) of the entities changed after the version since"""
+        changes = []
+        for (entity, version) in reversed(self._changes.items()):
+            if version <= since:
+                break
+            changes.append(entity)
+        changes.reverse()
+        return changes
+
+
+class Touch:
+    """
+    Callback given to a Trackable entity to mark it as changed in a ChangeTracker
+    The link to the tracker is not pickled : Town binds its entities again on load
+    """
+
+    def __init__(self, tracker: ChangeTracker, section, key):
+        self.tracker = tracker
+        self.section = section
+        self.key = key
+
+    def __call__(self):
+        if self.tracker is not None:
+            self.tracker.touch(self.section, self.key)
+
+    def __reduce__(self):
+        return (Touch, (None, self.section, self.key))
+
+
+class Trackable:
+    """
+    Entity notifying its changes through the callback given by bind_tracker
+    _touch has to be called before the entity is modified
+    Subclasses with __slots__ declare _on_change and set it in __init__
+    """
+
+    __slots__ = ()
+
+    _on_change = None
+
+    def bind_tracker(self, on_change):
+        self._on_change = on_change
+
+    def _touch(self):
+        if self._on_change is not None:
+            self._on_change()
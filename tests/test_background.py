@@ -0,0 +1,51 @@
+import gc
+import pickle
+import unittest
+
+from pytown_model.entity import Background, BackgroundCreator, TerrainRegistry
+from pytown_model.names import TERRAIN_NAMES
+from pytown_model.town import Town, TownCreator
+
+
+class Background_test(unittest.TestCase):
+    def test_interned(self):
+        grass = BackgroundCreator().create_grass_backgound()
+        self.assertIs(Background("grass", ["house", "sawmill"], 1), grass)
+        self.assertIs(Background.from_json_dict(grass.to_json_dict()), grass)
+        self.assertIs(pickle.loads(pickle.dumps(grass)), grass)
+        self.assertIsNot(Background("grass", ["house"], 1), grass)
+
+    def test_interned_while_used(self):
+        lava = Background("lava", [], 3)
+        self.assertIs(Background("lava", (), 3), lava)
+        del lava
+        gc.collect()
+        self.assertNotIn(("lava", (), 3), Background._interned)
+
+    def test_immutable(self):
+        water = BackgroundCreator().create_water_background()
+        with self.assertRaises(AttributeError):
+            water.name = "lava"
+        self.assertEqual(
+            water.to_json_dict(),
+            {"name": "water", "buildings_allowed_list": [], "move_multiplicator": 0.5},
+        )
+
+    def test_registry(self):
+        self.assertCountEqual(
+            TerrainRegistry.get_names(), ["grass", "water", "road", "sand"]
+        )
+        self.assertIs(
+            TerrainRegistry.get("road"), BackgroundCreator().create_road_background()
+        )
+
+    def test_compact(self):
+        for name in TerrainRegistry.get_names():
+            background = TerrainRegistry.get(name)
+            self.assertEqual(background.terrain_id, TERRAIN_NAMES.get_id(name))
+            self.assertIs(Background.from_compact(background.to_compact()), background)
+
+    def test_shared_by_tiles(self):
+        town = TownCreator.create_default_town(6, 4)
+        json_town = Town.from_json_dict(town.to_json_dict())
+        self.assertIs(json_town.get_background((0, 0)), town.get_background((1, 0)))
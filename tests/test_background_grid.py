@@ -0,0 +1,67 @@
+import unittest
+
+from pytown_model.entity import BackgroundCreator
+from pytown_model.grid import BackgroundGrid
+from pytown_model.town import Town, TownCreator
+
+
+class BackgroundGrid_test(unittest.TestCase):
+    def setUp(self):
+        self.grid = BackgroundGrid(3, 2)
+
+    def test_set_get(self):
+        self.assertEqual(len(self.grid), 0)
+        self.assertNotIn((0, 0), self.grid)
+
+        self.grid[(1, 1)] = BackgroundCreator().create_water_background()
+        self.assertIn((1, 1), self.grid)
+        self.assertEqual(self.grid[(1, 1)].name, "water")
+        self.assertEqual(len(self.grid), 1)
+
+        with self.assertRaises(KeyError):
+            self.grid[(3, 0)]
+        self.assertNotIn((3, 0), self.grid)
+
+    def test_shared_table(self):
+        self.grid.fill(BackgroundCreator().create_grass_backgound())
+        self.grid[(0, 1)] = BackgroundCreator().create_grass_backgound()
+
+        self.assertEqual(len(self.grid), 6)
+        self.assertEqual(len(self.grid.table), 2)
+        self.assertIs(self.grid[(0, 0)], self.grid[(2, 1)])
+        self.assertEqual(
+            list(self.grid), [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (2, 1)]
+        )
+
+    def test_row_codes(self):
+        grid = BackgroundGrid(3, 2, (10, 20))
+        water = grid.get_code(BackgroundCreator().create_water_background())
+        grid.set_row_codes(21, [0, water, water])
+
+        self.assertEqual(grid.get_row_codes(21).tolist(), [0, water, water])
+        self.assertEqual(grid.get_row_codes(20).tolist(), [0, 0, 0])
+        self.assertEqual(grid[(12, 21)].name, "water")
+        self.assertNotIn((10, 21), grid)
+        self.assertEqual(len(grid), 2)
+        with self.assertRaises(KeyError):
+            grid.get_row_codes(1)
+
+    def test_grid_town(self):
+        town = TownCreator.create_default_town(6, 4, grid=True)
+        self.assertIsInstance(town.backgrounds, BackgroundGrid)
+        self.assertEqual(town.get_size(), (6, 4))
+        self.assertEqual(len(town), 24)
+        self.assertEqual(town.get_background((0, 0)).name, "grass")
+        self.assertEqual(town.get_background((5, 2)).name, "road")
+        self.assertEqual(town.get_background((3, 3)).name, "water")
+
+    def test_json_grid_town(self):
+        town = TownCreator.create_default_town(6, 4, grid=True)
+        json_town = Town.from_json_dict(town.to_json_dict())
+        self.assertIsInstance(json_town.backgrounds, BackgroundGrid)
+        self.assertEqual(json_town.get_size(), (6, 4))
+        self.assertEqual(json_town.to_json_dict(), town.to_json_dict())
+
+        town = TownCreator.create_default_town(6, 4)
+        json_town = Town.from_json_dict(town.to_json_dict())
+        self.assertIsInstance(json_town.backgrounds, dict)
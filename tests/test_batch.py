@@ -0,0 +1,125 @@
+import unittest
+
+from pytown_model.batch import CommandBatch, TickExecutor
+from pytown_model.buildings import BuildingTransaction
+from pytown_model.characters import Player
+from pytown_model.check import CheckError
+from pytown_model.inventory import Item
+from pytown_model.command import (
+    BuyCommand,
+    CollectResourceCommand,
+    MovePlayerCommand,
+    SleepCommand,
+    WakeUpCommand,
+)
+from pytown_model.town import TownCreator
+
+
+class CommandBatch_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_default_town(6, 4)
+        for player_id in range(1, 4):
+            self.town.add_player(Player(player_id, "Lis", 0, 0), (0, 0))
+
+    @staticmethod
+    def _make_command(command, client_id):
+        command.client_id = client_id
+        return command
+
+    def _make_commands(self):
+        return [
+            self._make_command(SleepCommand(), 2),
+            self._make_command(MovePlayerCommand("down"), 1),
+            self._make_command(MovePlayerCommand("up"), 3),
+            self._make_command(WakeUpCommand(), 1),
+            self._make_command(
+                BuyCommand((5, 0), BuildingTransaction("wood", 10, -1)), 1
+            ),
+        ]
+
+    def test_execute(self):
+        batch = CommandBatch(self.town, self._make_commands())
+        with self.assertLogs(level="ERROR"):
+            result = batch.execute()
+
+        # Grouped by type, in the order of CommandsFactory.COMMANDS_DICT
+        self.assertEqual(result.order, [1, 2, 4, 0, 3])
+        self.assertEqual(
+            [result.is_done(index) for index in range(len(result))],
+            [True, True, False, False, False],
+        )
+        self.assertEqual(list(result.errors), [4])
+        self.assertEqual(result.check_results[2].codes, [CheckError.TILE_NOT_IN_TOWN])
+
+        self.assertEqual(self.town.get_player(1).y, 0.05)
+        self.assertEqual(self.town.get_player(2).status, "sleep")
+        self.assertEqual(self.town.get_player(3).y, 0)
+
+        stats = result.stats
+        self.assertEqual(stats.commands_nb, 5)
+        self.assertEqual(
+            (stats.done_nb, stats.rejected_nb, stats.failed_nb), (2, 2, 1)
+        )
+        self.assertEqual(list(stats.by_type), ["move", "buy", "sleep", "wakeup"])
+        self.assertEqual(stats.by_type["move"].done_nb, 1)
+        self.assertEqual(stats.by_type["move"].rejected_nb, 1)
+
+    def test_same_order(self):
+        commands = self._make_commands()[:4]
+        other_town = TownCreator.create_default_town(6, 4)
+        for player_id in range(1, 4):
+            other_town.add_player(Player(player_id, "Lis", 0, 0), (0, 0))
+
+        CommandBatch(self.town, commands).execute()
+        CommandBatch(other_town, reversed(self._make_commands()[:4])).execute()
+        self.assertEqual(
+            self.town.to_json_dict()["players"], other_town.to_json_dict()["players"]
+        )
+
+    def test_journal_error(self):
+        class BrokenJournal:
+            def append(self, command):
+                raise OSError("disk full")
+
+        batch = CommandBatch(
+            self.town, [self._make_command(MovePlayerCommand("down"), 1)]
+        )
+        batch.journal = BrokenJournal()
+        with self.assertRaises(OSError):
+            batch.execute()
+
+        # The command is done but not journaled
+        self.assertEqual(self.town.get_player(1).y, 0.05)
+
+    def test_failed_transfer(self):
+        town = TownCreator.create_basic_town()
+        town.add_player(Player(1, "Lis", 0, 0), (0, 3))
+        command = self._make_command(CollectResourceCommand((0, 3), Item("wood", 2)), 1)
+        command.town = town
+        command._check()
+        self.assertTrue(command.check_result)
+
+        # The resource is emptied between the checks and the transfer
+        town.get_resource((0, 3)).inventory.remove_item(Item("wood", 50))
+        command._do()
+        self.assertFalse(command.check_result)
+        self.assertEqual(command.check_result.codes, [CheckError.ITEM_MIN_QUANTITY])
+        self.assertEqual(command.check_result.msg, "not enough wood (0) to remove 2")
+        self.assertEqual(town.get_player(1).energy.value, 900)
+        self.assertEqual(town.get_player(1).inventory.get_quantity("wood"), 0)
+
+    def test_tick_executor(self):
+        executor = TickExecutor(self.town, fail_fast=True)
+        executor.submit(self._make_command(MovePlayerCommand("down"), 1))
+        executor.submit(self._make_command(MovePlayerCommand("up"), 3))
+        self.assertEqual(len(executor), 2)
+
+        result = executor.tick()
+        self.assertEqual(result.stats.tick, 1)
+        self.assertEqual(self.town.tick, 1)
+        self.assertEqual(len(executor), 0)
+        self.assertEqual(result.stats.done_nb, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,13 @@
+import pickle
 import unittest
 
-from pytown_model.characters import Character
+from pytown_core.serializers import IJSONSerializable
+
+from pytown_model.buildings import BuildingTransaction
+from pytown_model.characters import Character, Player
+from pytown_model.check import CheckResult
+from pytown_model.entity import BackgroundCreator, ResourceCreator
+from pytown_model.inventory import Item
 
 
 class Character_test(unittest.TestCase):
@@ -18,3 +25,28 @@ class Character_test(unittest.TestCase):
         self.assertEqual(clone.name, self.character.name)
         self.assertEqual(clone.direction, self.character.direction)
         self.assertEqual(clone.status, self.character.status)
+
+    def test_pickle(self):
+        player = Player(1, "Lis", 2, 3)
+        player.inventory.add_item(Item("wood", 2))
+        player.energy.regen = 4
+        player.status = "move"
+
+        clone = pickle.loads(pickle.dumps(player))
+        self.assertEqual(clone.to_json_dict(), player.to_json_dict())
+        self.assertEqual(clone.energy.regen_base, 0)
+
+    def test_no_instance_dict(self):
+        player = Player(1, "Lis", 2, 3)
+        for obj in (
+            player,
+            player.energy,
+            player.inventory,
+            Item("wood", 2),
+            CheckResult(),
+            ResourceCreator().create_forest(),
+            BackgroundCreator().create_grass_backgound(),
+            BuildingTransaction("wood", 10, 5),
+        ):
+            self.assertFalse(hasattr(obj, "__dict__"), type(obj).__name__)
+            self.assertIsInstance(obj, IJSONSerializable)
@@ -1,6 +1,8 @@
+import json
 import unittest
+from types import SimpleNamespace
 
-from pytown_model.check import CheckResult
+from pytown_model.check import CheckError, CheckPipeline, CheckResult
 
 
 class CheckResult_test(unittest.TestCase):
@@ -9,6 +11,8 @@ class CheckResult_test(unittest.TestCase):
 
     def test_check_result(self):
 
+        self.assertTrue(self.check_result)
+        self.check_result += ""
         self.assertTrue(self.check_result)
         self.check_result += "Test1"
         self.assertFalse(self.check_result)
@@ -16,3 +20,76 @@ class CheckResult_test(unittest.TestCase):
         self.check_result += "Test2"
         self.assertFalse(self.check_result)
         self.assertEqual(self.check_result.msg, "Test1\nTest2")
+
+    def test_errors(self):
+        self.check_result.add(CheckError.WATER)
+        self.check_result.add(CheckError.TILE_NOT_IN_TOWN, (3, 4))
+        self.assertFalse(self.check_result)
+        self.assertEqual(
+            self.check_result.codes, [CheckError.WATER, CheckError.TILE_NOT_IN_TOWN]
+        )
+        self.assertEqual(
+            self.check_result.msg, "Can't go in water\ntile (3, 4) not in town"
+        )
+
+    def test_json(self):
+        self.assertEqual(
+            CheckResult.from_json_dict(self.check_result.to_json_dict()),
+            self.check_result.msg,
+        )
+        self.assertTrue(CheckResult.from_json_dict({"msg": ""}))
+
+        self.check_result.add(CheckError.NO_ENERGY, 3, 10)
+        self.check_result += "Test"
+        json_dict = json.loads(json.dumps(self.check_result.to_json_dict()))
+        self.assertEqual(json_dict["errors"], [[6, 3, 10], [0, "Test"]])
+
+        check_result = CheckResult.from_json_dict(json_dict)
+        self.assertEqual(check_result.errors, self.check_result.errors)
+        self.assertEqual(check_result.msg, json_dict["msg"])
+
+
+class CheckPipeline_test(unittest.TestCase):
+    @staticmethod
+    def _check_energy(command, check_result):
+        if command.energy < 10:
+            check_result.add(CheckError.NO_ENERGY, command.energy, 10)
+
+    @staticmethod
+    def _check_tile(command, check_result):
+        if command.tile is None:
+            check_result.add(CheckError.TILE_NOT_IN_TOWN, command.tile)
+            return False
+
+    @staticmethod
+    def _check_water(command, check_result):
+        if command.tile == "water":
+            check_result.add(CheckError.WATER)
+
+    def setUp(self):
+        self.pipeline = CheckPipeline(
+            CheckPipeline(self._check_energy, self._check_tile), self._check_water
+        )
+
+    def test_flattened(self):
+        self.assertEqual(len(self.pipeline), 3)
+
+    def test_run(self):
+        command = SimpleNamespace(energy=5, tile="water")
+        check_result = self.pipeline.run(command, CheckResult())
+        self.assertEqual(check_result.codes, [CheckError.NO_ENERGY, CheckError.WATER])
+
+        command.tile = None
+        check_result = self.pipeline.run(command, CheckResult())
+        self.assertEqual(
+            check_result.codes, [CheckError.NO_ENERGY, CheckError.TILE_NOT_IN_TOWN]
+        )
+
+        command.energy = 10
+        command.tile = "grass"
+        self.assertTrue(self.pipeline.run(command, CheckResult()))
+
+    def test_fail_fast(self):
+        command = SimpleNamespace(energy=5, tile="water")
+        check_result = self.pipeline.run(command, CheckResult(), fail_fast=True)
+        self.assertEqual(check_result.codes, [CheckError.NO_ENERGY])
@@ -0,0 +1,119 @@
+import pickle
+import unittest
+
+from pytown_model.check import CheckResult, InventoryAddCheck, InventoryRemoveCheck
+from pytown_model.inventory import (
+    Inventory,
+    InventoryFactoryMethod,
+    Item,
+    ItemMaxQuantityError,
+    ItemNotAllowedError,
+    NegativeValueError,
+)
+from pytown_model.names import ITEM_NAMES
+
+
+class Inventory_test(unittest.TestCase):
+    def setUp(self):
+        self.inventory = Inventory("chest")
+        self.inventory.allow_item("wood", 3)
+        self.inventory.allow_item("plank", 2)
+
+    def test_quantity(self):
+        self.inventory.add_item(Item("wood", 2))
+        self.inventory.remove_item(Item("wood", 1))
+        self.assertEqual(self.inventory.get_quantity("wood"), 1)
+        self.assertEqual(self.inventory.get_quantity("gold"), 0)
+        self.assertTrue(self.inventory.is_item_allowed("plank"))
+        self.assertFalse(self.inventory.is_item_allowed("gold"))
+
+    def test_is_full(self):
+        self.assertFalse(self.inventory.is_full())
+        self.inventory.add_item(Item("wood", 3))
+        self.assertFalse(self.inventory.is_full())
+        self.inventory.add_item(Item("plank", 2))
+        self.assertTrue(self.inventory.is_full())
+        self.inventory.remove_item(Item("plank", 1))
+        self.assertFalse(self.inventory.is_full())
+        self.assertTrue(Inventory("empty").is_full())
+
+    def test_json(self):
+        self.inventory.add_item(Item("plank", 2))
+        json_dict = self.inventory.to_json_dict()
+        names = [item["name"] for item in json_dict["items"]]
+        self.assertEqual(names, ["wood", "plank"])
+
+        clone = Inventory.from_json_dict(json_dict)
+        self.assertEqual(clone.to_json_dict(), json_dict)
+        self.assertEqual(len(clone), 2)
+        self.assertFalse(clone.is_full())
+        clone.add_item(Item("wood", 3))
+        self.assertTrue(clone.is_full())
+
+    def test_compact(self):
+        self.inventory.add_item(Item("plank", 2))
+        compact = self.inventory.to_compact()
+        self.assertEqual(compact[1][1], [ITEM_NAMES.get_id("plank"), 2, 2])
+
+        clone = Inventory.from_compact(compact)
+        self.assertEqual(clone.to_json_dict(), self.inventory.to_json_dict())
+        self.assertEqual(clone.get_quantity("plank"), 2)
+
+    def test_pickle(self):
+        self.inventory.add_item(Item("wood", 1))
+        clone = pickle.loads(pickle.dumps(self.inventory))
+        self.assertEqual(clone.to_json_dict(), self.inventory.to_json_dict())
+        self.assertIn(clone.get_item("wood"), clone)
+
+    def test_contains(self):
+        self.assertIn(self.inventory.get_item("wood"), self.inventory)
+        self.assertNotIn(Item("wood", 0, 3), self.inventory)
+
+    def test_checks(self):
+        check_result = CheckResult()
+        InventoryAddCheck(self.inventory, Item("wood", 4)).check(check_result)
+        InventoryRemoveCheck(self.inventory, Item("plank", 1)).check(check_result)
+        InventoryAddCheck(self.inventory, Item("gold", 1)).check(check_result)
+        self.assertEqual(
+            check_result.msg,
+            "4 > wood max quantity\n"
+            "not enough plank (0) to remove 1\n"
+            "gold not found in inventory",
+        )
+
+
+class InventoryTransfer_test(unittest.TestCase):
+    def setUp(self):
+        self.chest = Inventory("chest")
+        self.chest.allow_item("wood", 10)
+        self.chest.allow_item("plank", 10)
+        self.chest.add_item(Item("wood", 6))
+        self.chest.add_item(Item("plank", 2))
+
+        self.purse = InventoryFactoryMethod.make_purse()
+
+    def test_transfer(self):
+        result = self.chest.transfer(
+            self.purse, [Item("wood", 2), Item("plank", 1), Item("wood", 3)]
+        )
+        self.assertTrue(result)
+        self.assertEqual(result.quantities, {"wood": 5, "plank": 1})
+        self.assertEqual(self.chest.get_quantity("wood"), 1)
+        self.assertEqual(self.purse.get_quantity("wood"), 5)
+        self.assertEqual(self.purse.get_quantity("plank"), 1)
+
+    def test_all_or_nothing(self):
+        self.purse.add_item(Item("plank", 4))
+        result = self.chest.transfer(
+            self.purse, [Item("wood", 1), Item("plank", 2), Item("gold", 1)]
+        )
+        self.assertFalse(result)
+        self.assertEqual(
+            [type(error) for error in result.errors],
+            [ItemMaxQuantityError, ItemNotAllowedError],
+        )
+        self.assertEqual(self.chest.get_quantity("wood"), 6)
+        self.assertEqual(self.purse.get_quantity("wood"), 0)
+
+        with self.assertRaises(NegativeValueError):
+            self.chest.transfer(self.purse, [Item("wood", -1)])
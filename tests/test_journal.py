@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.command import CollectResourceCommand, MovePlayerCommand
+from pytown_model.inventory import Item
+from pytown_model.journal import CommandJournal, recover
+from pytown_model.town import TownCreator
+
+
+class CommandJournal_test(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+        self.town = TownCreator.create_basic_town()
+        self.town.add_player(Player(1, "Lis", 0, 0), (0, 2))
+        self.journal = CommandJournal(self.town, batch_size=2, fsync=False)
+        self.journal.checkpoint()
+
+    def tearDown(self):
+        self.journal.close()
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def _execute(self, command):
+        command.client_id = 1
+        self.journal.execute(command)
+
+    def test_recover(self):
+        self._execute(MovePlayerCommand("right"))
+        self._execute(CollectResourceCommand((0, 3), Item("wood", 2)))
+        self._execute(MovePlayerCommand("down"))
+        self.journal.flush()
+
+        # Rejected commands are not journaled
+        self._execute(CollectResourceCommand((1, 1), Item("wood", 2)))
+        self.journal.flush()
+        self.assertEqual(len(list(CommandJournal.read(self.journal.file_name))), 3)
+
+        town = recover(self.town.name)
+        player = town.get_player(1)
+        self.assertAlmostEqual(player.x, 0.05)
+        self.assertAlmostEqual(player.y, 2.05)
+        self.assertEqual(player.inventory.get_quantity("wood"), 2)
+        self.assertEqual(town.get_resource((0, 3)).inventory.get_quantity("wood"), 48)
+
+    def test_checkpoint(self):
+        self._execute(MovePlayerCommand("right"))
+        self.journal.checkpoint()
+        self.assertEqual(list(CommandJournal.read(self.journal.file_name)), [])
+
+        self._execute(MovePlayerCommand("right"))
+        self.journal.flush()
+
+        town = recover(self.town.name)
+        self.assertAlmostEqual(town.get_player(1).x, 0.1)
+
+    def test_torn_record(self):
+        self._execute(MovePlayerCommand("right"))
+        self.journal.flush()
+        with open(self.journal.file_name, "a") as journal_file:
+            journal_file.write('{"command": "mo')
+
+        town = recover(self.town.name)
+        self.assertEqual(town.get_player(1).x, 0.05)
+
+    def test_ticks(self):
+        self._execute(MovePlayerCommand("right"))
+        self.journal.tick()
+        self.journal.tick()
+        self._execute(MovePlayerCommand("right"))
+        self.journal.flush()
+
+        town = recover(self.town.name)
+        self.assertEqual(town.tick, 2)
+        self.assertEqual(
+            town.get_player(1).to_json_dict(), self.town.get_player(1).to_json_dict()
+        )
+
+        # Ticks before the checkpoint are part of the snapshot
+        self.journal.checkpoint()
+        self.journal.tick()
+        self.journal.flush()
+        self.assertEqual(recover(self.town.name).tick, 3)
+
+    def test_rejected_on_replay(self):
+        command = CollectResourceCommand((1, 1), Item("wood", 2))
+        command.client_id = 1
+        # Journaled as done, after a change newer than the snapshot
+        self.town.get_player(1).energy.value -= 1
+        self.journal.append(command)
+        self.journal.flush()
+
+        with self.assertLogs(level="WARNING") as logs:
+            recover(self.town.name)
+        self.assertIn("collect rejected on replay", logs.output[0])
@@ -0,0 +1,34 @@
+import unittest
+
+from pytown_model.inventory import Item
+from pytown_model.lazy import LazyEntityDict
+from pytown_model.town import Town, TownCreator
+
+
+class LazyTown_test(unittest.TestCase):
+    def setUp(self):
+        self.town_dict = TownCreator.create_basic_town().to_json_dict()
+        self.town = Town.from_json_dict(self.town_dict, lazy=True)
+
+    def test_built_on_access(self):
+        self.assertIsInstance(self.town.backgrounds, LazyEntityDict)
+        self.assertEqual(self.town.backgrounds.built_keys(), [])
+        self.assertIn((3, 3), self.town.backgrounds)
+        self.assertEqual(self.town.backgrounds.built_keys(), [])
+
+        self.assertEqual(self.town.get_background((3, 3)).name, "grass")
+        self.assertEqual(self.town.get_building((7, 3)).name, "sawmill")
+        self.assertEqual(self.town.backgrounds.built_keys(), [(3, 3)])
+        self.assertEqual(self.town.buildings.built_keys(), [(7, 3)])
+        self.assertEqual(self.town.get_size(), (11, 6))
+
+    def test_same_town(self):
+        town = Town.from_json_dict(self.town_dict)
+        self.assertEqual(self.town.to_json_dict(), town.to_json_dict())
+
+    def test_built_entities_are_tracked(self):
+        since = self.town.tracker.version
+        self.town.get_resource((0, 3)).inventory.remove_item(Item("wood", 1))
+
+        delta = self.town.to_delta_json_dict(since)
+        self.assertEqual(list(delta["resources"]), [(0, 3)])
@@ -0,0 +1,100 @@
+import pickle
+import unittest
+
+from pytown_model.buildings.factory import SawmillFactory
+from pytown_model.characters import Player
+from pytown_model.entity import ResourceCreator
+from pytown_model.inventory import Item
+from pytown_model.town import TownCreator
+
+
+class InventoryLedger_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_default_town(6, 4)
+        self.town.set_resource(ResourceCreator().create_forest(), (0, 0))
+        self.town.set_resource(ResourceCreator().create_forest(), (1, 0))
+        self.town.set_building(SawmillFactory().create_building(), (2, 0))
+        self.town.set_building(SawmillFactory().create_building(), (3, 0))
+        for player_id in range(1, 4):
+            self.town.add_player(Player(player_id, "Lis", 0, 0), (player_id, 1))
+
+        self.ledger = self.town.use_ledger()
+
+    def test_get_total(self):
+        self.assertEqual(self.ledger.get_total("wood"), 100)
+        self.assertEqual(self.ledger.get_total("wood", "players"), 0)
+
+        self.town.get_player(1).inventory.add_item(Item("wood", 3))
+        self.town.get_building((2, 0)).inventory.add_item(Item("wood", 4))
+        self.town.get_resource((0, 0)).inventory.remove_item(Item("wood", 7))
+
+        self.assertEqual(self.ledger.get_total("wood"), 100)
+        self.assertEqual(self.ledger.get_total("wood", "players"), 3)
+        self.assertEqual(self.ledger.get_total("wood", "buildings"), 4)
+        self.assertEqual(self.ledger.get_total("gold"), 0)
+
+    def test_transfer(self):
+        forest = self.town.get_resource((0, 0))
+        player = self.town.get_player(2)
+        forest.inventory.transfer(player.inventory, [Item("wood", 5)])
+
+        self.assertEqual(self.ledger.get_total("wood", "resources"), 95)
+        self.assertEqual(self.ledger.get_holders("wood", "players"), [("players", 2)])
+
+    def test_get_top_holders(self):
+        self.town.get_player(1).inventory.add_item(Item("wood", 2))
+        self.town.get_player(3).inventory.add_item(Item("wood", 5))
+        self.town.get_resource((1, 0)).inventory.remove_item(Item("wood", 1))
+
+        self.assertEqual(
+            self.ledger.get_top_holders("wood", 2),
+            [(("resources", (0, 0)), 50), (("resources", (1, 0)), 49)],
+        )
+        self.assertEqual(
+            self.ledger.get_top_holders("wood", 5, "players"),
+            [(("players", 3), 5), (("players", 1), 2)],
+        )
+
+    def test_get_stock_by_building_type(self):
+        building = self.town.get_building((3, 0))
+        building.inventory.add_item(Item("wood", 6))
+        self.assertEqual(
+            self.ledger.get_stock_by_building_type("wood"),
+            {"sawmillconstruction": 6},
+        )
+
+        # The upgraded building stocks in the inventory of its new state
+        building.upgrade()
+        building.inventory.add_item(Item("plank", 2))
+        self.assertEqual(
+            self.ledger.get_stock_by_building_type("wood"),
+            {"sawmillconstruction": 0, "sawmill": 0},
+        )
+        self.assertEqual(
+            self.ledger.get_stock_by_building_type("plank"),
+            {"sawmillconstruction": 0, "sawmill": 2},
+        )
+
+    def test_entities_changed(self):
+        self.town.get_player(1).inventory.add_item(Item("wood", 3))
+        self.town.remove_player(1)
+        self.assertEqual(self.ledger.get_total("wood", "players"), 0)
+
+        player = Player(4, "Lis", 0, 0)
+        player.inventory.add_item(Item("coal", 2))
+        self.town.add_player(player, (4, 1))
+        self.town.set_resource(ResourceCreator().create_golden_vein(), (0, 0))
+
+        self.assertEqual(self.ledger.get_total("coal"), 2)
+        self.assertEqual(self.ledger.get_total("wood"), 50)
+        self.assertEqual(self.ledger.get_total("gold"), 50)
+
+    def test_pickle(self):
+        inventory = self.town.get_player(1).inventory
+        inventory_copy = pickle.loads(pickle.dumps(inventory))
+        inventory_copy.add_item(Item("wood", 3))
+        self.assertEqual(self.ledger.get_total("wood", "players"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import threading
+import unittest
+
+from pytown_model.command import CommandsFactory
+from pytown_model.names import ITEM_NAMES, NameRegistry, UnknownNameError
+
+
+class NameRegistry_test(unittest.TestCase):
+    def test_ids(self):
+        registry = NameRegistry(("wood", "plank"))
+        self.assertEqual(registry.get_id("wood"), 0)
+        self.assertEqual(registry.get_id("plank"), 1)
+        self.assertIsNone(registry.find_id("gold"))
+        self.assertNotIn("gold", registry)
+
+        self.assertEqual(registry.get_id("gold"), 2)
+        self.assertEqual(registry.get_id("gold"), 2)
+        self.assertEqual(registry.get_name(2), "gold")
+        self.assertEqual(registry.get_names(), ["wood", "plank", "gold"])
+        self.assertEqual(len(registry), 3)
+
+    def test_items(self):
+        for name in ("wood", "plank", "coal", "gold"):
+            self.assertEqual(ITEM_NAMES.get_name(ITEM_NAMES.get_id(name)), name)
+
+    def test_parallel_ids(self):
+        registry = NameRegistry()
+        names = ["name{}".format(i) for i in range(200)]
+
+        def register():
+            for name in names:
+                registry.get_id(name)
+
+        threads = [threading.Thread(target=register) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(registry.get_names(), names)
+
+    def test_unknown_names_from_clients(self):
+        items_nb = len(ITEM_NAMES)
+        with self.assertRaises(UnknownNameError):
+            ITEM_NAMES.get_known_id("unobtainium")
+
+        for podsixnet_dict in (
+            {
+                "command": "collect",
+                "tile": [0, 3],
+                "item": {"name": "unobtainium", "quantity": 1, "max_quantity": 0},
+            },
+            {
+                "command": "buy",
+                "tile": [0, 3],
+                "transaction": {
+                    "item_name": "unobtainium",
+                    "buy_price": 1,
+                    "sell_price": 1,
+                },
+            },
+        ):
+            podsixnet_dict["client_id"] = 1
+            podsixnet_dict["check_result"] = {"msg": ""}
+            with self.assertRaises(UnknownNameError):
+                CommandsFactory.from_podsixnet(podsixnet_dict)
+        self.assertEqual(len(ITEM_NAMES), items_nb)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pytown_model.batch import CommandBatch
+from pytown_model.buildings.factory import HouseFactory
+from pytown_model.characters import Player
+from pytown_model.command import (
+    ALL,
+    BuildCommand,
+    MovePlayerCommand,
+    SleepCommand,
+    WakeUpCommand,
+)
+from pytown_model.parallel import ParallelCommandBatch, WaveScheduler
+from pytown_model.town import TownCreator
+
+
+class WaveScheduler_test(unittest.TestCase):
+    def test_add(self):
+        scheduler = WaveScheduler()
+        self.assertEqual(scheduler.add(0, (set(), {("players", 1)})), 0)
+        self.assertEqual(scheduler.add(1, (set(), {("players", 2)})), 0)
+        self.assertEqual(scheduler.add(2, (set(), {("players", 1)})), 1)
+        self.assertEqual(scheduler.add(3, ({("buildings", ALL)}, {("players", 3)})), 0)
+        self.assertEqual(
+            scheduler.add(4, (set(), {("players", 4), ("buildings", (1, 1))})), 1
+        )
+        self.assertEqual(scheduler.add(5, ({("buildings", ALL)}, set())), 2)
+        self.assertEqual(scheduler.add(6, None), 3)
+        self.assertEqual(scheduler.add(7, (set(), {("players", 2)})), 4)
+        self.assertEqual(scheduler.waves, [[0, 1, 3], [2, 4], [5], [6], [7]])
+
+
+class ParallelCommandBatch_test(unittest.TestCase):
+    @staticmethod
+    def _create_town():
+        town = TownCreator.create_default_town(6, 4)
+        town.set_building(HouseFactory().create_building(), (4, 0))
+        for player_id in range(1, 7):
+            town.add_player(Player(player_id, "Lis", 0, 0), (player_id - 1, 0))
+        return town
+
+    @staticmethod
+    def _make_commands():
+        commands = []
+        for player_id in range(1, 7):
+            for command in (
+                MovePlayerCommand("down"),
+                SleepCommand(),
+                MovePlayerCommand("down"),
+                WakeUpCommand(),
+                MovePlayerCommand("up"),
+            ):
+                command.client_id = player_id
+                commands.append(command)
+
+        command = BuildCommand((2, 1), "house")
+        command.client_id = 1
+        commands.append(command)
+        return commands
+
+    def test_same_as_serial(self):
+        town = self._create_town()
+        serial_town = self._create_town()
+
+        with ThreadPoolExecutor(4) as executor:
+            batch = ParallelCommandBatch(town, self._make_commands(), executor=executor)
+            result = batch.execute()
+        serial_result = CommandBatch(serial_town, self._make_commands()).execute()
+
+        self.assertEqual(town.to_json_dict(), serial_town.to_json_dict())
+        self.assertEqual(
+            [check_result.msg for check_result in result.check_results],
+            [check_result.msg for check_result in serial_result.check_results],
+        )
+        self.assertCountEqual(result.order, serial_result.order)
+        self.assertEqual(result.stats.done_nb, serial_result.stats.done_nb)
+        self.assertLess(result.stats.waves_nb, len(result))
+
+    def test_without_executor(self):
+        town = self._create_town()
+        result = ParallelCommandBatch(town, self._make_commands()).execute()
+        self.assertIsNone(result.stats.waves_nb)
+
+
+if __name__ == "__main__":
+    unittest.main()
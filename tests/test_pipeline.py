@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.pipeline import CommandPipeline, PipelineClosedError
+from pytown_model.town import TownCreator
+
+
+class CommandPipeline_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_default_town(6, 4)
+        for player_id in range(1, 4):
+            self.town.add_player(Player(player_id, "Lis", 0, 0), (0, 0))
+        self.sent = []
+
+    async def _send(self, client_id, podsixnet_dict):
+        self.sent.append((client_id, podsixnet_dict))
+
+    def test_apply(self):
+        # Batches run on the worker thread, not on the event loop
+        threads = set()
+        self.town.tracker.listeners.append(
+            lambda section, key: threads.add(threading.get_ident())
+        )
+
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send)
+            pipeline.start()
+            await pipeline.submit(1, {"command": "move", "direction": "down"})
+            await pipeline.submit(3, {"command": "move", "direction": "up"})
+            # The client_id of the message is ignored
+            await pipeline.submit(2, {"command": "sleep", "client_id": 1})
+            await pipeline.close()
+
+        asyncio.run(run())
+        self.assertEqual(self.town.get_player(1).y, 0.05)
+        self.assertEqual(self.town.get_player(2).status, "sleep")
+        self.assertEqual(self.town.get_player(3).y, 0)
+        self.assertEqual(len(threads), 1)
+        self.assertNotIn(threading.get_ident(), threads)
+
+        results = dict(self.sent)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1]["action"], "command")
+        self.assertEqual(results[1]["check_result"]["msg"], "")
+        self.assertNotEqual(results[3]["check_result"]["msg"], "")
+
+    def test_rejected(self):
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send)
+            pipeline.start()
+            await pipeline.submit(1, {"command": "fly"})
+            await pipeline.close()
+            return pipeline.add_client(1)
+
+        with self.assertLogs(level="ERROR"):
+            channel = asyncio.run(run())
+        self.assertEqual(channel.rejected_nb, 1)
+        self.assertEqual(self.sent, [])
+
+    def test_fairness(self):
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send, batch_size=3)
+            for client_id in (1, 2):
+                pipeline.add_client(client_id)
+            for _ in range(4):
+                pipeline.add_client(1).commands.put_nowait(1)
+            pipeline.add_client(2).commands.put_nowait(2)
+
+            rounds = []
+            for _ in range(3):
+                round_commands = pipeline._take_round()
+                rounds.append([command for (_, command) in round_commands])
+            return rounds
+
+        self.assertEqual(asyncio.run(run()), [[1, 2, 1], [1, 1], []])
+
+    def test_backpressure(self):
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send, queue_size=2)
+            message = {"command": "move", "direction": "down"}
+            pipeline.submit_nowait(1, message)
+            pipeline.submit_nowait(1, message)
+            with self.assertRaises(asyncio.QueueFull):
+                pipeline.submit_nowait(1, message)
+
+            # The other clients aren't blocked by a full client
+            pipeline.submit_nowait(2, message)
+
+            pipeline.start()
+            await pipeline.submit(1, message)
+            await pipeline.close()
+            with self.assertRaises(PipelineClosedError):
+                await pipeline.submit(1, message)
+
+        asyncio.run(run())
+        self.assertEqual([client_id for (client_id, _) in self.sent].count(1), 3)
+        self.assertEqual(len(self.sent), 4)
+
+    def test_journal_error(self):
+        class FailingJournal:
+            def append(self, command):
+                raise OSError("disk full")
+
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send, journal=FailingJournal())
+            pipeline.start()
+            message = {"command": "move", "direction": "down"}
+            for client_id in (1, 2, 1):
+                await pipeline.submit(client_id, message)
+            # The joins of close are released by the stopped pipeline
+            with self.assertRaises(OSError):
+                await pipeline.close()
+            self.assertFalse(pipeline.running)
+            with self.assertRaises(PipelineClosedError):
+                await pipeline.submit(1, message)
+
+        with self.assertLogs(level="ERROR"):
+            asyncio.run(asyncio.wait_for(run(), 5))
+        self.assertEqual(self.sent, [])
+
+    def test_close_without_drain(self):
+        async def run():
+            pipeline = CommandPipeline(self.town, self._send)
+            pipeline.submit_nowait(1, {"command": "move", "direction": "down"})
+            await pipeline.close(drain=False)
+            self.assertFalse(pipeline.running)
+
+        asyncio.run(run())
+        self.assertEqual(self.sent, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.regeneration import (
+    get_ticks_to,
+    regenerate_bounded_value,
+    regenerate_once,
+    regenerate_value,
+)
+from pytown_model.snapshot import TownSnapshot, read_snapshot
+from pytown_model.town import Town, TownCreator
+
+
+class Regeneration_test(unittest.TestCase):
+    def test_regenerate_value(self):
+        for (value, regen, value_limit) in [(10, 3, 20), (25, 3, 20), (10, -3, 20)]:
+            expected = value
+            for ticks in range(1, 12):
+                expected = regenerate_once(expected, regen, value_limit)
+                self.assertEqual(
+                    regenerate_value(value, regen, value_limit, ticks), expected
+                )
+
+    def test_regenerate_bounded_value(self):
+        for (energy, regen, bound) in [
+            (900, 0, (1000, -1, 1000)),
+            (10, 4, (30, -3, 1000)),
+            (50, -2, (0, 5, 60)),
+            (0, 7, (20, 1, 35)),
+        ]:
+            (hunger, expected) = (bound[0], energy)
+            for ticks in range(1, 30):
+                hunger = regenerate_once(hunger, bound[1], bound[2])
+                expected = regenerate_once(expected, regen, min(40, hunger))
+                self.assertEqual(
+                    regenerate_bounded_value(energy, regen, 40, bound, ticks),
+                    expected,
+                )
+
+    def test_get_ticks_to(self):
+        self.assertEqual(get_ticks_to(10, -3, 20, 0), 4)
+        self.assertEqual(get_ticks_to(10, 3, 20, 20), 4)
+        self.assertEqual(get_ticks_to(10, 3, 20, 30), None)
+        self.assertEqual(get_ticks_to(10, 0, 20, 20), None)
+
+
+class LazyPlayerStatuses_test(unittest.TestCase):
+    def setUp(self):
+        self.town = self._create_town()
+        self.reference_town = self._create_town()
+
+    @staticmethod
+    def _create_town():
+        town = TownCreator.create_default_town(6, 4)
+        for player_id in range(1, 3):
+            town.add_player(Player(player_id, "Lis", 0, 0), (player_id, 1))
+            town.get_player(player_id).hunger.value = 30
+        town.get_player(2).energy.regen = 4
+        return town
+
+    def _get_statuses(self, town):
+        return [player.to_json_dict() for player in town.players.values()]
+
+    def test_tick_players(self):
+        self.town.use_lazy_statuses()
+        for tick in range(50):
+            if tick == 20:
+                for town in (self.town, self.reference_town):
+                    town.get_player(1).hunger.regen = 2
+                    town.get_player(2).energy.value -= 20
+            self.town.tick_players()
+            self.reference_town.tick_players()
+            if tick % 7 == 0:
+                self.assertEqual(
+                    self._get_statuses(self.town),
+                    self._get_statuses(self.reference_town),
+                )
+        self.assertEqual(
+            self._get_statuses(self.town), self._get_statuses(self.reference_town)
+        )
+
+    def test_no_change_per_tick(self):
+        self.town.use_lazy_statuses()
+        version = self.town.tracker.version
+        for _ in range(10):
+            self.town.tick_players()
+        self.assertEqual(self.town.tracker.version, version)
+        self.assertEqual(self.town.get_player(1).hunger.value, 20)
+
+    def test_tracked_update(self):
+        self.town.use_lazy_statuses()
+        for _ in range(5):
+            self.town.tick_players()
+        version = self.town.tracker.version
+        self.assertEqual(self.town.get_player(1).hunger.value, 25)
+        self.assertEqual(self.town.tracker.get_changes(version), [("players", 1)])
+
+    def test_snapshot(self):
+        self.town.use_lazy_statuses()
+        for _ in range(5):
+            self.town.tick_players()
+            self.reference_town.tick_players()
+        self.town.get_player(2).hunger.value
+        snapshot = TownSnapshot(self.town)
+        for _ in range(5):
+            self.town.tick_players()
+        self.town.get_player(2).hunger.value
+
+        # The statuses are saved as of the snapshot, computed up to its tick
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "lazy.pytown")
+            snapshot.write(file_name)
+            town = read_snapshot(Town("empty"), file_name)
+        self.assertEqual(town.tick, 5)
+        self.assertEqual(
+            self._get_statuses(town), self._get_statuses(self.reference_town)
+        )
+
+    def test_events(self):
+        events = []
+        self.town.on_status_event = lambda player, event: events.append(
+            (self.town.tick, player.player_id, event)
+        )
+        self.town.use_lazy_statuses()
+        self.town.get_player(1).energy.regen = 1
+        for _ in range(40):
+            self.town.tick_players()
+
+        # Energy of player 2 is limited by hunger and never gets full
+        self.assertCountEqual(
+            events, [(30, 1, "hunger_empty"), (30, 2, "hunger_empty")]
+        )
+
+        player = self.town.get_player(2)
+        player.hunger.value = 1000
+        player.hunger.regen = 0
+        player.energy.value = 980
+        for _ in range(10):
+            self.town.tick_players()
+        self.assertEqual(events[2:], [(45, 2, "energy_full")])
+
+    def test_remove_player(self):
+        self.town.use_lazy_statuses()
+        player = self.town.get_player(1)
+        for _ in range(5):
+            self.town.tick_players()
+        self.town.remove_player(1)
+        for _ in range(5):
+            self.town.tick_players()
+        self.assertEqual(player.hunger.value, 25)
+        self.assertIsNone(player.hunger._lazy)
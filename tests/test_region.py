@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.entity import ResourceCreator
+from pytown_model.inventory import Item
+from pytown_model.region import Region
+from pytown_model.snapshot import MAGIC
+from pytown_model.town import TownCreator, TownEntityNotFound
+
+
+class RegionTown_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.town = TownCreator.create_chunked_town(
+            100, 50, region_size=10, directory=self.directory.name
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lazy_regions(self):
+        self.assertEqual(self.town.get_size(), (100, 50))
+        self.assertEqual(list(self.town.regions.regions), [(0, 0)])
+
+        self.assertEqual(self.town.get_background((55, 42)).name, "grass")
+        self.assertTrue(self.town.regions.is_loaded((5, 4)))
+        self.assertNotIn((100, 0), self.town.backgrounds)
+
+        with self.assertRaises(TownEntityNotFound):
+            self.town.get_resource((55, 42))
+
+    def test_evict_and_reload(self):
+        self.town.set_resource(ResourceCreator().create_forest(), (55, 42))
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 3))
+
+        self.town.evict_regions(radius=1)
+        self.assertFalse(self.town.regions.is_loaded((5, 4)))
+        self.assertTrue(self.town.regions.is_loaded((0, 0)))
+
+        resource = self.town.get_resource((55, 42))
+        self.assertEqual(resource.name, "forest")
+        self.assertEqual(resource.inventory.get_quantity("wood"), 50)
+
+    def test_save_load(self):
+        self.town.set_resource(ResourceCreator().create_forest(), (55, 42))
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 3))
+
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            self.town.save()
+            resource = self.town.get_resource((55, 42))
+            resource.inventory.remove_item(Item("wood", 10))
+            self.town.move_player(1, 4, 4)
+            self.town.load()
+        finally:
+            os.chdir(cwd)
+
+        # Only the players are read, the regions are loaded again on demand
+        self.assertIsNotNone(self.town.regions)
+        self.assertEqual(list(self.town.regions.regions), [])
+        self.assertEqual(self.town.get_player_tile(1), (2, 3))
+        resource = self.town.get_resource((55, 42))
+        self.assertEqual(resource.inventory.get_quantity("wood"), 50)
+
+    def test_save_async(self):
+        self.town.set_resource(ResourceCreator().create_forest(), (55, 42))
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 3))
+        file_name = self.town.regions.get_region_file_name((5, 4))
+
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            future = self.town.save_async()
+            resource = self.town.get_resource((55, 42))
+            resource.inventory.remove_item(Item("wood", 10))
+            self.town.move_player(1, 4, 4)
+            self.assertIsNone(future.result(5))
+        finally:
+            os.chdir(cwd)
+
+        # The loaded regions are written as of the snapshot by the worker
+        region = Region.read(file_name)
+        self.assertEqual(region.resources[(55, 42)].inventory.get_quantity("wood"), 50)
+        self.assertEqual(self.town.tracker.listeners, [])
+
+    def test_region_file(self):
+        self.town.set_resource(ResourceCreator().create_forest(), (55, 42))
+        self.town.evict_regions(radius=0)
+
+        file_name = self.town.regions.get_region_file_name((5, 4))
+        with open(file_name, "rb") as region_file:
+            self.assertEqual(region_file.read(len(MAGIC)), MAGIC)
+        region = Region.read(file_name)
+        self.assertEqual(region.key, (5, 4))
+        self.assertEqual(region.backgrounds.origin, (50, 40))
+        self.assertEqual(region.backgrounds[(59, 49)].name, "grass")
+        self.assertEqual(region.resources[(55, 42)].name, "forest")
@@ -0,0 +1,19 @@
+import unittest
+
+from pytown_model.scheduler import EventScheduler
+
+
+class EventScheduler_test(unittest.TestCase):
+    def test_run_until(self):
+        scheduler = EventScheduler()
+        calls = []
+        scheduler.schedule(3, lambda: calls.append("b"))
+        scheduler.schedule(1, lambda: calls.append("a"))
+        scheduler.schedule(3, lambda: calls.append("c"))
+        scheduler.schedule(2, lambda: calls.append("x")).cancel()
+
+        scheduler.run_until(2)
+        self.assertEqual(calls, ["a"])
+        scheduler.run_until(5)
+        self.assertEqual(calls, ["a", "b", "c"])
+        self.assertEqual(len(scheduler), 0)
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from pytown_model.buildings.factory import BuildingFactory
+from pytown_model.characters import Player
+from pytown_model.entity import Background, BackgroundCreator
+from pytown_model.inventory import Item
+from pytown_model.snapshot import (
+    SnapshotError,
+    TownSnapshot,
+    read_snapshot,
+    write_snapshot,
+)
+from pytown_model.town import Town, TownCreator
+
+
+class Snapshot_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "basictown.pytown")
+
+        self.town = TownCreator.create_basic_town()
+        self.town.set_background(BackgroundCreator().create_water_background(), (3, 4))
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 2))
+        self.town.get_player(1).inventory.add_item(Item("wood", 3))
+        write_snapshot(self.town, self.file_name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write_read(self):
+        town = read_snapshot(Town("empty"), self.file_name)
+
+        self.assertEqual(town.name, "basictown")
+        self.assertEqual(town.tracker.version, self.town.tracker.version)
+        self.assertEqual(town.get_size(), (11, 6))
+        self.assertEqual(town.get_background((3, 4)).name, "water")
+        # The backgrounds are read in a grid
+        town_dict = town.to_json_dict()
+        self.assertEqual(town_dict.pop("size"), [11, 6])
+        self.assertEqual(town_dict, self.town.to_json_dict())
+
+    def test_building_upgrade_chain(self):
+        self.town.set_building(BuildingFactory.create_building_by_name("house"), (1, 1))
+        write_snapshot(self.town, self.file_name)
+
+        town = read_snapshot(Town("empty"), self.file_name)
+        building = town.get_building((1, 1))
+        self.assertEqual(building.name, "houseconstruction")
+        building.upgrade()
+        self.assertEqual(building.name, "cabane")
+
+    def test_wide_codes(self):
+        # More than 255 background types don't fit in a byte
+        town = TownCreator.create_default_town(20, 20, grid=True)
+        for i in range(300):
+            background = Background("terrain{}".format(i), [], 1)
+            town.set_background(background, (i % 20, i // 20))
+        self.assertEqual(town.backgrounds.typecode, "H")
+        write_snapshot(town, self.file_name)
+
+        read_town = read_snapshot(Town("empty"), self.file_name)
+        self.assertEqual(read_town.get_background((19, 14)).name, "terrain299")
+        self.assertEqual(read_town.to_json_dict(), town.to_json_dict())
+
+    def test_read_selected_sections(self):
+        town = read_snapshot(Town("empty"), self.file_name, sections=("players",))
+
+        self.assertEqual(town.backgrounds, {})
+        self.assertEqual(town.buildings, {})
+        self.assertEqual(town.get_player(1).inventory.get_quantity("wood"), 3)
+
+    def test_mmap_backgrounds(self):
+        town = read_snapshot(Town("empty"), self.file_name, use_mmap=True)
+        self.assertEqual(town.get_background((3, 4)).name, "water")
+
+        town.set_background(BackgroundCreator().create_road_background(), (3, 4))
+        self.assertEqual(town.get_background((3, 4)).name, "road")
+
+        # The file is not modified through the map
+        town = read_snapshot(Town("empty"), self.file_name)
+        self.assertEqual(town.get_background((3, 4)).name, "water")
+
+    def test_not_a_snapshot(self):
+        with open(self.file_name, "wb") as snapshot_file:
+            snapshot_file.write(b"not a town")
+
+        with self.assertRaises(SnapshotError):
+            read_snapshot(Town("empty"), self.file_name)
+
+
+class TownSnapshot_test(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, "basictown.pytown")
+
+        self.town = TownCreator.create_basic_town()
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 2))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_copy_on_write(self):
+        snapshot = TownSnapshot(self.town)
+
+        self.town.move_player(1, 4, 4)
+        self.town.get_resource((0, 3)).inventory.remove_item(Item("wood", 10))
+        self.town.set_background(BackgroundCreator().create_water_background(), (1, 1))
+        self.town.add_player(Player(2, "Mehdi", 0, 0), (3, 3))
+
+        snapshot.write(self.file_name)
+        self.assertEqual(self.town.tracker.listeners, [])
+
+        town = read_snapshot(Town("empty"), self.file_name)
+        self.assertEqual(town.get_player_tile(1), (2, 2))
+        self.assertIsNone(town.get_player(2))
+        self.assertEqual(town.get_resource((0, 3)).inventory.get_quantity("wood"), 50)
+        self.assertEqual(town.get_background((1, 1)).name, "grass")
+
+    def test_save_async(self):
+        cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        try:
+            saved = threading.Event()
+            future = self.town.save_async(lambda future: saved.set())
+            self.town.move_player(1, 4, 4)
+
+            self.assertIsNone(future.result())
+            self.assertTrue(saved.wait(5))
+            town = Town("basictown")
+            town.load()
+            self.assertEqual(town.get_player_tile(1), (2, 2))
+        finally:
+            os.chdir(cwd)
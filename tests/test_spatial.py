@@ -0,0 +1,24 @@
+import unittest
+
+from pytown_model.spatial import TileBucketIndex
+
+
+class TileBucketIndex_test(unittest.TestCase):
+    def setUp(self):
+        self.index = TileBucketIndex(bucket_size=4)
+        for tile in [(0, 0), (3, 3), (4, 4), (9, 2), (-1, 5), (30, 30)]:
+            self.index.add(tile)
+
+    def test_query(self):
+        self.assertEqual(self.index.query(0, 0, 4, 4), [(0, 0), (3, 3), (4, 4)])
+        self.assertEqual(
+            self.index.query(-2, 0, 9, 5), [(-1, 5), (0, 0), (3, 3), (4, 4), (9, 2)]
+        )
+        self.assertEqual(self.index.query(10, 10, 20, 20), [])
+        self.assertEqual(self.index.query(0, 0, 100, 100)[-1], (30, 30))
+
+    def test_discard(self):
+        self.index.discard((3, 3))
+        self.index.discard((7, 7))
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.query(0, 0, 3, 3), [(0, 0)])
@@ -0,0 +1,63 @@
+import pickle
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.town import TownCreator
+
+
+class PlayerStatusStore_test(unittest.TestCase):
+    def setUp(self):
+        self.town = self._create_town()
+        self.reference_town = self._create_town()
+
+    @staticmethod
+    def _create_town():
+        town = TownCreator.create_default_town(6, 4)
+        for player_id in range(1, 4):
+            town.add_player(Player(player_id, "Lis", 0, 0), (player_id, 1))
+        return town
+
+    def _set_statuses(self, town):
+        town.get_player(1).hunger.value = 3
+        town.get_player(2).energy.regen = 4
+        town.get_player(3).health.regen = -200
+
+    def test_tick_players(self):
+        self.town.use_status_store()
+        self._set_statuses(self.town)
+        self._set_statuses(self.reference_town)
+
+        for _ in range(5):
+            self.town.tick_players()
+            self.reference_town.tick_players()
+        self.assertEqual(
+            self.town.to_json_dict()["players"],
+            self.reference_town.to_json_dict()["players"],
+        )
+        self.assertEqual(self.town.get_player(1).energy.value, 0)
+        self.assertEqual(self.town.get_player(3).health.value, 0)
+
+    def test_tracking(self):
+        self.town.use_status_store()
+        version = self.town.tracker.version
+        self.town.tick_players()
+        changes = self.town.tracker.get_changes(version)
+        self.assertCountEqual(changes, [("players", 1), ("players", 2), ("players", 3)])
+
+    def test_remove_player(self):
+        self.town.use_status_store()
+        player = self.town.get_player(2)
+        self.town.remove_player(2)
+        self.town.tick_players()
+        self.assertEqual(player.hunger.value, 1000)
+        self.assertEqual(len(self.town.status_store), 2)
+
+        self.town.add_player(Player(4, "Mehdi", 0, 0), (0, 0))
+        self.town.tick_players()
+        self.assertEqual(self.town.get_player(4).hunger.value, 999)
+
+    def test_pickle(self):
+        self.town.use_status_store()
+        player = pickle.loads(pickle.dumps(self.town.get_player(1)))
+        self.assertEqual(len(player.hunger._columns), 1)
+        self.assertEqual(player.hunger.value, 1000)
@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.stream import StreamDecodeError, TownStreamDecoder, TownStreamEncoder
+from pytown_model.town import TownCreator
+
+
+class TownStream_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_basic_town()
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 2))
+
+    def _assert_same_town(self, town):
+        town_dict = town.to_json_dict()
+        expected_dict = self.town.to_json_dict()
+        del town_dict["version"]
+        del expected_dict["version"]
+        # The backgrounds of a decoded town are in a grid
+        town_dict.pop("size")
+        expected_dict.pop("size", None)
+        self.assertEqual(town_dict, expected_dict)
+
+    def test_dump_load(self):
+        text_file = io.StringIO()
+        TownStreamEncoder(self.town).dump(text_file)
+        text_file.seek(0)
+
+        town = TownStreamDecoder.load(text_file, chunk_size=7)
+        self._assert_same_town(town)
+        self.assertEqual(town.synced_version, self.town.tracker.version)
+        self.assertEqual(town.get_players_by_tile((2, 2))[0].name, "Lis")
+
+    def test_grid_town(self):
+        self.town = TownCreator.create_default_town(5, 4, grid=True)
+        records = list(TownStreamEncoder(self.town).iter_records())
+        self.assertEqual(
+            [record["type"] for record in records],
+            ["town"] + ["background_type"] * 3 + ["row"] * 4 + ["end"],
+        )
+
+        decoder = TownStreamDecoder()
+        for line in TownStreamEncoder(self.town).iter_lines():
+            self.assertFalse(decoder.done)
+            decoder.feed(line)
+        self.assertTrue(decoder.done)
+        self._assert_same_town(decoder.town)
+
+    def test_record_split_in_chunks(self):
+        decoder = TownStreamDecoder()
+        for line in TownStreamEncoder(self.town).iter_lines():
+            for i in range(len(line)):
+                decoder.feed(line[i])
+        self.assertTrue(decoder.done)
+        self._assert_same_town(decoder.town)
+
+    def test_unknown_record(self):
+        decoder = TownStreamDecoder()
+        with self.assertRaises(StreamDecodeError) as context:
+            decoder.feed('{"type":"weather"}\n')
+        self.assertEqual(context.exception.record_type, "weather")
+
+    def test_record_before_town(self):
+        decoder = TownStreamDecoder()
+        with self.assertRaises(StreamDecodeError) as context:
+            decoder.feed('{"type":"row","y":0,"codes":[]}\n')
+        self.assertEqual(context.exception.record_type, "row")
+
+    def test_truncated_stream(self):
+        lines = list(TownStreamEncoder(self.town).iter_lines())
+        text_file = io.StringIO("".join(lines[:-1]))
+        with self.assertRaises(StreamDecodeError):
+            TownStreamDecoder.load(text_file)
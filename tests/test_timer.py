@@ -0,0 +1,71 @@
+import time
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.timer import TimerWheel
+from pytown_model.town import TownCreator
+
+
+class TimerWheel_test(unittest.TestCase):
+    def setUp(self):
+        self.wheel = TimerWheel(resolution=1, slots_nb=4, levels_nb=2, now=0)
+        self.fired = []
+
+    def _schedule(self, deadline):
+        return self.wheel.schedule(deadline, lambda: self.fired.append(deadline))
+
+    def test_advance(self):
+        for deadline in [3, 1, 9, 40, 5]:
+            self._schedule(deadline)
+
+        self.assertEqual(self.wheel.advance(2), 1)
+        self.assertEqual(self.fired, [1])
+        self.assertEqual(self.wheel.advance(9), 3)
+        self.assertEqual(self.fired, [1, 3, 5, 9])
+
+        # Farther than the wheel, added again when reached
+        self.wheel.advance(39)
+        self.assertEqual(self.fired, [1, 3, 5, 9])
+        self.wheel.advance(40)
+        self.assertEqual(self.fired, [1, 3, 5, 9, 40])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        timer = self._schedule(6)
+        self._schedule(7)
+        timer.cancel()
+        self.assertEqual(self.wheel.advance(10), 1)
+        self.assertEqual(self.fired, [7])
+
+    def test_expired(self):
+        self.wheel.advance(5)
+        self._schedule(2)
+        self.assertEqual(self.wheel.advance(6), 1)
+
+
+class MoveExpiry_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_default_town(6, 4)
+        self.town.add_player(Player(1, "Lis", 0, 0), (0, 0))
+        self.town.add_player(Player(2, "Mehdi", 0, 0), (1, 0))
+
+    def test_move_expiry(self):
+        player = self.town.get_player(1)
+        player.status = "move"
+        version = self.town.tracker.version
+
+        self.assertEqual(self.town.run_timers(time.time() - 1), 0)
+        self.assertEqual(player.status, "move")
+        self.town.run_timers(time.time() + Player.MOVE_DURATION + 0.1)
+        self.assertEqual(player.status, "idle")
+
+        # Only the moving player is touched
+        changes = self.town.tracker.get_changes(version)
+        self.assertEqual(changes, [("players", 1)])
+
+    def test_removed_player(self):
+        player = self.town.get_player(2)
+        player.status = "move"
+        self.town.remove_player(2)
+        self.town.run_timers(time.time() + 1)
+        self.assertEqual(player.status, "move")
@@ -1,4 +1,5 @@
 import unittest
+from pytown_model.characters import Player
 from pytown_model.town import TownCreator, Town
 
 
@@ -10,6 +11,86 @@ class Town_test(unittest.TestCase):
         self.assertEqual(self.town.get_tiles_w(), 6)
         self.assertEqual(self.town.get_tiles_h(), 4)
 
+    def test_players_by_tile(self):
+        player1 = Player(1, "Lis", 0, 0)
+        player2 = Player(2, "Mehdi", 0.2, 0.3)
+        self.town.set_player(player1)
+        self.town.add_player(player2, (3, 1))
+
+        self.assertEqual(self.town.get_players_by_tile((0, 0)), [player1])
+        self.assertEqual(self.town.get_players_by_tile((3, 1)), [player2])
+
+        self.town.move_player(2, 0.1, 0.4)
+        self.assertEqual(self.town.get_players_by_tile((3, 1)), [])
+        self.assertCountEqual(
+            self.town.get_players_by_tile((0, 0)), [player1, player2]
+        )
+
+    def test_players_around_tile(self):
+        self.town.add_player(Player(1, "Lis", 0, 0), (0, 0))
+        self.town.add_player(Player(2, "Mehdi", 0, 0), (2, 0))
+        self.town.add_player(Player(3, "Celine", 0, 0), (2, 2))
+
+        players = self.town.get_players_around_tile((0, 0), 2)
+        self.assertCountEqual([player.player_id for player in players], [1, 2])
+        players = self.town.get_players_around_tile((0, 0), 3)
+        self.assertCountEqual([player.player_id for player in players], [1, 2, 3])
+
+    def test_procedural_town(self):
+        town = TownCreator.create_procedural_town(40, 30, seed=7)
+        self.assertEqual(town.get_size(), (40, 30))
+        self.assertEqual(len(town), 40 * 30)
+
+        names = {background.name for background in town.backgrounds.values()}
+        self.assertIn("water", names)
+        self.assertIn("road", names)
+        for tile in town.resources:
+            self.assertEqual(town.get_background(tile).name, "grass")
+
+        same_town = TownCreator.create_procedural_town(40, 30, seed=7)
+        self.assertEqual(same_town.to_json_dict(), town.to_json_dict())
+        other_town = TownCreator.create_procedural_town(40, 30, seed=8)
+        self.assertNotEqual(other_town.to_json_dict(), town.to_json_dict())
+
+    def test_query_region(self):
+        town = TownCreator.create_basic_town()
+        town.add_player(Player(1, "Lis", 0, 0), (5, 1))
+        town.add_player(Player(2, "Mehdi", 0, 0), (9, 5))
+
+        entities = town.query_region(4, 0, 7, 2)
+        self.assertEqual(len(entities["backgrounds"]), 12)
+        self.assertEqual(list(entities["resources"]), [(5, 2), (6, 0)])
+        self.assertEqual(list(entities["buildings"]), [(5, 2), (6, 0)])
+        self.assertEqual(list(entities["players"]), [1])
+
+        # The index of a replica follows the deltas applied to it
+        replica = Town.from_json_dict(town.to_json_dict())
+        since = town.tracker.version
+        town.move_player(1, 9, 1)
+        delta = town.to_delta_json_dict(since)
+        delta["resources"][(6, 0)] = None
+        replica.apply_delta(delta)
+        entities = replica.query_region(4, 0, 7, 2)
+        self.assertEqual(list(entities["resources"]), [(5, 2)])
+        self.assertEqual(entities["players"], {})
+
+    def test_query_radius(self):
+        town = TownCreator.create_basic_town()
+        entities = town.query_radius((6, 1), 1)
+        self.assertEqual(len(entities["backgrounds"]), 5)
+        self.assertEqual(list(entities["resources"]), [(6, 0)])
+        self.assertEqual(list(entities["buildings"]), [(6, 0)])
+
+    def test_viewport_json_dict(self):
+        town = TownCreator.create_basic_town()
+        town.add_player(Player(1, "Lis", 0, 0), (0, 3))
+        json_dict = town.to_viewport_json_dict(0, 2, 2, 4)
+        self.assertEqual(json_dict["viewport"], [0, 2, 2, 4])
+        self.assertEqual(len(json_dict["backgrounds"]), 9)
+        self.assertEqual(list(json_dict["resources"]), [(0, 3)])
+        self.assertEqual(json_dict["buildings"], {})
+        self.assertEqual(list(json_dict["players"]), [1])
+
     # def test_iter_town(self):
     #     check_str = ""
     #     for background in self.town.backgrounds.values():
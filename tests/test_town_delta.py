@@ -0,0 +1,64 @@
+import unittest
+
+from pytown_model.characters import Player
+from pytown_model.command import MovePlayerCommand
+from pytown_model.inventory import Item
+from pytown_model.town import Town, TownCreator, TownDeltaError
+
+
+class TownDelta_test(unittest.TestCase):
+    def setUp(self):
+        self.town = TownCreator.create_basic_town()
+        self.town.add_player(Player(1, "Lis", 0, 0), (2, 2))
+        self.town.add_player(Player(2, "Mehdi", 0, 0), (3, 3))
+
+        self.client_town = Town.from_json_dict(self.town.to_json_dict())
+
+    def test_no_change(self):
+        delta = self.town.to_delta_json_dict(self.town.tracker.version)
+        for section in Town.SECTIONS:
+            self.assertEqual(delta[section], {})
+
+    def test_only_changed_entities(self):
+        since = self.town.tracker.version
+
+        command = MovePlayerCommand("right")
+        command.client_id = 1
+        command.town = self.town
+        command.execute()
+        self.town.get_resource((0, 3)).inventory.remove_item(Item("wood", 5))
+
+        delta = self.town.to_delta_json_dict(since)
+        self.assertEqual(list(delta["players"]), [1])
+        self.assertEqual(list(delta["resources"]), [(0, 3)])
+        self.assertEqual(delta["buildings"], {})
+        self.assertEqual(delta["backgrounds"], {})
+
+        self.client_town.apply_delta(delta)
+        self.assertEqual(self.client_town.synced_version, self.town.tracker.version)
+        self.assertEqual(self.client_town.get_player(1).x, self.town.get_player(1).x)
+        self.assertEqual(
+            self.client_town.get_resource((0, 3)).inventory.get_quantity("wood"), 45
+        )
+        self.assertEqual(self.client_town.get_players_by_tile((2, 2))[0].name, "Lis")
+
+    def test_building_upgrade_and_removed_player(self):
+        since = self.town.tracker.version
+
+        self.town.get_building((7, 3)).upgrade()
+        self.town.remove_player(2)
+
+        delta = self.town.to_delta_json_dict(since)
+        self.assertEqual(list(delta["buildings"]), [(7, 3)])
+        self.assertEqual(delta["players"], {2: None})
+
+        self.client_town.apply_delta(delta)
+        self.assertIsNone(self.client_town.get_player(2))
+
+    def test_missing_delta(self):
+        since = self.town.tracker.version
+        self.town.get_player(1).direction = "up"
+        self.town.get_player(1).direction = "left"
+
+        with self.assertRaises(TownDeltaError):
+            self.client_town.apply_delta(self.town.to_delta_json_dict(since + 1))